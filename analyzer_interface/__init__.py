@@ -4,6 +4,7 @@ from .declaration import (
     AnalyzerDeclaration,
     SecondaryAnalyzerDeclaration,
     WebPresenterDeclaration,
+    lazy_entry_point,
 )
 from .interface import (
     AnalyzerInput,
@@ -15,4 +16,11 @@ from .interface import (
     SecondaryAnalyzerInterface,
     WebPresenterInterface,
 )
+from .parquet_options import (
+    DEFAULT_PARQUET_WRITE_PRESET,
+    PARQUET_WRITE_PRESETS,
+    ParquetCompression,
+    ParquetWriteOptions,
+    ParquetWritePreset,
+)
 from .suite import AnalyzerSuite
@@ -1,11 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, TypeVar
 
 import polars as pl
-from dash import Dash
 from pydantic import BaseModel
 
 from .interface import SecondaryAnalyzerInterface
+from .parquet_options import ParquetWriteOptions
+
+if TYPE_CHECKING:
+    from dash import Dash
+else:
+    # Dash takes a long time to import, so it is only imported when a web
+    # presenter is launched
+    Dash = Any
 
 
 class PrimaryAnalyzerContext(ABC, BaseModel):
@@ -80,6 +87,42 @@ class WebPresenterContext(BaseDerivedModuleContext):
         """
         pass
 
+    @abstractmethod
+    def memoize(self, *tables: "TableReader") -> Callable[[Callable], Callable]:
+        """
+        Makes a decorator that caches the results of a callback in the state
+        directory, by its arguments and the current contents of the given
+        tables it reads. Use it under `dash_app.callback` for callbacks that are
+        slow to compute.
+        """
+        pass
+
+    @abstractmethod
+    def read_table(
+        self, table: "TableReader", *, columns: Optional[list[str]] = None
+    ) -> pl.DataFrame:
+        """
+        Loads the table, or the given columns of it, into a dataframe that is
+        cached and shared with the other web presenters in the process. Prefer
+        this over reading the parquet file directly. The frame must not be
+        modified in place.
+        """
+        pass
+
+    @abstractmethod
+    def read_derived_table(
+        self,
+        table: "TableReader",
+        name: str,
+        derive: Callable[[pl.LazyFrame], pl.LazyFrame],
+    ) -> pl.DataFrame:
+        """
+        Computes a dataframe from the table, caching it like `read_table`. The
+        name identifies the derived frame among those of this web presenter, and
+        the table is derived again only when its file changes.
+        """
+        pass
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -109,9 +152,33 @@ class TableReader(ABC):
         """
         Gets the path to the table's parquet file. The module should expect a parquet
         file here.
+
+        Outputs that were written with `TableWriter.write` may be stored as Arrow
+        IPC files instead, so prefer `read` and `scan` for reading outputs.
         """
         pass
 
+    @property
+    def path(self) -> str:
+        """
+        Gets the path to the file that the table is actually stored in, which is
+        a parquet or an Arrow IPC file.
+        """
+        return self.parquet_path
+
+    def read(self, *, columns: Optional[list[str]] = None) -> pl.DataFrame:
+        """
+        Loads the table, or the given columns of it, whichever format it is
+        stored in. Arrow IPC files are memory-mapped rather than copied.
+        """
+        return pl.read_parquet(self.parquet_path, columns=columns)
+
+    def scan(self) -> pl.LazyFrame:
+        """
+        Lazily scans the table, whichever format it is stored in.
+        """
+        return pl.scan_parquet(self.parquet_path)
+
 
 PolarsDataFrameLike = TypeVar("PolarsDataFrameLike", bound=pl.DataFrame)
 
@@ -135,6 +202,46 @@ class TableWriter(ABC):
     def parquet_path(self) -> str:
         """
         Gets the path to the table's parquet file. The module should write a parquet
-        file to it.
+        file to it, unless it uses `write`.
         """
         pass
+
+    @property
+    def parquet_write_options(self) -> ParquetWriteOptions:
+        """
+        How the table's parquet file should be encoded, as chosen for the
+        analysis. Modules writing to `parquet_path` themselves should pass these
+        to their writer.
+        """
+        return ParquetWriteOptions()
+
+    def write(self, df: pl.DataFrame | pl.LazyFrame):
+        """
+        Writes the table in the format the app stores outputs in, which may be
+        Arrow IPC so that the modules reading it back can memory-map it. Prefer
+        this over writing to `parquet_path`.
+        """
+        options = self.parquet_write_options.polars_kwargs()
+        if isinstance(df, pl.LazyFrame):
+            df.sink_parquet(self.parquet_path, **options)
+        else:
+            df.write_parquet(self.parquet_path, **options)
+
+    def write_batches(self, batches: Iterable[pl.DataFrame], schema: pl.Schema):
+        """
+        Writes the table one batch at a time, for tables too large to be built
+        in memory at once. Every batch must have the `schema`. Like `write`,
+        the table is stored in the format the app stores outputs in.
+        """
+        import pyarrow.parquet as pq
+
+        options = self.parquet_write_options
+        arrow_schema = pl.DataFrame(schema=schema).to_arrow().schema
+        with pq.ParquetWriter(
+            self.parquet_path, arrow_schema, **options.pyarrow_writer_kwargs()
+        ) as writer:
+            for batch in batches:
+                writer.write_table(
+                    batch.to_arrow().cast(arrow_schema),
+                    row_group_size=options.row_group_size,
+                )
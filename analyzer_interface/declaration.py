@@ -1,4 +1,6 @@
-from typing import Callable
+from importlib import import_module
+from importlib.util import resolve_name
+from typing import Callable, Optional
 
 from .context import (
     PrimaryAnalyzerContext,
@@ -21,7 +23,7 @@ class AnalyzerDeclaration(AnalyzerInterface):
         interface: AnalyzerInterface,
         main: Callable,
         *,
-        is_distributed: bool = False
+        is_distributed: bool = False,
     ):
         """Creates a primary analyzer declaration
 
@@ -92,3 +94,31 @@ class WebPresenterDeclaration(WebPresenterInterface):
 
         """
         super().__init__(**interface.model_dump(), factory=factory, server_name=name)
+
+
+def lazy_entry_point(module: str, name: str, *, package: Optional[str] = None):
+    """Creates an entry point that imports its module when it is first called
+
+    Analyzer modules, and the libraries they use for analysis and plotting,
+    can take a long time to import. Declaring the entry points lazily keeps
+    them from being imported when the app starts.
+
+    Args:
+      module (str):
+        The module that defines the entry point. Relative names like `.main`
+        are resolved against `package`.
+
+      name (str): The name of the entry point function in the module.
+
+      package (str):
+        The package that relative module names are resolved against. Typically,
+        you will use the global variable `__name__` here.
+    """
+
+    module = resolve_name(module, package) if module.startswith(".") else module
+
+    def entry_point(context):
+        return getattr(import_module(module), name)(context)
+
+    entry_point.__qualname__ = f"{module}:{name}"
+    return entry_point
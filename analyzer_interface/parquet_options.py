@@ -0,0 +1,59 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+ParquetCompression = Literal["zstd", "lz4", "snappy", "gzip", "uncompressed"]
+
+
+class ParquetWriteOptions(BaseModel):
+    """
+    How parquet files are encoded. Use a preset from `PARQUET_WRITE_PRESETS`
+    rather than tuning these one by one.
+    """
+
+    compression: ParquetCompression = "zstd"
+
+    compression_level: Optional[int] = None
+    """The codec's level, e.g. 1 to 22 for zstd; None uses the codec's default."""
+
+    row_group_size: Optional[int] = None
+    """The maximum rows per row group; None lets the writer decide."""
+
+    statistics: bool = True
+    """Whether column statistics are written, which lets readers skip row groups."""
+
+    def polars_kwargs(self):
+        """The arguments to polars' `write_parquet` and `sink_parquet`."""
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "row_group_size": self.row_group_size,
+            "statistics": self.statistics,
+        }
+
+    def pyarrow_writer_kwargs(self):
+        """
+        The arguments to `pyarrow.parquet.ParquetWriter`. The row group size is
+        given to its `write_table` instead.
+        """
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "write_statistics": self.statistics,
+        }
+
+
+ParquetWritePreset = Literal["balanced", "fast_write", "compact_archive"]
+
+PARQUET_WRITE_PRESETS: dict[ParquetWritePreset, ParquetWriteOptions] = {
+    "balanced": ParquetWriteOptions(),
+    "fast_write": ParquetWriteOptions(compression="lz4", row_group_size=1_000_000),
+    "compact_archive": ParquetWriteOptions(compression="zstd", compression_level=19),
+}
+"""
+`balanced` is the default. `fast_write` spends less time compressing, for
+large analyses that are rerun often; `compact_archive` makes the smallest
+files, for projects that are kept around, at the cost of much slower writes.
+"""
+
+DEFAULT_PARQUET_WRITE_PRESET: ParquetWritePreset = "balanced"
@@ -1,6 +1,7 @@
-from analyzer_interface import AnalyzerDeclaration
+from analyzer_interface import AnalyzerDeclaration, lazy_entry_point
 
 from .interface import interface
-from .main import main
 
-hashtags = AnalyzerDeclaration(interface=interface, main=main)
+hashtags = AnalyzerDeclaration(
+    interface=interface, main=lazy_entry_point(".main", "main", package=__name__)
+)
@@ -89,4 +89,4 @@ def main(context: PrimaryAnalyzerContext):
     print("Output preview:")
     print(df_agg.head())
 
-    df_agg.write_parquet(context.output(OUTPUT_GINI).parquet_path)
+    context.output(OUTPUT_GINI).write(df_agg)
@@ -1,6 +1,7 @@
-from analyzer_interface import SecondaryAnalyzerDeclaration
+from analyzer_interface import SecondaryAnalyzerDeclaration, lazy_entry_point
 
 from .interface import interface
-from .main import main
 
-ngram_stats = SecondaryAnalyzerDeclaration(interface=interface, main=main)
+ngram_stats = SecondaryAnalyzerDeclaration(
+    interface=interface, main=lazy_entry_point(".main", "main", package=__name__)
+)
@@ -1,8 +1,7 @@
 import polars as pl
-import pyarrow as pa
-import pyarrow.parquet as pq
 
 from analyzer_interface.context import SecondaryAnalyzerContext
+from instrumentation import record_rows
 from terminal_tools import ProgressReporter
 
 from ..ngrams.interface import (
@@ -29,11 +28,9 @@ from .interface import (
 
 
 def main(context: SecondaryAnalyzerContext):
-    df_message_ngrams = pl.read_parquet(
-        context.base.table(OUTPUT_MESSAGE_NGRAMS).parquet_path
-    )
-    df_ngrams = pl.read_parquet(context.base.table(OUTPUT_NGRAM_DEFS).parquet_path)
-    df_messages = pl.read_parquet(context.base.table(OUTPUT_MESSAGE).parquet_path)
+    df_message_ngrams = context.base.table(OUTPUT_MESSAGE_NGRAMS).read()
+    df_ngrams = context.base.table(OUTPUT_NGRAM_DEFS).read()
+    df_messages = context.base.table(OUTPUT_MESSAGE).read()
 
     dict_authors_by_message = {
         row[COL_MESSAGE_SURROGATE_ID]: row[COL_AUTHOR_ID]
@@ -41,6 +38,7 @@ def main(context: SecondaryAnalyzerContext):
     }
 
     with ProgressReporter("Computing ngram statistics"):
+        record_rows(rows_in=df_message_ngrams.height)
         df_ngram_stats = (
             df_message_ngrams.with_columns(
                 pl.col(COL_MESSAGE_NGRAM_COUNT)
@@ -58,8 +56,10 @@ def main(context: SecondaryAnalyzerContext):
                 .alias(COL_NGRAM_DISTINCT_POSTER_COUNT),
             )
         )
+        record_rows(rows_out=df_ngram_stats.height)
 
     with ProgressReporter("Creating the summary table"):
+        record_rows(rows_in=df_ngram_stats.height)
         df_ngram_summary = df_ngrams.join(
             df_ngram_stats, on=COL_NGRAM_ID, how="inner"
         ).sort(
@@ -67,33 +67,14 @@ def main(context: SecondaryAnalyzerContext):
             descending=True,
         )
 
-        df_ngram_summary.write_parquet(context.output(OUTPUT_NGRAM_STATS).parquet_path)
-
-    df_messages_schema = df_messages.to_arrow().schema
-    df_message_ngrams_schema = df_message_ngrams.to_arrow().schema
-    df_ngram_summary_schema = df_ngram_summary.to_arrow().schema
+        context.output(OUTPUT_NGRAM_STATS).write(df_ngram_summary)
 
     average_cardinality_explosion_factor = df_message_ngrams.height // df_ngrams.height
 
     with ProgressReporter("Writing full report") as progress:
-        with pq.ParquetWriter(
-            context.output(OUTPUT_NGRAM_FULL).parquet_path,
-            schema=pa.schema(
-                [
-                    df_message_ngrams_schema.field(COL_NGRAM_ID),
-                    df_ngram_summary_schema.field(COL_NGRAM_LENGTH),
-                    df_ngram_summary_schema.field(COL_NGRAM_WORDS),
-                    df_ngram_summary_schema.field(COL_NGRAM_TOTAL_REPS),
-                    df_ngram_summary_schema.field(COL_NGRAM_DISTINCT_POSTER_COUNT),
-                    df_messages_schema.field(COL_AUTHOR_ID),
-                    pa.field(COL_NGRAM_REPS_PER_USER, pa.int32()),
-                    df_messages_schema.field(COL_MESSAGE_SURROGATE_ID),
-                    df_messages_schema.field(COL_MESSAGE_ID),
-                    df_messages_schema.field(COL_MESSAGE_TEXT),
-                    df_messages_schema.field(COL_MESSAGE_TIMESTAMP),
-                ]
-            ),
-        ) as writer:
+        record_rows(rows_in=df_ngram_summary.height)
+
+        def iter_report_batches():
             report_slice_size = max(1, 100_000 // average_cardinality_explosion_factor)
             report_total_processed = 0
             for df_ngram_summary_slice in df_ngram_summary.iter_slices(
@@ -104,9 +85,8 @@ def main(context: SecondaryAnalyzerContext):
                     f"{report_total_processed}/{df_ngram_summary.height}",
                     end="\r",
                 )
-                report_total_processed += df_ngram_summary_slice.height
 
-                df_output = (
+                yield (
                     (
                         df_ngram_summary_slice.join(
                             df_message_ngrams, on=COL_NGRAM_ID
@@ -146,6 +126,28 @@ def main(context: SecondaryAnalyzerContext):
                         descending=[True, True, True, True, False, False],
                     )
                 )
-                writer.write_table(df_output.to_arrow())
                 report_total_processed += df_ngram_summary_slice.height
                 progress.update(report_total_processed / df_ngram_summary.height)
+
+        context.output(OUTPUT_NGRAM_FULL).write_batches(
+            iter_report_batches(),
+            pl.Schema(
+                {
+                    COL_NGRAM_ID: df_message_ngrams.schema[COL_NGRAM_ID],
+                    COL_NGRAM_LENGTH: df_ngram_summary.schema[COL_NGRAM_LENGTH],
+                    COL_NGRAM_WORDS: df_ngram_summary.schema[COL_NGRAM_WORDS],
+                    COL_NGRAM_TOTAL_REPS: df_ngram_summary.schema[COL_NGRAM_TOTAL_REPS],
+                    COL_NGRAM_DISTINCT_POSTER_COUNT: df_ngram_summary.schema[
+                        COL_NGRAM_DISTINCT_POSTER_COUNT
+                    ],
+                    COL_AUTHOR_ID: df_messages.schema[COL_AUTHOR_ID],
+                    COL_NGRAM_REPS_PER_USER: pl.Int32,
+                    COL_MESSAGE_SURROGATE_ID: df_messages.schema[
+                        COL_MESSAGE_SURROGATE_ID
+                    ],
+                    COL_MESSAGE_ID: df_messages.schema[COL_MESSAGE_ID],
+                    COL_MESSAGE_TEXT: df_messages.schema[COL_MESSAGE_TEXT],
+                    COL_MESSAGE_TIMESTAMP: df_messages.schema[COL_MESSAGE_TIMESTAMP],
+                }
+            ),
+        )
@@ -1,8 +1,13 @@
-from analyzer_interface import WebPresenterDeclaration, WebPresenterInterface
+from analyzer_interface import (
+    WebPresenterDeclaration,
+    WebPresenterInterface,
+    lazy_entry_point,
+)
 
-from .factory import factory
 from .interface import interface
 
 ngrams_web = WebPresenterDeclaration(
-    interface=interface, factory=factory, name=__name__
+    interface=interface,
+    factory=lazy_entry_point(".factory", "factory", package=__name__),
+    name=__name__,
 )
@@ -1,15 +1,12 @@
-import re
-from itertools import accumulate
 from typing import Optional
 
-import plotly.express as px
 import plotly.graph_objects as go
 import polars as pl
 from dash import Input as DashInput
-from dash import Output
+from dash import Output, State, ctx
 from dash.dcc import Graph
 from dash.dcc import Input as DccInput
-from dash.dcc import RadioItems
+from dash.dcc import RadioItems, Store
 from dash.html import H2, Datalist, Div, Em, Label, Option, P
 
 from analyzer_interface.context import WebPresenterContext
@@ -21,21 +18,67 @@ from ..ngram_stats.interface import (
     OUTPUT_NGRAM_STATS,
 )
 from ..ngram_stats.interface import interface as ngram_stats
+from .word_index import WordIndex, build_word_index
+
+MAX_SCATTER_POINTS = 5000
+"""Beyond this many n-grams in view, the plot shows tiles instead of points."""
+
+SCATTER_TILES_PER_AXIS = 80
+"""The number of log-scaled tiles along each axis of the plot."""
 
 
 def factory(context: WebPresenterContext):
-    df = pl.read_parquet(
-        context.dependency(ngram_stats).table(OUTPUT_NGRAM_STATS).parquet_path
+    ngram_stats_table = context.dependency(ngram_stats).table(OUTPUT_NGRAM_STATS)
+    df = context.read_table(
+        ngram_stats_table,
+        columns=[
+            COL_NGRAM_WORDS,
+            COL_NGRAM_TOTAL_REPS,
+            COL_NGRAM_DISTINCT_POSTER_COUNT,
+        ],
+    )
+    # The row numbers in the index match the rows of the table as read above
+    word_index = WordIndex(
+        context.read_derived_table(
+            ngram_stats_table,
+            "word_index",
+            lambda lf: build_word_index(lf, COL_NGRAM_WORDS),
+        )
     )
-    all_grams = sorted(set(df[COL_NGRAM_WORDS].str.split(" ").explode()))
     explanation_total = "N-grams to the right are repeated by more users. N-grams higher up are repeated more times overall."
     explanation_amplification = "N-grams to the right are repeated by more users. N-grams higher up are repeated more times on average per user."
 
+    @context.dash_app.callback(
+        Output("grams-list", "children"),
+        DashInput("grams-list-input", "value"),
+    )
+    def update_suggestions(filter_text: Optional[str]):
+        return [
+            Option(value=suggestion)
+            for suggestion in word_index.suggest(filter_text or "")
+        ]
+
+    @context.dash_app.callback(
+        Output("scatter-zoom", "data"),
+        [DashInput("scatter-plot", "relayoutData"), DashInput("y-axis", "value")],
+        State("scatter-zoom", "data"),
+    )
+    def update_zoom(relayout_data: Optional[dict], y_axis: str, zoom: dict):
+        if ctx.triggered_id == "y-axis":
+            # The view is reset along with the y-axis
+            return {}
+        return get_zoom_ranges(relayout_data or {}, zoom or {})
+
     @context.dash_app.callback(
         [Output("scatter-plot", "figure"), Output("explanation", "children")],
-        [DashInput("grams-list-input", "value"), DashInput("y-axis", "value")],
+        [
+            DashInput("grams-list-input", "value"),
+            DashInput("y-axis", "value"),
+            DashInput("scatter-zoom", "data"),
+        ],
     )
-    def update_figure(filter_text: Optional[str], y_axis: str):
+    @context.memoize(ngram_stats_table)
+    def update_figure(filter_text: Optional[str], y_axis: str, zoom: Optional[dict]):
         y_label = (
             "Total Repetition"
             if y_axis == "total_repetition"
@@ -52,8 +95,8 @@ def factory(context: WebPresenterContext):
             else explanation_amplification
         )
 
-        matcher = create_word_matcher(filter_text or "", pl.col(COL_NGRAM_WORDS))
-        plotted_df = df.filter(matcher) if matcher is not None else df
+        matching_rows = word_index.find_rows(filter_text or "")
+        plotted_df = df[matching_rows] if matching_rows is not None else df
         if plotted_df.height == 0:
             fig = go.Figure()
             fig.update_layout(
@@ -72,34 +115,75 @@ def factory(context: WebPresenterContext):
             )
             return fig, explanation
 
-        x_value = plotted_df[COL_NGRAM_DISTINCT_POSTER_COUNT]
-        y_value = (
-            plotted_df[COL_NGRAM_TOTAL_REPS]
-            if y_axis == "total_repetition"
-            else plotted_df[COL_NGRAM_TOTAL_REPS]
-            / plotted_df[COL_NGRAM_DISTINCT_POSTER_COUNT]
-        )
+        plotted_df = plotted_df.select(
+            pl.col(COL_NGRAM_WORDS).alias("words"),
+            pl.col(COL_NGRAM_DISTINCT_POSTER_COUNT).alias("x"),
+            (
+                pl.col(COL_NGRAM_TOTAL_REPS)
+                if y_axis == "total_repetition"
+                else pl.col(COL_NGRAM_TOTAL_REPS)
+                / pl.col(COL_NGRAM_DISTINCT_POSTER_COUNT)
+            ).alias("y"),
+            pl.col(COL_NGRAM_TOTAL_REPS).alias("total_reps"),
+        ).filter(get_zoom_filter(zoom or {}))
 
-        fig = px.scatter(
-            x=x_value,
-            y=y_value,
-            labels={"x": "User Count", "y": y_label},
-            log_y=True,
-            log_x=True,
-        )
+        if plotted_df.height <= MAX_SCATTER_POINTS:
+            fig = go.Figure(
+                go.Scattergl(
+                    x=plotted_df["x"],
+                    y=plotted_df["y"],
+                    mode="markers",
+                    customdata=plotted_df["words"],
+                    hovertemplate='<b>"%{customdata}"</b><br>'
+                    + "User Count: %{x}<br>"
+                    + y_legend_label
+                    + ": %{y}<br>"
+                    + "<extra></extra>",
+                )
+            )
+        else:
+            tiles = bin_points(plotted_df)
+            fig = go.Figure(
+                go.Scattergl(
+                    x=tiles["x"],
+                    y=tiles["y"],
+                    mode="markers",
+                    marker={
+                        "symbol": "square",
+                        "size": 8,
+                        "color": tiles["count"].log10(),
+                        "colorscale": "Viridis",
+                        "colorbar": {
+                            "title": "N-grams",
+                            "tickvals": list(range(8)),
+                            "ticktext": [f"{10 ** i:,}" for i in range(8)],
+                        },
+                    },
+                    customdata=tiles.select("count", "words").rows(),
+                    hovertemplate="<b>%{customdata[0]:,} n-grams</b><br>"
+                    + 'Most repeated: "%{customdata[1]}"<br>'
+                    + "User Count: ~%{x:.3s}<br>"
+                    + y_legend_label
+                    + ": ~%{y:.3s}<br>"
+                    + "<extra></extra>",
+                )
+            )
+            explanation = [
+                explanation,
+                " ",
+                f"The {plotted_df.height:,} n-grams shown are grouped into tiles; "
+                "zoom in or search to see individual n-grams.",
+            ]
 
-        fig.update_traces(
-            hovertemplate='<b>"%{customdata}"</b><br>'
-            + "User Count: %{x}<br>"
-            + y_legend_label
-            + ": %{y}<br>"
-            + "<extra></extra>",
-            customdata=plotted_df[COL_NGRAM_WORDS],
+        fig.update_layout(
+            xaxis={"title": "User Count", "type": "log"},
+            yaxis={"title": y_label, "type": "log"},
+            # Keeps the zoom when the figure is replaced, until the y-axis changes
+            uirevision=y_axis,
         )
-
         return fig, explanation
 
-    fig = update_figure(None, "total_repetition")
+    fig, _ = update_figure(None, "total_repetition", {})
 
     context.dash_app.layout = Div(
         style={"display": "flex", "flex-direction": "column", "height": "100%"},
@@ -135,10 +219,7 @@ def factory(context: WebPresenterContext):
                                 "Search for n-grams containing: ",
                                 htmlFor="grams-list-input",
                             ),
-                            Datalist(
-                                id="grams-list",
-                                children=[Option(value=gram) for gram in all_grams],
-                            ),
+                            Datalist(id="grams-list"),
                             DccInput(
                                 id="grams-list-input", type="text", list="grams-list"
                             ),
@@ -146,6 +227,7 @@ def factory(context: WebPresenterContext):
                     ),
                 ]
             ),
+            Store(id="scatter-zoom", data={}),
             Graph(
                 id="scatter-plot",
                 figure=fig,
@@ -155,13 +237,64 @@ def factory(context: WebPresenterContext):
     )
 
 
-def create_word_matcher(subject: str, col: pl.Expr) -> Optional[pl.Expr]:
-    subject = subject.strip().lower()
-    words = re.split(r"[^\w]", subject)
-    words = [word for word in words if word]
-    if not words:
-        return None
-    return accumulate(
-        (col.str.contains("(^|[^\\w])" + re.escape(word)) for word in words),
-        lambda a, b: a & b,
+def get_zoom_ranges(relayout_data: dict, zoom: dict) -> dict:
+    """
+    Updates the zoomed axis ranges with the changes reported by the plot. The
+    ranges of log axes are in powers of 10.
+    """
+    zoom = dict(zoom)
+    for axis in ("x", "y"):
+        if relayout_data.get(f"{axis}axis.autorange"):
+            zoom.pop(axis, None)
+        elif f"{axis}axis.range[0]" in relayout_data:
+            zoom[axis] = [
+                relayout_data[f"{axis}axis.range[0]"],
+                relayout_data[f"{axis}axis.range[1]"],
+            ]
+        elif f"{axis}axis.range" in relayout_data:
+            zoom[axis] = list(relayout_data[f"{axis}axis.range"])
+    return zoom
+
+
+def get_zoom_filter(zoom: dict) -> pl.Expr:
+    """
+    Selects the points inside the zoomed ranges, which are non-positive values
+    that a log axis can't show otherwise.
+    """
+    result = (pl.col("x") > 0) & (pl.col("y") > 0)
+    for axis, (start, end) in zoom.items():
+        result = result & pl.col(axis).log10().is_between(start, end)
+    return result
+
+
+def bin_points(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Groups the points into tiles that are evenly sized on log axes. Each tile is
+    placed at the mean of its points, and named after its most repeated n-gram.
+    """
+    log_x = pl.col("x").log10()
+    log_y = pl.col("y").log10()
+    bounds = df.select(
+        log_x.min().alias("x_min"),
+        log_x.max().alias("x_max"),
+        log_y.min().alias("y_min"),
+        log_y.max().alias("y_max"),
+    ).row(0, named=True)
+
+    def tile_index(value: pl.Expr, start: float, end: float) -> pl.Expr:
+        width = max(end - start, 1e-9) / SCATTER_TILES_PER_AXIS
+        return ((value - start) / width).floor().cast(pl.Int32)
+
+    return (
+        df.group_by(
+            tile_index(log_x, bounds["x_min"], bounds["x_max"]).alias("tile_x"),
+            tile_index(log_y, bounds["y_min"], bounds["y_max"]).alias("tile_y"),
+        )
+        .agg(
+            (10 ** log_x.mean()).alias("x"),
+            (10 ** log_y.mean()).alias("y"),
+            pl.len().alias("count"),
+            pl.col("words").sort_by("total_reps", descending=True).first(),
+        )
+        .sort("count")
     )
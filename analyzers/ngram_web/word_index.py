@@ -0,0 +1,95 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+import numpy as np
+import polars as pl
+
+COL_WORD = "word"
+COL_ROWS = "rows"
+
+
+class WordIndex:
+    """
+    An inverted index from the words in a text column to the rows they appear
+    in. A search word matches every word that starts with it, like the search
+    box always did, and a search for several words is the intersection of their
+    matches, so looking things up doesn't need to scan the texts.
+    """
+
+    def __init__(self, index: pl.DataFrame):
+        """
+        Takes the index frame made by `build_word_index`.
+        """
+        self.words: list[str] = index[COL_WORD].to_list()
+        self.rows = index[COL_ROWS]
+        self.counts = self.rows.list.len()
+
+    def find_rows(self, subject: str) -> Optional[np.ndarray]:
+        """
+        Finds the rows containing all words of the search text, in row order.
+        Returns None if the text has no words to search for.
+        """
+        words = split_words(subject)
+        if not words:
+            return None
+        result: Optional[np.ndarray] = None
+        # Start from the rarest word to keep the intersections small
+        for start, end in sorted(
+            (self._prefix_range(word) for word in words),
+            key=lambda range: self.counts.slice(range[0], range[1] - range[0]).sum(),
+        ):
+            rows = (
+                self.rows.slice(start, end - start).explode().drop_nulls().unique()
+            ).to_numpy()
+            result = (
+                rows
+                if result is None
+                else np.intersect1d(result, rows, assume_unique=True)
+            )
+            if len(result) == 0:
+                break
+        return np.sort(result)
+
+    def suggest(self, subject: str, limit: int = 20) -> list[str]:
+        """
+        Completes the last word of the search text with the indexed words that
+        start with it, most common first.
+        """
+        match = re.search(r"\w+$", subject)
+        if match is None:
+            return []
+        start, end = self._prefix_range(match.group().lower())
+        counts = self.counts.slice(start, end - start)
+        best = counts.arg_sort(descending=True).head(limit)
+        return [subject[: match.start()] + self.words[start + i] for i in best]
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        return (
+            bisect_left(self.words, prefix),
+            bisect_right(self.words, prefix + chr(0x10FFFF)),
+        )
+
+
+def build_word_index(lf: pl.LazyFrame, column: str) -> pl.LazyFrame:
+    """
+    Builds the index frame for a text column, with one row per lowercased word
+    and the sorted list of the row numbers it appears in.
+    """
+    return (
+        lf.select(column)
+        .with_row_index(COL_ROWS)
+        .select(
+            pl.col(COL_ROWS),
+            pl.col(column).str.to_lowercase().str.extract_all(r"\w+").alias(COL_WORD),
+        )
+        .explode(COL_WORD)
+        .drop_nulls(COL_WORD)
+        .group_by(COL_WORD)
+        .agg(pl.col(COL_ROWS).unique().sort())
+        .sort(COL_WORD)
+    )
+
+
+def split_words(subject: str) -> list[str]:
+    return [word for word in re.split(r"[^\w]", subject.strip().lower()) if word]
@@ -1,6 +1,9 @@
-from analyzer_interface import AnalyzerDeclaration
+from analyzer_interface import AnalyzerDeclaration, lazy_entry_point
 
 from .interface import interface
-from .main import main
 
-ngrams = AnalyzerDeclaration(interface=interface, main=main, is_distributed=True)
+ngrams = AnalyzerDeclaration(
+    interface=interface,
+    main=lazy_entry_point(".main", "main", package=__name__),
+    is_distributed=True,
+)
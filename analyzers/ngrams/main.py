@@ -3,6 +3,7 @@ import re
 import polars as pl
 
 from analyzer_interface.context import PrimaryAnalyzerContext
+from instrumentation import record_rows
 from terminal_tools import ProgressReporter
 
 from .interface import (
@@ -25,6 +26,7 @@ def main(context: PrimaryAnalyzerContext):
     input_reader = context.input()
     df_input = input_reader.preprocess(pl.read_parquet(input_reader.parquet_path))
     with ProgressReporter("Preprocessing messages"):
+        record_rows(rows_in=df_input.height)
         df_input = df_input.with_columns(
             (pl.int_range(pl.len()) + 1).alias(COL_MESSAGE_SURROGATE_ID)
         )
@@ -32,8 +34,11 @@ def main(context: PrimaryAnalyzerContext):
             pl.col(COL_MESSAGE_TEXT).is_not_null()
             & (pl.col(COL_MESSAGE_TEXT) != "")
             & pl.col(COL_AUTHOR_ID).is_not_null()
-            & (pl.col(COL_AUTHOR_ID) != "")
+            # The author ID may be an enum, which can't be compared with a
+            # string that isn't one of its categories.
+            & (pl.col(COL_AUTHOR_ID).cast(pl.String) != "")
         )
+        record_rows(rows_out=df_input.height)
 
     with ProgressReporter("Generating n-grams") as progress:
 
@@ -58,24 +63,25 @@ def main(context: PrimaryAnalyzerContext):
 
         ngrams_by_id: dict[str, int] = {}
         df_ngram_instances = pl.DataFrame(get_ngram_rows(ngrams_by_id))
+        record_rows(rows_in=df_input.height, rows_out=df_ngram_instances.height)
 
     with ProgressReporter("Computing per-message n-gram statistics"):
-        (
+        record_rows(rows_in=df_ngram_instances.height)
+        context.output(OUTPUT_MESSAGE_NGRAMS).write(
             pl.DataFrame(df_ngram_instances)
             .group_by(COL_MESSAGE_SURROGATE_ID, COL_NGRAM_ID)
             .agg(pl.count().alias(COL_MESSAGE_NGRAM_COUNT))
-            .write_parquet(context.output(OUTPUT_MESSAGE_NGRAMS).parquet_path)
         )
 
     with ProgressReporter("Outputting n-gram definitions"):
-        (
+        record_rows(rows_in=len(ngrams_by_id))
+        context.output(OUTPUT_NGRAM_DEFS).write(
             pl.DataFrame(
                 {
                     COL_NGRAM_ID: list(ngrams_by_id.values()),
                     COL_NGRAM_WORDS: list(ngrams_by_id.keys()),
                 }
-            )
-            .with_columns(
+            ).with_columns(
                 [
                     pl.col(COL_NGRAM_WORDS)
                     .str.split(" ")
@@ -83,11 +89,11 @@ def main(context: PrimaryAnalyzerContext):
                     .alias(COL_NGRAM_LENGTH)
                 ]
             )
-            .write_parquet(context.output(OUTPUT_NGRAM_DEFS).parquet_path)
         )
 
     with ProgressReporter("Outputting messages"):
-        (
+        record_rows(rows_in=df_input.height)
+        context.output(OUTPUT_MESSAGE).write(
             df_input.select(
                 [
                     COL_MESSAGE_SURROGATE_ID,
@@ -96,7 +102,7 @@ def main(context: PrimaryAnalyzerContext):
                     COL_AUTHOR_ID,
                     COL_MESSAGE_TIMESTAMP,
                 ]
-            ).write_parquet(context.output(OUTPUT_MESSAGE).parquet_path)
+            )
         )
 
 
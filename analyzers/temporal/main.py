@@ -61,4 +61,4 @@ def main(context: PrimaryAnalyzerContext):
         ]
     ).sort(OUTPUT_COL_TIME_INTERVAL_START)
 
-    df_output.write_parquet(context.output(OUTPUT_TABLE_INTERVAL_COUNT).parquet_path)
+    context.output(OUTPUT_TABLE_INTERVAL_COUNT).write(df_output)
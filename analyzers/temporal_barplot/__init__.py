@@ -1,8 +1,9 @@
-from analyzer_interface import WebPresenterDeclaration
+from analyzer_interface import WebPresenterDeclaration, lazy_entry_point
 
-from .factory import factory
 from .interface import interface
 
 temporal_barplot = WebPresenterDeclaration(
-    interface=interface, factory=factory, name=__name__
+    interface=interface,
+    factory=lazy_entry_point(".factory", "factory", package=__name__),
+    name=__name__,
 )
@@ -1,5 +1,4 @@
 import plotly.express as px
-import polars as pl
 from dash.dcc import Graph
 from dash.html import H2, Div, P
 
@@ -14,8 +13,8 @@ from ..temporal.interface import (
 
 
 def factory(context: WebPresenterContext):
-    df_interval_count = pl.read_parquet(
-        context.base.table(OUTPUT_TABLE_INTERVAL_COUNT).parquet_path
+    df_interval_count = context.read_table(
+        context.base.table(OUTPUT_TABLE_INTERVAL_COUNT)
     )
 
     fig = px.bar(
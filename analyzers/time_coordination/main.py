@@ -48,4 +48,4 @@ def main(context: PrimaryAnalyzerContext):
 
     # Materialize lazy processing
     df = df.collect()
-    df.write_parquet(context.output(OUTPUT_TABLE).parquet_path)
+    context.output(OUTPUT_TABLE).write(df)
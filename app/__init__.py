@@ -1,6 +1,5 @@
 from .analysis_context import AnalysisContext
 from .analysis_output_context import AnalysisOutputContext
-from .analysis_webserver_context import AnalysisWebServerContext
 from .app import App
 from .app_context import AppContext
 from .project_context import ProjectContext
@@ -1,19 +1,34 @@
+from contextlib import nullcontext
 from functools import cached_property
 from tempfile import TemporaryDirectory
 from typing import Literal
 
 from pydantic import BaseModel
 
-from analyzer_interface import AnalyzerDeclaration, SecondaryAnalyzerDeclaration
+from analyzer_interface import (
+    PARQUET_WRITE_PRESETS,
+    AnalyzerDeclaration,
+    SecondaryAnalyzerDeclaration,
+)
 from context import (
     InputColumnProvider,
     PrimaryAnalyzerContext,
     SecondaryAnalyzerContext,
 )
+from instrumentation import RunRecorder, measure, profile_stage
+from meta import get_version
+from preprocessing.series_semantic import identifier
 from storage import AnalysisModel
+from terminal_tools.progress import wrap_progress_blocks
 
 from .app_context import AppContext
-from .project_context import ProjectContext
+from .project_context import ProjectContext, UserInputColumn
+from .utils import count_output_rows
+
+MAX_ENCODED_UNIQUE_FRACTION = 0.5
+"""Identifier columns with more distinct values than this fraction of the rows,
+like message IDs, are not encoded; the dictionary would be as large as the
+column itself."""
 
 
 class AnalysisRunProgressEvent(BaseModel):
@@ -33,7 +48,7 @@ class AnalysisContext(BaseModel):
 
     @property
     def id(self):
-        return self.model.id
+        return self.model.analysis_id
 
     @property
     def analyzer_id(self):
@@ -84,44 +99,138 @@ class AnalysisContext(BaseModel):
             )
         )
 
+        recorder = RunRecorder(analyzer_id=self.analyzer_id, app_version=get_version())
+        try:
+            # Each progress block the analyzers show is measured as a block
+            with recorder.activate(), wrap_progress_blocks(measure):
+                yield from self._run_stages(secondary_analyzers)
+        finally:
+            # Also kept for failed runs, to show where they stopped
+            self.app_context.storage.save_analysis_run_report(
+                self.model, recorder.report
+            )
+
+        self.model.is_draft = False
+        self.app_context.storage.save_analysis(self.model)
+
+    def _run_stages(self, secondary_analyzers: list[SecondaryAnalyzerDeclaration]):
+        storage = self.app_context.storage
+        output_format = self.app_context.settings.analysis_output_format
+        parquet_write_options = self.parquet_write_options
         with TemporaryDirectory() as temp_dir:
             yield AnalysisRunProgressEvent(analyzer=self.analyzer_spec, event="start")
-            user_columns_by_name = {
-                user_column.name: user_column
-                for user_column in self.project_context.columns
-            }
-            analyzer_context = PrimaryAnalyzerContext(
-                analysis=self.model,
-                analyzer=self.analyzer_spec,
-                store=self.app_context.storage,
-                temp_dir=temp_dir,
-                input_columns={
-                    analyzer_column_name: InputColumnProvider(
-                        user_column_name=user_column_name,
-                        semantic=user_columns_by_name[user_column_name].semantic,
-                    )
-                    for analyzer_column_name, user_column_name in self.column_mapping.items()
-                },
-            )
-            analyzer_context.prepare()
-            self.analyzer_spec.entry_point(analyzer_context)
+            with measure(self.analyzer_spec.id, kind="stage") as stage:
+                stage.rows_in = self.project_context.data_row_count
+                user_columns_by_name = {
+                    user_column.name: user_column
+                    for user_column in self.project_context.columns
+                }
+                analyzer_context = PrimaryAnalyzerContext(
+                    analysis=self.model,
+                    analyzer=self.analyzer_spec,
+                    store=storage,
+                    temp_dir=temp_dir,
+                    output_format=output_format,
+                    parquet_write_options=parquet_write_options,
+                    input_columns={
+                        analyzer_column_name: self._get_input_column_provider(
+                            analyzer_column_name,
+                            user_columns_by_name[user_column_name],
+                        )
+                        for analyzer_column_name, user_column_name in self.column_mapping.items()
+                    },
+                )
+                analyzer_context.prepare()
+                with self._profile(self.analyzer_spec.id):
+                    self.analyzer_spec.entry_point(analyzer_context)
+                primary_output_rows = stage.rows_out = count_output_rows(
+                    storage.get_primary_output_path(self.model, output.id)
+                    for output in self.analyzer_spec.outputs
+                )
             yield AnalysisRunProgressEvent(analyzer=self.analyzer_spec, event="finish")
 
         for secondary in secondary_analyzers:
             yield AnalysisRunProgressEvent(analyzer=secondary, event="start")
-            with TemporaryDirectory() as temp_dir:
+            with TemporaryDirectory() as temp_dir, measure(
+                secondary.id, kind="stage"
+            ) as stage:
+                stage.rows_in = primary_output_rows
                 analyzer_context = SecondaryAnalyzerContext(
                     analysis=self.model,
                     secondary_analyzer=secondary,
                     temp_dir=temp_dir,
-                    store=self.app_context.storage,
+                    store=storage,
+                    output_format=output_format,
+                    parquet_write_options=parquet_write_options,
                 )
                 analyzer_context.prepare()
-                secondary.entry_point(analyzer_context)
+                with self._profile(secondary.id):
+                    secondary.entry_point(analyzer_context)
+                stage.rows_out = count_output_rows(
+                    storage.get_secondary_output_path(
+                        self.model, secondary.id, output.id
+                    )
+                    for output in secondary.outputs
+                )
             yield AnalysisRunProgressEvent(analyzer=secondary, event="finish")
 
-        self.model.is_draft = False
-        self.app_context.storage.save_analysis(self.model)
+    @property
+    def parquet_write_options(self):
+        """
+        How the analysis' parquet outputs and exports are encoded: by the preset
+        chosen for the analysis, or else the one in the settings.
+        """
+        if self.model.parquet_write_preset is not None:
+            return PARQUET_WRITE_PRESETS[self.model.parquet_write_preset]
+        return self.app_context.settings.parquet_write_options
+
+    def _profile(self, analyzer_id: str):
+        if not self.app_context.settings.profile_analyses:
+            return nullcontext()
+        return profile_stage(
+            self.app_context.storage._get_analysis_profiles_path(self.model),
+            analyzer_id,
+        )
+
+    def _get_input_column_provider(
+        self, analyzer_column_name: str, user_column: UserInputColumn
+    ):
+        analyzer_column = next(
+            column
+            for column in self.analyzer_spec.input.columns
+            if column.name == analyzer_column_name
+        )
+        # Only columns that the analyzer treats as opaque identifiers are
+        # encoded; text operations don't work on the encoded values.
+        should_encode = (
+            self.app_context.settings.encode_identifiers
+            and analyzer_column.data_type == "identifier"
+            and user_column.semantic is identifier
+            and not self._is_near_unique(user_column.name)
+        )
+        return InputColumnProvider(
+            user_column_name=user_column.name,
+            semantic=user_column.semantic,
+            dictionary=(
+                self.project_context.identifier_dictionary(
+                    user_column.name, user_column.semantic
+                )
+                if should_encode
+                else None
+            ),
+        )
+
+    def _is_near_unique(self, column_name: str):
+        profile = self.project_context.profile
+        column = next(
+            (column for column in profile.columns if column.name == column_name),
+            None,
+        )
+        return (
+            column is None
+            or column.approx_n_unique
+            > MAX_ENCODED_UNIQUE_FRACTION * max(profile.row_count, 1)
+        )
 
     @property
     def export_root_path(self):
@@ -1,14 +1,19 @@
 from functools import cached_property
 from typing import Literal, Optional
 
+import polars as pl
 from pydantic import BaseModel
 
 from analyzer_interface import AnalyzerOutput, SecondaryAnalyzerInterface
-from storage import SupportedOutputExtension
+from storage import (
+    MAX_EXPORT_PARTITIONS,
+    SupportedOutputExtension,
+    count_output_table_rows,
+    scan_output_table,
+)
 
 from .analysis_context import AnalysisContext
 from .app_context import AppContext
-from .utils import parquet_row_count
 
 
 class AnalysisOutputContext(BaseModel):
@@ -26,6 +31,7 @@ class AnalysisOutputContext(BaseModel):
         *,
         format: SupportedOutputExtension,
         chunk_size_override: Optional[int | Literal[False]] = None,
+        partition_by: Optional[str] = None,
     ):
         export_chunk_size = (
             self.app_context.settings.export_chunk_size
@@ -39,6 +45,8 @@ class AnalysisOutputContext(BaseModel):
                 extension=format,
                 spec=self.output_spec,
                 export_chunk_size=export_chunk_size,
+                partition_by=partition_by,
+                parquet_write_options=self.analysis_context.parquet_write_options,
             )
         else:
             return self.app_context.storage.export_project_secondary_output(
@@ -48,23 +56,80 @@ class AnalysisOutputContext(BaseModel):
                 extension=format,
                 spec=self.output_spec,
                 export_chunk_size=export_chunk_size,
+                partition_by=partition_by,
+                parquet_write_options=self.analysis_context.parquet_write_options,
             )
 
+    @property
+    def partitionable_columns(self):
+        """
+        The output columns whose type allows partitioning the export by them:
+        datetime columns (by day) and integer columns (by value). Whether they
+        have few enough distinct values is up to `partition_candidates`.
+        """
+        return [
+            column
+            for column in self.output_spec.columns
+            if column.data_type in ("datetime", "integer")
+        ]
+
+    @cached_property
+    def partition_candidates(self):
+        """
+        The `partitionable_columns` with few enough distinct values that each
+        partition is worth a directory; IDs and other high-cardinality columns
+        are left out. This scans the whole output, so it is only worth asking
+        for once the user wants to partition.
+        """
+        table = scan_output_table(self._table_path)
+        schema = table.collect_schema()
+        columns = [
+            column
+            for column in self.partitionable_columns
+            if column.name in schema
+            and (
+                column.data_type == "datetime"
+                and schema[column.name].is_temporal()
+                or column.data_type == "integer"
+                and schema[column.name].is_integer()
+            )
+        ]
+        if not columns:
+            return []
+
+        distinct_counts = (
+            table.select(
+                (
+                    pl.col(column.name).dt.date()
+                    if column.data_type == "datetime"
+                    else pl.col(column.name)
+                ).approx_n_unique()
+                for column in columns
+            )
+            .collect()
+            .row(0)
+        )
+        return [
+            column
+            for column, distinct_count in zip(columns, distinct_counts)
+            if distinct_count <= MAX_EXPORT_PARTITIONS
+        ]
+
     @cached_property
     def num_rows(
         self,
     ):
+        return count_output_table_rows(self._table_path)
+
+    @property
+    def _table_path(self):
         if self.secondary_spec is None:
-            return parquet_row_count(
-                self.app_context.storage.get_primary_output_parquet_path(
-                    self.analysis_context.model, self.output_spec.id
-                )
+            return self.app_context.storage.get_primary_output_path(
+                self.analysis_context.model, self.output_spec.id
             )
         else:
-            return parquet_row_count(
-                self.app_context.storage.get_secondary_output_parquet_path(
-                    self.analysis_context.model,
-                    self.secondary_spec.id,
-                    self.output_spec.id,
-                )
+            return self.app_context.storage.get_secondary_output_path(
+                self.analysis_context.model,
+                self.secondary_spec.id,
+                self.output_spec.id,
             )
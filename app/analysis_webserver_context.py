@@ -2,23 +2,28 @@ import logging
 import os.path
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Callable, Optional
 
 from dash import Dash
 from flask import Flask, render_template
 from pydantic import BaseModel
-from waitress import serve
 
 from context import WebPresenterContext
 
 from .analysis_context import AnalysisContext
 from .app_context import AppContext
+from .web_server import create_web_server, get_web_server_url
 
 
 class AnalysisWebServerContext(BaseModel):
     app_context: AppContext
     analysis_context: AnalysisContext
 
-    def start(self):
+    def start(self, on_listening: Optional[Callable[[str], None]] = None):
+        """
+        Serves the dashboards until interrupted. `on_listening` is called with
+        the server's URL once it is ready.
+        """
         containing_dir = str(Path(__file__).resolve().parent)
         static_folder = os.path.join(containing_dir, "web_static")
         template_folder = os.path.join(containing_dir, "web_templates")
@@ -69,8 +74,20 @@ class AnalysisWebServerContext(BaseModel):
         server_log.setLevel(logging.ERROR)
         server_log.disabled = True
 
+        settings = self.app_context.settings
         try:
-            serve(web_server, host="127.0.0.1", port=8050)
+            server = create_web_server(
+                web_server,
+                host=settings.web_server_host,
+                port=settings.web_server_port,
+                threads=settings.web_server_threads,
+            )
+            if on_listening is not None:
+                on_listening(get_web_server_url(server))
+            try:
+                server.run()
+            finally:
+                server.close()
         finally:
             server_log.setLevel(original_log_level)
             server_log.disabled = original_disabled
@@ -1,4 +1,5 @@
 from tempfile import NamedTemporaryFile
+from typing import Callable, Optional
 
 from pydantic import BaseModel
 
@@ -17,13 +18,25 @@ class App(BaseModel):
             for project in self.context.storage.list_projects()
         ]
 
-    def create_project(self, name: str, importer_session: ImporterSession):
+    def create_project(
+        self,
+        name: str,
+        importer_session: ImporterSession,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ):
         with NamedTemporaryFile(delete=False) as temp_file:
-            importer_session.import_as_parquet(temp_file.name)
+            importer_session.import_as_parquet(
+                temp_file.name,
+                progress_callback,
+                write_options=self.context.settings.parquet_write_options,
+            )
         project_model = self.context.storage.init_project(
             display_name=name, input_temp_file=temp_file.name
         )
-        return ProjectContext(model=project_model, app_context=self.context)
+        project = ProjectContext(model=project_model, app_context=self.context)
+        # Profile the columns right away, so that opening the project is quick
+        project.profile
+        return project
 
     @property
     def file_selector_state(self):
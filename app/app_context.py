@@ -16,3 +16,9 @@ class AppContext(BaseModel):
         from .settings_context import SettingsContext
 
         return SettingsContext(app_context=self)
+
+    @cached_property
+    def project_cache(self):
+        from .project_cache import ProjectCache
+
+        return ProjectCache(self.storage)
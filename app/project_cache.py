@@ -0,0 +1,47 @@
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+
+from storage import Storage
+
+T = TypeVar("T")
+
+
+class ProjectCache:
+    """
+    Keeps what the menus show about each project, like its preview and
+    profile, for as long as the app runs. Project contexts are created again
+    every time the projects are listed, so without it the same files would be
+    read again on every screen.
+
+    Entries are keyed by the project ID and the modification time of the
+    project's input file, so a project whose input is replaced is read again.
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+        self._entries: dict[tuple[str, str], tuple[Optional[int], object]] = {}
+        self._lock = Lock()
+
+    def get(self, project_id: str, name: str, load: Callable[[], T]) -> T:
+        """
+        Gets the project's value with the given name, calling `load` to produce
+        it if it isn't cached yet or the input has changed since. The returned
+        value is shared, so it must not be modified in place.
+        """
+        key = (project_id, name)
+        modified_time = self.storage.get_project_input_modified_time(project_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == modified_time:
+                return entry[1]
+
+        value = load()
+        with self._lock:
+            self._entries[key] = (modified_time, value)
+        return value
+
+    def discard(self, project_id: str):
+        """Forgets everything cached for the project."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == project_id]:
+                del self._entries[key]
@@ -1,13 +1,16 @@
 from functools import cached_property
+from typing import Optional
 
 import polars as pl
 from pydantic import BaseModel
 
+from analyzer_interface import ParquetWritePreset
 from analyzer_interface import UserInputColumn as BaseUserInputColumn
-from preprocessing.series_semantic import SeriesSemantic, infer_series_semantic
-from storage import AnalysisModel, ProjectModel
+from preprocessing.series_semantic import SeriesSemantic, get_semantic_by_name
+from storage import AnalysisModel, ProjectModel, ProjectProfile
 
 from .app_context import AppContext
+from .project_profile import PROJECT_PROFILE_VERSION, compute_project_profile
 
 
 class ProjectContext(BaseModel):
@@ -29,16 +32,27 @@ class ProjectContext(BaseModel):
 
     def delete(self):
         self.app_context.storage.delete_project(self.id)
+        self.app_context.project_cache.discard(self.id)
         self.is_deleted = True
 
-    def create_analysis(self, primary_analyzer_id: str, column_mapping: dict[str, str]):
+    def create_analysis(
+        self,
+        primary_analyzer_id: str,
+        column_mapping: dict[str, str],
+        *,
+        parquet_write_preset: Optional[ParquetWritePreset] = None,
+    ):
         assert not self.is_deleted, "Project is deleted"
 
         analyzer = self.app_context.suite.get_primary_analyzer(primary_analyzer_id)
         assert analyzer, f"Analyzer `{primary_analyzer_id}` not found"
 
         analysis_model = self.app_context.storage.init_analysis(
-            self.id, analyzer.name, primary_analyzer_id, column_mapping
+            self.id,
+            analyzer.name,
+            primary_analyzer_id,
+            column_mapping,
+            parquet_write_preset=parquet_write_preset,
         )
         return self._create_analysis_context(analysis_model)
 
@@ -59,24 +73,70 @@ class ProjectContext(BaseModel):
 
     @cached_property
     def preview_data(self):
-        return self.app_context.storage.load_project_input(self.id, n_records=100)
+        return self.app_context.project_cache.get(
+            self.id,
+            "preview_data",
+            lambda: self.app_context.storage.load_project_input(self.id, n_records=100),
+        )
 
     @cached_property
     def data_row_count(self):
-        return self.app_context.storage.get_project_input_stats(self.id).num_rows
+        return self.profile.row_count
+
+    @cached_property
+    def profile(self) -> ProjectProfile:
+        """
+        The column profile computed when the project was imported. Projects
+        imported before profiles existed, or with an outdated profile, are
+        profiled now and the result is saved.
+        """
+        return self.app_context.project_cache.get(
+            self.id, "profile", self._load_profile
+        )
+
+    def _load_profile(self):
+        storage = self.app_context.storage
+        profile = storage.load_project_profile(self.id)
+        if profile is None or profile.version != PROJECT_PROFILE_VERSION:
+            profile, sample = compute_project_profile(storage, self.id)
+            storage.save_project_profile(self.id, profile, sample)
+        return profile
+
+    @cached_property
+    def semantic_sample(self):
+        # Make sure that the profile, which is saved with the sample, exists
+        self.profile
+        return self.app_context.project_cache.get(
+            self.id,
+            "semantic_sample",
+            lambda: self.app_context.storage.load_project_profile_sample(self.id),
+        )
+
+    def identifier_dictionary(self, column_name: str, semantic: SeriesSemantic):
+        """
+        The project-wide dictionary that the column's converted values are
+        encoded with when passed to analyzers.
+        """
+        return self.app_context.storage.load_project_identifier_dictionary(
+            self.id, column_name, semantic.try_convert
+        )
 
     @cached_property
     def columns(self):
-        return _get_columns_with_semantic(self.preview_data)
+        return _get_columns_with_semantic(self.profile, self.semantic_sample)
 
 
-def _get_columns_with_semantic(df: pl.DataFrame):
+def _get_columns_with_semantic(profile: ProjectProfile, sample: pl.DataFrame):
     return [
         UserInputColumn(
-            name=col, data_type=semantic.data_type, semantic=semantic, data=df[col]
+            name=column.name,
+            data_type=semantic.data_type,
+            semantic=semantic,
+            data=sample[column.name],
         )
-        for col in df.columns
-        if (semantic := infer_series_semantic(df[col])) is not None
+        for column in profile.columns
+        if column.semantic_name is not None
+        and (semantic := get_semantic_by_name(column.semantic_name)) is not None
     ]
 
 
@@ -0,0 +1,91 @@
+import polars as pl
+
+from preprocessing.datetime_format import datetime_parse_failure_fraction
+from preprocessing.series_semantic import datetime_string, infer_dataframe_semantics
+from storage import ColumnProfile, ProjectProfile, Storage
+
+PROJECT_PROFILE_VERSION = 2
+"""Bump this when the profile contents change, so that saved profiles are
+computed again."""
+
+SEMANTIC_SAMPLE_SIZE = 1000
+"""The number of rows, drawn from across the dataset, that column semantics are
+inferred from."""
+
+MAX_PROFILE_VALUE_LENGTH = 100
+"""Longer minimum/maximum values are truncated in the profile."""
+
+
+def compute_project_profile(storage: Storage, project_id: str):
+    """
+    Profiles every column of the project input in a single streaming pass, and
+    infers the column semantics from a sample of rows spread across the dataset.
+
+    Returns the profile and the sample it was inferred from.
+    """
+    sample = storage.load_project_input_sample(
+        project_id, n_records=SEMANTIC_SAMPLE_SIZE
+    )
+    semantics = infer_dataframe_semantics(sample, sample_size=sample.height)
+
+    input_lf = storage.scan_project_input(project_id)
+    schema = input_lf.collect_schema()
+    stats = input_lf.select(
+        pl.len().alias("row_count"),
+        *(
+            expr
+            for name, dtype in schema.items()
+            for expr in _get_column_stats_exprs(name, dtype)
+        ),
+    ).collect(streaming=True)
+
+    def get_stat(name: str, stat: str):
+        column = f"{name}\0{stat}"
+        return stats[column].item() if column in stats.columns else None
+
+    profile = ProjectProfile(
+        version=PROJECT_PROFILE_VERSION,
+        row_count=stats["row_count"].item(),
+        columns=[
+            ColumnProfile(
+                name=name,
+                semantic_name=(
+                    semantic.semantic_name
+                    if (semantic := semantics[name]) is not None
+                    else None
+                ),
+                null_count=get_stat(name, "null_count"),
+                approx_n_unique=get_stat(name, "approx_n_unique"),
+                min=_present_value(get_stat(name, "min")),
+                max=_present_value(get_stat(name, "max")),
+                parse_failure_fraction=(
+                    datetime_parse_failure_fraction(sample[name])
+                    if semantics[name] is datetime_string
+                    else None
+                ),
+            )
+            for name in schema.names()
+        ],
+    )
+    return profile, sample
+
+
+def _get_column_stats_exprs(name: str, dtype: pl.DataType) -> list[pl.Expr]:
+    column = pl.col(name)
+    exprs = [
+        column.null_count().alias(f"{name}\0null_count"),
+        column.approx_n_unique().alias(f"{name}\0approx_n_unique"),
+    ]
+    if dtype.is_numeric() or dtype.is_temporal() or dtype == pl.String:
+        exprs.append(column.min().alias(f"{name}\0min"))
+        exprs.append(column.max().alias(f"{name}\0max"))
+    return exprs
+
+
+def _present_value(value):
+    if value is None:
+        return None
+    value = str(value)
+    if len(value) > MAX_PROFILE_VALUE_LENGTH:
+        return value[:MAX_PROFILE_VALUE_LENGTH] + "..."
+    return value
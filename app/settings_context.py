@@ -1,10 +1,24 @@
+import os
 from typing import Literal
 
 from pydantic import BaseModel
 
-from storage import SettingsModel
+from analyzer_interface import (
+    DEFAULT_PARQUET_WRITE_PRESET,
+    PARQUET_WRITE_PRESETS,
+    ParquetWritePreset,
+)
+from storage import OutputStorageFormat
 
 from .app_context import AppContext
+from .web_server import (
+    DEFAULT_WEB_SERVER_HOST,
+    DEFAULT_WEB_SERVER_PORT,
+    DEFAULT_WEB_SERVER_THREADS,
+)
+
+PROFILE_ENV_VAR = "MANGOTANGO_PROFILE"
+"""Setting this environment variable to 1 also turns on profiling analyses."""
 
 
 class SettingsContext(BaseModel):
@@ -15,6 +29,74 @@ class SettingsContext(BaseModel):
         return self.app_context.storage.get_settings().export_chunk_size
 
     def set_export_chunk_size(self, value: int | Literal[False]):
-        self.app_context.storage.save_settings(
-            **SettingsModel(export_chunk_size=value).model_dump()
+        self.app_context.storage.save_settings(export_chunk_size=value)
+
+    @property
+    def encode_identifiers(self):
+        return self.app_context.storage.get_settings().encode_identifiers
+
+    def set_encode_identifiers(self, value: bool):
+        self.app_context.storage.save_settings(encode_identifiers=value)
+
+    @property
+    def web_server_host(self) -> str:
+        return (
+            self.app_context.storage.get_settings().web_server_host
+            or DEFAULT_WEB_SERVER_HOST
         )
+
+    def set_web_server_host(self, value: str):
+        self.app_context.storage.save_settings(web_server_host=value)
+
+    @property
+    def web_server_port(self) -> int:
+        return (
+            self.app_context.storage.get_settings().web_server_port
+            or DEFAULT_WEB_SERVER_PORT
+        )
+
+    def set_web_server_port(self, value: int):
+        self.app_context.storage.save_settings(web_server_port=value)
+
+    @property
+    def web_server_threads(self) -> int:
+        return (
+            self.app_context.storage.get_settings().web_server_threads
+            or DEFAULT_WEB_SERVER_THREADS
+        )
+
+    def set_web_server_threads(self, value: int):
+        self.app_context.storage.save_settings(web_server_threads=value)
+
+    @property
+    def profile_analyses(self) -> bool:
+        return (
+            os.environ.get(PROFILE_ENV_VAR) == "1"
+            or self.app_context.storage.get_settings().profile_analyses
+        )
+
+    def set_profile_analyses(self, value: bool):
+        self.app_context.storage.save_settings(profile_analyses=value)
+
+    @property
+    def analysis_output_format(self) -> OutputStorageFormat:
+        return (
+            self.app_context.storage.get_settings().analysis_output_format or "parquet"
+        )
+
+    def set_analysis_output_format(self, value: OutputStorageFormat):
+        self.app_context.storage.save_settings(analysis_output_format=value)
+
+    @property
+    def parquet_write_preset(self) -> ParquetWritePreset:
+        return (
+            self.app_context.storage.get_settings().parquet_write_preset
+            or DEFAULT_PARQUET_WRITE_PRESET
+        )
+
+    @property
+    def parquet_write_options(self):
+        return PARQUET_WRITE_PRESETS[self.parquet_write_preset]
+
+    def set_parquet_write_preset(self, value: ParquetWritePreset):
+        self.app_context.storage.save_settings(parquet_write_preset=value)
@@ -0,0 +1,110 @@
+import contextlib
+import io
+import os
+
+import polars as pl
+import pytest
+
+from analyzer_interface import column_automap
+from analyzers import suite
+from benchmarks.dataset import SyntheticDatasetSpec, generate_dataset
+from importing.csv import CSVImporter
+from storage import Storage
+from storage.output_tables import OUTPUT_TABLE_EXTENSIONS
+
+from .app import App
+from .app_context import AppContext
+
+
+def _run_ngrams(data_dir: str, output_format: str, encode_identifiers: bool = False):
+    os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, "posts.csv")
+    generate_dataset(SyntheticDatasetSpec(rows=2_000, authors=100)).write_csv(csv_path)
+    storage = Storage(
+        app_name="MangoTango", app_author="Civic Tech DC", data_dir=data_dir
+    )
+    app = App(context=AppContext(storage=storage, suite=suite))
+    app.context.settings.set_analysis_output_format(output_format)
+    app.context.settings.set_encode_identifiers(encode_identifiers)
+
+    project = app.create_project("posts", CSVImporter().init_session(csv_path))
+    analyzer = suite.get_primary_analyzer("ngrams")
+    analysis = project.create_analysis(
+        analyzer.id, column_automap(project.columns, analyzer.input.columns)
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in analysis.run():
+            pass
+    return storage, analysis
+
+
+@pytest.mark.parametrize("output_format", ["arrow", "arrow_lz4"])
+def test_analysis_runs_with_arrow_outputs(tmp_path, output_format):
+    storage, analysis = _run_ngrams(str(tmp_path / output_format), output_format)
+    _, parquet_analysis = _run_ngrams(str(tmp_path / "parquet"), "parquet")
+
+    assert not analysis.is_draft
+    paths = [
+        storage.get_primary_output_path(analysis.model, output.id)
+        for output in analysis.analyzer_spec.outputs
+    ]
+    for secondary_id in storage.list_secondary_analyses(analysis.model):
+        for output in suite.get_secondary_analyzer_by_id(
+            analysis.analyzer_spec.id, secondary_id
+        ).outputs:
+            paths.append(
+                storage.get_secondary_output_path(
+                    analysis.model, secondary_id, output.id
+                )
+            )
+    assert "ngram_full" in "".join(paths)
+    for path in paths:
+        assert path.endswith(OUTPUT_TABLE_EXTENSIONS[output_format])
+
+    # Row counts go through the IPC footer, the exports through the batches
+    outputs = analysis.get_all_exportable_outputs()
+    parquet_outputs = parquet_analysis.get_all_exportable_outputs()
+    assert [output.num_rows for output in outputs] == [
+        output.num_rows for output in parquet_outputs
+    ]
+    for output in outputs:
+        export = output.export(format="csv")
+        try:
+            while True:
+                next(export)
+        except StopIteration as stop:
+            exported_path = stop.value
+        assert pl.read_csv(exported_path).height == output.num_rows
+
+
+def test_encoded_identifiers_are_stored_and_exported_as_text(tmp_path):
+    storage, analysis = _run_ngrams(
+        str(tmp_path / "encoded"), "parquet", encode_identifiers=True
+    )
+    plain_storage, plain_analysis = _run_ngrams(str(tmp_path / "plain"), "parquet")
+
+    for output in analysis.analyzer_spec.outputs:
+        stored = storage.load_project_primary_output(analysis.model, output.id)
+        plain = plain_storage.load_project_primary_output(
+            plain_analysis.model, output.id
+        )
+        assert stored.schema == plain.schema
+        assert stored.sort(stored.columns).equals(plain.sort(plain.columns))
+
+    for output in analysis.get_all_exportable_outputs():
+        for format in ["parquet", "arrow"]:
+            export = output.export(format=format)
+            try:
+                while True:
+                    next(export)
+            except StopIteration as stop:
+                exported_path = stop.value
+            exported = (
+                pl.read_parquet(exported_path)
+                if format == "parquet"
+                else pl.read_ipc(exported_path, memory_map=False)
+            )
+            assert not any(
+                isinstance(dtype, (pl.Categorical, pl.Enum))
+                for dtype in exported.dtypes
+            )
@@ -1,6 +1,15 @@
-import pyarrow.parquet as pq
+import os
+from typing import Iterable
 
+from storage import count_output_table_rows
 
-def parquet_row_count(filename: str):
-    with pq.ParquetFile(filename) as pf:
-        return pf.metadata.num_rows
+
+def count_output_rows(filenames: Iterable[str]):
+    """
+    Counts the rows of the output files, skipping outputs that weren't written.
+    """
+    return sum(
+        count_output_table_rows(filename)
+        for filename in filenames
+        if os.path.isfile(filename)
+    )
@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+DEFAULT_WEB_SERVER_HOST = "127.0.0.1"
+DEFAULT_WEB_SERVER_PORT = 8050
+DEFAULT_WEB_SERVER_THREADS = 8
+
+WILDCARD_HOSTS = ("", "0.0.0.0", "::")
+
+
+def create_web_server(
+    web_server: "Flask",
+    *,
+    host: str = DEFAULT_WEB_SERVER_HOST,
+    port: int = DEFAULT_WEB_SERVER_PORT,
+    threads: int = DEFAULT_WEB_SERVER_THREADS,
+):
+    """
+    Binds a multi-threaded waitress server for the Flask app, with compressed
+    responses. If the port is taken, for example by the dashboard of another
+    analysis, a free port is chosen instead. Call `run()` on the result to
+    serve.
+    """
+    # Imported here so that the settings can use the defaults above without
+    # loading the web server libraries at startup
+    from flask_compress import Compress
+    from waitress.server import create_server
+
+    Compress(web_server)
+    try:
+        return create_server(web_server, host=host, port=port, threads=threads)
+    except OSError:
+        return create_server(web_server, host=host, port=0, threads=threads)
+
+
+def get_web_server_url(server) -> str:
+    """
+    Gets the URL that a server made by `create_web_server` can be opened at.
+    """
+    if hasattr(server, "effective_listen"):
+        host, port = server.effective_listen[0]
+    else:
+        host, port = server.effective_host, server.effective_port
+    if host in WILDCARD_HOSTS:
+        host = "localhost"
+    elif ":" in host:
+        host = f"[{host}]"
+    return f"http://{host}:{port}/"
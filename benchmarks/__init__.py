@@ -0,0 +1,7 @@
+"""
+Benchmarks the analyzers on synthetic datasets. Run `python -m benchmarks
+--help` for the options.
+"""
+
+from .dataset import SyntheticDatasetSpec, generate_dataset
+from .harness import BenchmarkReport, DatasetBenchmark, compare_reports, run_benchmarks
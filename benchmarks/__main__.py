@@ -0,0 +1,93 @@
+import argparse
+
+from terminal_tools import print_ascii_table
+
+from .dataset import SyntheticDatasetSpec
+from .harness import BenchmarkReport, compare_reports, run_benchmarks
+
+
+def main():
+    defaults = SyntheticDatasetSpec()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Runs the analyzers on synthetic datasets and reports the "
+        "time and memory each stage takes.",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="The dataset sizes to benchmark (default: 10000 100000)",
+    )
+    parser.add_argument("--authors", type=int, default=defaults.authors)
+    parser.add_argument("--vocabulary", type=int, default=defaults.vocabulary)
+    parser.add_argument("--hashtags", type=int, default=defaults.hashtags)
+    parser.add_argument(
+        "--hashtag-probability", type=float, default=defaults.hashtag_probability
+    )
+    parser.add_argument("--burstiness", type=float, default=defaults.burstiness)
+    parser.add_argument(
+        "--copy-paste-fraction", type=float, default=defaults.copy_paste_fraction
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--analyzers",
+        nargs="+",
+        metavar="ANALYZER_ID",
+        help="Only benchmark these primary analyzers (default: all)",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark_report.json",
+        help="Where to write the report (default: benchmark_report.json)",
+    )
+    parser.add_argument(
+        "--baseline", help="A previous report to compare the results with"
+    )
+    args = parser.parse_args()
+
+    specs = [
+        SyntheticDatasetSpec(
+            rows=rows,
+            authors=args.authors,
+            vocabulary=args.vocabulary,
+            hashtags=args.hashtags,
+            hashtag_probability=args.hashtag_probability,
+            burstiness=args.burstiness,
+            copy_paste_fraction=args.copy_paste_fraction,
+            seed=args.seed,
+        )
+        for rows in args.rows
+    ]
+    report = run_benchmarks(specs, analyzer_ids=args.analyzers)
+    with open(args.output, "w", encoding="utf8") as file:
+        file.write(report.model_dump_json(indent=2))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf8") as file:
+            baseline = BenchmarkReport.model_validate_json(file.read())
+
+    print_ascii_table(
+        [
+            [
+                f"{spec.rows:,}",
+                stage.name,
+                f"{stage.wall_seconds:.2f}s",
+                f"{stage.peak_rss_bytes / (1 << 20):,.0f} MB",
+                (
+                    f"{stage.wall_seconds / baseline_stage.wall_seconds - 1:+.0%}"
+                    if baseline_stage is not None and baseline_stage.wall_seconds
+                    else ""
+                ),
+            ]
+            for spec, stage, baseline_stage in compare_reports(report, baseline)
+        ],
+        header=["Rows", "Stage", "Time", "Peak memory", "Time vs baseline"],
+    )
+    print(f"The full report is in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+from pydantic import BaseModel
+
+COL_MESSAGE_ID = "message_id"
+COL_AUTHOR = "author"
+COL_TEXT = "text"
+COL_HASHTAGS = "hashtags"
+COL_TIMESTAMP = "timestamp"
+
+
+class SyntheticDatasetSpec(BaseModel):
+    """
+    Describes a synthetic social media dataset. Authors, words and hashtags are
+    drawn from Zipf-like distributions, as they are in real data, so that a few
+    are very common and most are rare.
+    """
+
+    rows: int = 100_000
+    authors: int = 5_000
+    vocabulary: int = 20_000
+    """The number of distinct words in the messages."""
+    min_words: int = 5
+    max_words: int = 30
+    hashtags: int = 500
+    """The number of distinct hashtags."""
+    hashtag_probability: float = 0.3
+    """The fraction of messages that have any hashtags."""
+    max_hashtags_per_message: int = 3
+    zipf_exponent: float = 1.1
+    """How skewed the author, word and hashtag distributions are."""
+    duration_days: int = 30
+    burstiness: float = 0.2
+    """The fraction of messages posted within short bursts of activity."""
+    bursts: int = 20
+    copy_paste_fraction: float = 0.05
+    """The fraction of messages that repeat one of a few campaign texts."""
+    campaign_texts: int = 50
+    seed: int = 0
+
+    @property
+    def name(self):
+        return f"synthetic_{self.rows}_rows"
+
+
+def generate_dataset(spec: SyntheticDatasetSpec) -> pl.DataFrame:
+    """
+    Generates the dataset, with the message ID, author, text, hashtags and
+    timestamp columns. Hashtags are formatted like `['tag1', 'tag2']`, as in
+    the sample data. The same spec always generates the same dataset.
+    """
+    rng = np.random.default_rng(spec.seed)
+    words = pl.Series([_make_word(rng, i) for i in range(spec.vocabulary)])
+
+    texts = _generate_texts(rng, spec, words, spec.rows)
+    campaign_texts = _generate_texts(rng, spec, words, spec.campaign_texts)
+    is_campaign = rng.random(spec.rows) < spec.copy_paste_fraction
+    texts = (
+        pl.select(
+            pl.when(pl.lit(is_campaign))
+            .then(
+                campaign_texts.gather(rng.integers(0, spec.campaign_texts, spec.rows))
+            )
+            .otherwise(texts)
+        )
+        .to_series()
+        .alias(COL_TEXT)
+    )
+
+    return pl.DataFrame(
+        {
+            COL_MESSAGE_ID: pl.int_range(spec.rows, eager=True).cast(pl.String),
+            COL_AUTHOR: pl.Series(
+                _zipf_indices(rng, spec.authors, spec.rows, spec.zipf_exponent)
+            ).cast(pl.String),
+            COL_TEXT: texts,
+            COL_HASHTAGS: _generate_hashtags(rng, spec),
+            COL_TIMESTAMP: _generate_timestamps(rng, spec),
+        }
+    ).with_columns(
+        ("m" + pl.col(COL_MESSAGE_ID)).alias(COL_MESSAGE_ID),
+        ("user" + pl.col(COL_AUTHOR)).alias(COL_AUTHOR),
+    )
+
+
+def _generate_texts(
+    rng: np.random.Generator, spec: SyntheticDatasetSpec, words: pl.Series, n: int
+) -> pl.Series:
+    word_indices = _zipf_indices(
+        rng, spec.vocabulary, n * spec.max_words, spec.zipf_exponent
+    )
+    lengths = rng.integers(spec.min_words, spec.max_words + 1, n)
+    return pl.select(
+        words.gather(word_indices)
+        .reshape((n, spec.max_words))
+        .arr.to_list()
+        .list.head(pl.lit(lengths))
+        .list.join(" ")
+    ).to_series()
+
+
+def _generate_hashtags(
+    rng: np.random.Generator, spec: SyntheticDatasetSpec
+) -> pl.Series:
+    max_count = spec.max_hashtags_per_message
+    tag_indices = _zipf_indices(
+        rng, spec.hashtags, spec.rows * max_count, spec.zipf_exponent
+    )
+    counts = np.where(
+        rng.random(spec.rows) < spec.hashtag_probability,
+        rng.integers(1, max_count + 1, spec.rows),
+        0,
+    )
+    tags = (
+        ("tag" + pl.Series(tag_indices).cast(pl.String))
+        .reshape((spec.rows, max_count))
+        .arr.to_list()
+        .list.head(pl.lit(counts))
+    )
+    return pl.select(
+        pl.when(tags.list.len() == 0)
+        .then(pl.lit("[]"))
+        .otherwise("['" + tags.list.join("', '") + "']")
+    ).to_series()
+
+
+def _generate_timestamps(
+    rng: np.random.Generator, spec: SyntheticDatasetSpec
+) -> pl.Series:
+    start = datetime(2024, 1, 1)
+    duration = timedelta(days=spec.duration_days).total_seconds()
+    offsets = rng.random(spec.rows) * duration
+
+    # Bursts last about ten minutes around a random moment
+    burst_centers = rng.random(spec.bursts) * duration
+    in_burst = rng.random(spec.rows) < spec.burstiness
+    burst_offsets = burst_centers[rng.integers(0, spec.bursts, spec.rows)] + rng.normal(
+        0, 300, spec.rows
+    )
+    offsets = np.clip(np.where(in_burst, burst_offsets, offsets), 0, duration)
+
+    return (
+        pl.select(pl.lit(start) + pl.duration(seconds=pl.lit(offsets.astype(np.int64))))
+        .to_series()
+        .dt.strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+
+def _zipf_indices(
+    rng: np.random.Generator, n: int, size: int, exponent: float
+) -> np.ndarray:
+    """
+    Draws indices below `n`, with the probability of index `i` proportional to
+    `1 / (i + 1) ** exponent`.
+    """
+    weights = 1 / np.arange(1, n + 1) ** exponent
+    return rng.choice(n, size=size, p=weights / weights.sum())
+
+
+def _make_word(rng: np.random.Generator, index: int) -> str:
+    # Common words are short, like in natural language
+    length = 2 + min(int(np.log2(index + 1)), 10) // 2 + rng.integers(0, 3)
+    return "".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz"), length))
@@ -0,0 +1,111 @@
+import contextlib
+import io
+import os
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from typing import Optional
+
+from pydantic import BaseModel
+
+from analyzer_interface import column_automap
+from analyzers import suite
+from app import App, AppContext
+from importing.csv import CSVImporter
+from instrumentation import RunRecorder, RunReport, measure
+from meta import get_version
+from storage import Storage
+
+from .dataset import SyntheticDatasetSpec, generate_dataset
+
+
+class DatasetBenchmark(BaseModel):
+    spec: SyntheticDatasetSpec
+    csv_bytes: int
+    import_report: RunReport
+    """Importing the CSV file and profiling the project's columns."""
+    runs: list[RunReport] = []
+
+
+class BenchmarkReport(BaseModel):
+    app_version: Optional[str]
+    started_at: datetime
+    datasets: list[DatasetBenchmark] = []
+
+
+def run_benchmarks(
+    specs: list[SyntheticDatasetSpec],
+    *,
+    analyzer_ids: Optional[list[str]] = None,
+) -> BenchmarkReport:
+    """
+    Generates each dataset, imports it into a throwaway app data directory as
+    a user would import a CSV file, and runs the primary analyzers (with their
+    secondary analyzers) on it, collecting the run reports. The columns are
+    mapped the way the app suggests, so analyzers whose columns can't be
+    mapped are skipped.
+    """
+    report = BenchmarkReport(app_version=get_version(), started_at=datetime.now())
+    for spec in specs:
+        with TemporaryDirectory() as data_dir:
+            report.datasets.append(_benchmark_dataset(spec, data_dir, analyzer_ids))
+    return report
+
+
+def _benchmark_dataset(
+    spec: SyntheticDatasetSpec, data_dir: str, analyzer_ids: Optional[list[str]]
+):
+    csv_path = os.path.join(data_dir, f"{spec.name}.csv")
+    generate_dataset(spec).write_csv(csv_path)
+
+    storage = Storage(
+        app_name="MangoTango", app_author="Civic Tech DC", data_dir=data_dir
+    )
+    app = App(context=AppContext(storage=storage, suite=suite))
+
+    import_recorder = RunRecorder(analyzer_id="import", app_version=get_version())
+    with import_recorder.activate(), measure("import", kind="stage"):
+        importer_session = CSVImporter().init_session(csv_path)
+        assert importer_session is not None, "The generated CSV can't be read"
+        project = app.create_project(spec.name, importer_session)
+    benchmark = DatasetBenchmark(
+        spec=spec,
+        csv_bytes=os.path.getsize(csv_path),
+        import_report=import_recorder.report,
+    )
+
+    for analyzer in suite.primary_anlyzers:
+        if analyzer_ids is not None and analyzer.id not in analyzer_ids:
+            continue
+        column_mapping = column_automap(project.columns, analyzer.input.columns)
+        if len(column_mapping) < len(analyzer.input.columns):
+            continue
+        analysis = project.create_analysis(analyzer.id, column_mapping)
+        # Analyzers print previews and progress, which would bury the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in analysis.run():
+                pass
+        benchmark.runs.append(storage.load_analysis_run_report(analysis.model))
+    return benchmark
+
+
+def compare_reports(report: BenchmarkReport, baseline: Optional[BenchmarkReport]):
+    """
+    Pairs each stage of the report with the same stage of the same dataset in
+    the baseline, if there is one.
+    """
+    baseline_stages = {
+        (dataset.spec.model_dump_json(), stage.name): stage
+        for dataset in (baseline.datasets if baseline is not None else [])
+        for run in [dataset.import_report, *dataset.runs]
+        for stage in run.stages
+    }
+    return [
+        (
+            dataset.spec,
+            stage,
+            baseline_stages.get((dataset.spec.model_dump_json(), stage.name)),
+        )
+        for dataset in report.datasets
+        for run in [dataset.import_report, *dataset.runs]
+        for stage in run.stages
+    ]
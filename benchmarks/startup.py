@@ -0,0 +1,193 @@
+"""
+Measures how long the app takes to show the splash screen and the main menu,
+from source or as a built executable. Run `python -m benchmarks.startup
+--help` for the options.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Timer
+from typing import Optional
+
+from pydantic import BaseModel
+
+from instrumentation import STARTUP_BENCHMARK_ENV_VAR, STARTUP_MILESTONE_PREFIX
+from meta import get_version
+from terminal_tools import print_ascii_table
+
+STARTUP_MILESTONES = ["splash", "menu"]
+
+STARTUP_TIMEOUT_SECONDS = 120
+"""How long a single start may take before the benchmark gives up."""
+
+SOURCE_ENTRY_POINT = str(Path(__file__).resolve().parent.parent / "mangotango.py")
+
+
+class StartupBenchmark(BaseModel):
+    build: str
+    """`source`, or the path of the executable."""
+    splash_seconds: list[float] = []
+    menu_seconds: list[float] = []
+
+    @property
+    def median_splash_seconds(self):
+        return statistics.median(self.splash_seconds)
+
+    @property
+    def median_menu_seconds(self):
+        return statistics.median(self.menu_seconds)
+
+
+class StartupBenchmarkReport(BaseModel):
+    app_version: Optional[str]
+    started_at: datetime
+    builds: list[StartupBenchmark] = []
+
+
+def measure_startup(command: list[str]) -> dict[str, float]:
+    """
+    Starts the app and measures the seconds until it reaches each startup
+    milestone. The time is measured from outside of the app's process, so it
+    includes starting the interpreter and, for the one-file executable,
+    unpacking it.
+    """
+    env = {**os.environ, STARTUP_BENCHMARK_ENV_VAR: "1"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env,
+        text=True,
+    )
+    # Builds that predate the benchmark would wait at the splash screen
+    timeout = Timer(STARTUP_TIMEOUT_SECONDS, process.kill)
+    timeout.start()
+    milestones: dict[str, float] = {}
+    other_output: list[str] = []
+    try:
+        for line in process.stderr:
+            if line.startswith(STARTUP_MILESTONE_PREFIX):
+                name = line[len(STARTUP_MILESTONE_PREFIX) :].strip()
+                milestones[name] = time.perf_counter() - start
+            else:
+                other_output.append(line)
+        process.wait()
+    finally:
+        timeout.cancel()
+
+    missing = [name for name in STARTUP_MILESTONES if name not in milestones]
+    if missing:
+        raise RuntimeError(
+            f"{' '.join(command)} exited before reaching the {missing[0]} "
+            f"milestone:\n{''.join(other_output[-20:])}"
+        )
+    return milestones
+
+
+def run_startup_benchmark(build: str, command: list[str], runs: int):
+    benchmark = StartupBenchmark(build=build)
+    for _ in range(runs):
+        milestones = measure_startup(command)
+        benchmark.splash_seconds.append(milestones["splash"])
+        benchmark.menu_seconds.append(milestones["menu"])
+    return benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Measures the time from launching the app to the splash "
+        "screen and to the main menu. Exits with an error if a limit is "
+        "exceeded, so that it can gate releases.",
+    )
+    parser.add_argument(
+        "--executable",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Also measure this built executable, like dist/mangotango or "
+        "dist/mangotango/mangotango for the one-folder build. Can be repeated.",
+    )
+    parser.add_argument(
+        "--no-source",
+        action="store_true",
+        help="Don't measure starting from source",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="How many times to start each build; the median is reported "
+        "(default: 5)",
+    )
+    parser.add_argument(
+        "--max-splash-seconds",
+        type=float,
+        help="Fail if the median time to the splash screen of any build is longer",
+    )
+    parser.add_argument(
+        "--max-menu-seconds",
+        type=float,
+        help="Fail if the median time to the main menu of any build is longer",
+    )
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    builds = (
+        [] if args.no_source else [("source", [sys.executable, SOURCE_ENTRY_POINT])]
+    )
+    builds += [(executable, [executable]) for executable in args.executable]
+    if not builds:
+        parser.error("There is nothing to measure")
+
+    report = StartupBenchmarkReport(
+        app_version=get_version(),
+        started_at=datetime.now(),
+        builds=[
+            run_startup_benchmark(build, command, args.runs)
+            for build, command in builds
+        ],
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as file:
+            file.write(report.model_dump_json(indent=2))
+
+    print_ascii_table(
+        [
+            [
+                benchmark.build,
+                f"{benchmark.median_splash_seconds:.2f}s",
+                f"{min(benchmark.splash_seconds):.2f}s",
+                f"{benchmark.median_menu_seconds:.2f}s",
+                f"{min(benchmark.menu_seconds):.2f}s",
+            ]
+            for benchmark in report.builds
+        ],
+        header=["Build", "Splash", "Splash (best)", "Menu", "Menu (best)"],
+    )
+
+    failures = [
+        f"{benchmark.build} took {seconds:.2f}s to reach the {milestone}, "
+        f"more than {limit:.2f}s"
+        for benchmark in report.builds
+        for milestone, seconds, limit in [
+            ("splash screen", benchmark.median_splash_seconds, args.max_splash_seconds),
+            ("main menu", benchmark.median_menu_seconds, args.max_menu_seconds),
+        ]
+        if limit is not None and seconds > limit
+    ]
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import os
+import sys
+from typing import get_args
+
+from analyzer_interface import PARQUET_WRITE_PRESETS, column_automap
+from analyzers import suite
+from app import AnalysisContext, App, AppContext, ProjectContext
+from importing import importers
+from importing.stream import strip_compression_extension
+from storage import Storage, SupportedOutputExtension
+
+EXPORT_FORMATS: list[str] = list(get_args(SupportedOutputExtension))
+
+
+class CliError(Exception):
+    """An error that is reported to the user without a traceback."""
+
+
+def run_cli(argv: list[str]) -> int:
+    """
+    Runs the non-interactive command line, for scripts and scheduled jobs.
+    Returns the exit code.
+    """
+    args = _create_parser().parse_args(argv)
+    storage = Storage(
+        app_name="MangoTango", app_author="Civic Tech DC", data_dir=args.data_dir
+    )
+    app = App(context=AppContext(storage=storage, suite=suite))
+    try:
+        args.command(app, args)
+    except CliError as ex:
+        print(f"Error: {ex}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _create_parser():
+    parser = argparse.ArgumentParser(
+        prog="mangotango",
+        description="Runs Mango Tango without the interactive menus. Start it "
+        "without arguments for the interactive app.",
+    )
+    parser.add_argument(
+        "--data-dir",
+        help="Keep the projects in this directory instead of the app's data "
+        "directory, for example to run jobs in parallel",
+    )
+    subparsers = parser.add_subparsers(required=True, metavar="COMMAND")
+
+    list_parser = subparsers.add_parser(
+        "list", help="List the analyzers, projects, or a project's analyses"
+    )
+    list_parser.add_argument("what", choices=["analyzers", "projects", "analyses"])
+    list_parser.add_argument("--project", help="The project whose analyses to list")
+    list_parser.set_defaults(command=_list)
+
+    import_parser = subparsers.add_parser(
+        "import", help="Create a project from a dataset file"
+    )
+    import_parser.add_argument("file", help="A CSV, JSON Lines, Excel or Parquet file")
+    import_parser.add_argument(
+        "--name", help="The project name (default: the file name)"
+    )
+    import_parser.set_defaults(command=_import)
+
+    analyze_parser = subparsers.add_parser(
+        "analyze", help="Run an analyzer on a project"
+    )
+    analyze_parser.add_argument("--project", required=True, help="The project ID")
+    analyze_parser.add_argument(
+        "--analyzer", required=True, help="The primary analyzer ID"
+    )
+    analyze_parser.add_argument(
+        "--column",
+        action="append",
+        default=[],
+        metavar="ANALYZER_COLUMN=PROJECT_COLUMN",
+        help="Map an analyzer input column to a project column; the others are "
+        "mapped automatically by name",
+    )
+    analyze_parser.add_argument(
+        "--export",
+        choices=EXPORT_FORMATS,
+        metavar="FORMAT",
+        help="Also export the outputs in this format when done",
+    )
+    analyze_parser.add_argument(
+        "--parquet-preset",
+        choices=list(PARQUET_WRITE_PRESETS),
+        help="How the parquet outputs and exports of this analysis are encoded "
+        "(default: the preset in the settings, or balanced)",
+    )
+    analyze_parser.set_defaults(command=_analyze)
+
+    export_parser = subparsers.add_parser(
+        "export", help="Export the outputs of an analysis"
+    )
+    export_parser.add_argument("--project", required=True, help="The project ID")
+    export_parser.add_argument("--analysis", required=True, help="The analysis ID")
+    export_parser.add_argument(
+        "--format", required=True, choices=EXPORT_FORMATS, metavar="FORMAT"
+    )
+    export_parser.set_defaults(command=_export)
+    return parser
+
+
+def _list(app: App, args: argparse.Namespace):
+    if args.what == "analyzers":
+        for analyzer in app.context.suite.primary_anlyzers:
+            print(f"{analyzer.id}\t{analyzer.name}")
+    elif args.what == "projects":
+        for project in app.list_projects():
+            print(f"{project.id}\t{project.display_name}")
+    else:
+        if args.project is None:
+            raise CliError("Listing analyses needs --project")
+        for analysis in _find_project(app, args.project).list_analyses():
+            status = "draft" if analysis.is_draft else "done"
+            print(
+                f"{analysis.id}\t{analysis.analyzer_id}\t{status}\t"
+                f"{analysis.display_name}"
+            )
+
+
+def _import(app: App, args: argparse.Namespace):
+    importer = next(
+        (importer for importer in importers if importer.suggest(args.file)), None
+    )
+    if importer is None:
+        raise CliError(f"The format of {args.file} isn't supported")
+    session = importer.init_session(args.file)
+    if session is None:
+        raise CliError(f"{args.file} couldn't be read as {importer.name}")
+    project = app.create_project(
+        args.name or _get_default_project_name(args.file), session
+    )
+    print(project.id)
+
+
+def _analyze(app: App, args: argparse.Namespace):
+    project = _find_project(app, args.project)
+    analyzer = app.context.suite.get_primary_analyzer(args.analyzer)
+    if analyzer is None:
+        raise CliError(f"There is no analyzer {args.analyzer}")
+
+    column_mapping = column_automap(project.columns, analyzer.input.columns)
+    project_column_names = {column.name for column in project.columns}
+    analyzer_column_names = {column.name for column in analyzer.input.columns}
+    for column_argument in args.column:
+        analyzer_column, _, project_column = column_argument.partition("=")
+        if analyzer_column not in analyzer_column_names:
+            raise CliError(f"{analyzer.id} has no input column {analyzer_column}")
+        if project_column not in project_column_names:
+            raise CliError(f"The project has no column {project_column}")
+        column_mapping[analyzer_column] = project_column
+    unmapped_columns = analyzer_column_names - column_mapping.keys()
+    if unmapped_columns:
+        raise CliError(
+            f"No project column was found for {', '.join(sorted(unmapped_columns))}; "
+            "map them with --column"
+        )
+
+    analysis = project.create_analysis(
+        analyzer.id, column_mapping, parquet_write_preset=args.parquet_preset
+    )
+    # Only the results go to stdout, so that scripts can read them
+    with contextlib.redirect_stdout(sys.stderr):
+        for event in analysis.run():
+            print(f"{event.event.capitalize()} {event.analyzer.name}")
+    print(analysis.id)
+
+    if args.export is not None:
+        _export_outputs(analysis, args.export)
+
+
+def _export(app: App, args: argparse.Namespace):
+    project = _find_project(app, args.project)
+    analysis = next(
+        (
+            analysis
+            for analysis in project.list_analyses()
+            if analysis.id == args.analysis
+        ),
+        None,
+    )
+    if analysis is None:
+        raise CliError(f"The project has no analysis {args.analysis}")
+    if analysis.is_draft:
+        raise CliError(f"The analysis {args.analysis} hasn't finished running")
+    _export_outputs(analysis, args.format)
+
+
+def _export_outputs(analysis: AnalysisContext, format: str):
+    for output in analysis.get_all_exportable_outputs():
+        export = output.export(format=format)
+        try:
+            while True:
+                next(export)
+        except StopIteration as stop:
+            print(stop.value)
+
+
+def _find_project(app: App, project_id: str) -> ProjectContext:
+    project = next(
+        (project for project in app.list_projects() if project.id == project_id),
+        None,
+    )
+    if project is None:
+        raise CliError(f"There is no project {project_id}")
+    return project
+
+
+def _get_default_project_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(strip_compression_extension(path)))[0]
@@ -56,10 +56,13 @@ def analysis_main(context: ViewContext, analysis: AnalysisContext):
 
         if action == "web_server":
             server = analysis.web_server()
-            print("Web server will run at http://localhost:8050/")
-            print("Stop it with Ctrl+C")
+
+            def on_listening(url: str):
+                print(f"Web server is running at {url}")
+                print("Stop it with Ctrl+C")
+
             try:
-                server.start()
+                server.start(on_listening)
             except KeyboardInterrupt:
                 pass
             print("Web server stopped")
@@ -5,9 +5,15 @@ from pathlib import Path
 
 from dash import Dash
 from flask import Flask, render_template
-from waitress import serve
 
 from analyzer_interface.suite import AnalyzerSuite
+from app.web_server import (
+    DEFAULT_WEB_SERVER_HOST,
+    DEFAULT_WEB_SERVER_PORT,
+    DEFAULT_WEB_SERVER_THREADS,
+    create_web_server,
+    get_web_server_url,
+)
 from context import WebPresenterContext
 from storage import AnalysisModel, Storage
 from terminal_tools import wait_for_key
@@ -67,17 +73,26 @@ def analysis_web_server(
             analyzer_name=analyzer.name,
         )
 
-    print("Web server will run at http://localhost:8050/")
-    print("Stop it with Ctrl+C")
-
     server_log = logging.getLogger("waitress")
     original_log_level = server_log.level
     original_disabled = server_log.disabled
     server_log.setLevel(logging.ERROR)
     server_log.disabled = True
 
+    settings = storage.get_settings()
     try:
-        serve(web_server, host="127.0.0.1", port=8050)
+        server = create_web_server(
+            web_server,
+            host=settings.web_server_host or DEFAULT_WEB_SERVER_HOST,
+            port=settings.web_server_port or DEFAULT_WEB_SERVER_PORT,
+            threads=settings.web_server_threads or DEFAULT_WEB_SERVER_THREADS,
+        )
+        print(f"Web server is running at {get_web_server_url(server)}")
+        print("Stop it with Ctrl+C")
+        try:
+            server.run()
+        finally:
+            server.close()
     except Exception as ex:
         print(ex)
         wait_for_key(True)
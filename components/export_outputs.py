@@ -1,7 +1,8 @@
 import os
+from typing import Optional
 
 from app import AnalysisContext, AnalysisOutputContext
-from storage import SupportedOutputExtension
+from storage import PARTITIONABLE_OUTPUT_EXTENSIONS, SupportedOutputExtension
 from terminal_tools import (
     ProgressReporter,
     open_directory_explorer,
@@ -46,7 +47,7 @@ def export_outputs(context: ViewContext, analysis: AnalysisContext):
             return
 
         scope.refresh()
-        format = export_format_prompt()
+        format = export_format_prompt(analysis)
         if format is None:
             print("Export cancelled")
             wait_for_key(True)
@@ -62,7 +63,17 @@ def export_outputs_sequence(
     selected_outputs: list[AnalysisOutputContext],
     format: SupportedOutputExtension,
 ):
-    has_large_dfs = any(output.num_rows > 50_000 for output in selected_outputs)
+    partitions = partition_prompt(selected_outputs, format)
+    if partitions is None:
+        print("Export cancelled")
+        wait_for_key(True)
+        return
+
+    has_large_dfs = any(
+        output.num_rows > 50_000
+        for output, partition_by in zip(selected_outputs, partitions)
+        if partition_by is None
+    )
 
     settings = context.app.context.settings
     if has_large_dfs:
@@ -99,11 +110,13 @@ def export_outputs_sequence(
                     break
 
     print("Beginning export...")
-    for selected_output in selected_outputs:
+    for selected_output, partition_by in zip(selected_outputs, partitions):
         with ProgressReporter(
             f"Exporting {selected_output.descriptive_qualified_name}"
         ) as progress:
-            export_progress = selected_output.export(format=format)
+            export_progress = selected_output.export(
+                format=format, partition_by=partition_by
+            )
             try:
                 while True:
                     progress.update(next(export_progress))
@@ -124,13 +137,86 @@ def export_outputs_sequence(
     wait_for_key(True)
 
 
-def export_format_prompt():
+def export_format_prompt(analysis: AnalysisContext):
+    parquet_compression = analysis.parquet_write_options.compression
     return prompts.list_input(
         "Choose an export format",
         choices=[
             ("CSV", "csv"),
+            ("CSV, gzip compressed (.csv.gz)", "csv.gz"),
+            ("CSV, zstd compressed (.csv.zst)", "csv.zst"),
             ("Excel", "xlsx"),
             ("JSON", "json"),
+            ("JSON Lines (one record per line)", "ndjson"),
+            (
+                (
+                    "Parquet"
+                    if parquet_compression == "uncompressed"
+                    else f"Parquet ({parquet_compression} compressed)"
+                ),
+                "parquet",
+            ),
+            ("Arrow IPC / Feather", "arrow"),
             ("(Back)", None),
         ],
     )
+
+
+def partition_prompt(
+    outputs: list[AnalysisOutputContext], format: SupportedOutputExtension
+) -> Optional[list[Optional[str]]]:
+    """
+    Asks whether, and by which column, each output should be split into
+    Hive-style partition directories.
+
+    Returns the partition column (or None) for each output, or None if the user
+    cancels.
+    """
+    no_partitions = [None] * len(outputs)
+    if format not in PARTITIONABLE_OUTPUT_EXTENSIONS or not any(
+        output.partitionable_columns for output in outputs
+    ):
+        return no_partitions
+
+    should_partition = prompts.confirm(
+        "Would you like to split outputs into folders, e.g. one per day?",
+        default=False,
+        cancel_fallback=None,
+    )
+    if should_partition is None:
+        return None
+    if not should_partition:
+        return no_partitions
+
+    partitions: list[Optional[str]] = []
+    for output in outputs:
+        if not output.partitionable_columns:
+            partitions.append(None)
+            continue
+        if not output.partition_candidates:
+            print(
+                f"{output.descriptive_qualified_name} has no date or number "
+                "column with few enough distinct values to split by."
+            )
+            partitions.append(None)
+            continue
+
+        partition_by = prompts.list_input(
+            f"Split {output.descriptive_qualified_name} by",
+            choices=[
+                ("(Don't split)", ""),
+                *(
+                    (
+                        column.human_readable_name_or_fallback()
+                        + (" (by day)" if column.data_type == "datetime" else ""),
+                        column.name,
+                    )
+                    for column in output.partition_candidates
+                ),
+            ],
+        )
+        if partition_by is None:
+            return None
+        partitions.append(partition_by or None)
+
+    return partitions
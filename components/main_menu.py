@@ -1,5 +1,6 @@
 from sys import exit
 
+from instrumentation import is_startup_benchmark, report_startup_milestone
 from terminal_tools import draw_box, prompts
 
 from .analysis_main import analysis_main
@@ -8,6 +9,7 @@ from .new_analysis import new_analysis
 from .new_project import new_project
 from .project_main import project_main
 from .select_project import select_project
+from .settings import settings_main
 
 
 def main_menu(context: ViewContext):
@@ -15,11 +17,16 @@ def main_menu(context: ViewContext):
     while True:
         exit_instruction = "⟪ Hit Ctrl+C at any time to exit a menu ⟫"
         with terminal.nest(draw_box("CIB Mango Tree") + "\n" + exit_instruction + "\n"):
+            report_startup_milestone("menu")
+            if is_startup_benchmark():
+                exit(0)
+
             action = prompts.list_input(
                 "What would you like to do?",
                 choices=[
                     ("Import dataset", "new_project"),
                     ("Load existing dataset", "load_project"),
+                    ("Settings", "settings"),
                     ("Exit", "exit"),
                 ],
             )
@@ -52,3 +59,7 @@ def main_menu(context: ViewContext):
             if project is not None:
                 project_main(context, project)
             continue
+
+        if action == "settings":
+            settings_main(context)
+            continue
@@ -223,7 +223,7 @@ def new_analysis(
                     print("- " + output.descriptive_qualified_name)
                 print("")
 
-                export_format = export_format_prompt()
+                export_format = export_format_prompt(analysis)
                 if export_format is None:
                     print(
                         "No problem. You can also export outputs later from the analysis menu."
@@ -3,7 +3,8 @@ from traceback import format_exc
 from typing import Optional
 
 from importing import Importer, ImporterSession, importers
-from terminal_tools import draw_box, prompts, wait_for_key
+from importing.stream import strip_compression_extension
+from terminal_tools import ProgressReporter, draw_box, prompts, wait_for_key
 from terminal_tools.inception import Scope
 
 from .context import ViewContext
@@ -34,12 +35,18 @@ def new_project(context: ViewContext):
         print(
             "Rename the dataset if you wish. This is how the dataset will appear when you try to load it again."
         )
-        suggested_project_name = os.path.splitext(os.path.basename(selected_file))[0]
+        suggested_project_name = os.path.splitext(
+            os.path.basename(strip_compression_extension(selected_file))
+        )[0]
         project_name = prompts.text("Name", default=suggested_project_name)
 
     with terminal.nest(draw_box("4. Import", padding_lines=0)):
-        print("Please wait as the dataset is imported...")
-        project = app.create_project(name=project_name, importer_session=importer)
+        with ProgressReporter("Importing the dataset") as progress:
+            project = app.create_project(
+                name=project_name,
+                importer_session=importer,
+                progress_callback=progress.update,
+            )
 
         print("Dataset successfully imported!")
         wait_for_key(True)
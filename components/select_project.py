@@ -41,10 +41,23 @@ def select_project(ctx: ViewContext):
             print("Inferred column semantics:")
             print_ascii_table(
                 rows=[
-                    [col.name, col.semantic.semantic_name] for col in project.columns
+                    [
+                        col.name,
+                        col.semantic_name or "(unknown)",
+                        col.null_count,
+                        f"~{col.approx_n_unique}",
+                    ]
+                    for col in project.profile.columns
                 ],
-                header=["Column", "Semantic"],
+                header=["Column", "Semantic", "Missing", "Distinct"],
             )
+            for col in project.profile.columns:
+                if col.parse_failure_fraction:
+                    print(
+                        f"⚠️ About {col.parse_failure_fraction:.0%} of the values in "
+                        f"[{col.name}] could not be read as {col.semantic_name} "
+                        "and will be missing in analyses."
+                    )
 
             confirm_load = prompts.confirm("Load this project?", default=True)
             if confirm_load:
@@ -0,0 +1,167 @@
+from analyzer_interface import ParquetWritePreset
+from app import SettingsContext
+from app.web_server import DEFAULT_WEB_SERVER_HOST
+from terminal_tools import draw_box, prompts
+
+from .context import ViewContext
+
+OUTPUT_FORMAT_CHOICES = [
+    ("Parquet: smallest files", "parquet"),
+    ("Arrow: largest files, quickest to read back", "arrow"),
+    ("Arrow with LZ4 compression: in between", "arrow_lz4"),
+]
+
+PARQUET_WRITE_PRESET_CHOICES: list[tuple[str, ParquetWritePreset]] = [
+    ("Balanced", "balanced"),
+    ("Fast write: larger files, quicker to write", "fast_write"),
+    ("Compact archive: smallest files, much slower to write", "compact_archive"),
+]
+
+
+def settings_main(context: ViewContext):
+    terminal = context.terminal
+    settings = context.app.context.settings
+    while True:
+        with terminal.nest(draw_box("CIB Mango Tree: Settings", padding_lines=0)):
+            action = prompts.list_input(
+                "Which setting would you like to change?",
+                choices=[
+                    (
+                        "Analysis output format "
+                        f"({settings.analysis_output_format})",
+                        "analysis_output_format",
+                    ),
+                    (
+                        f"Parquet encoding ({settings.parquet_write_preset})",
+                        "parquet_write_preset",
+                    ),
+                    (
+                        "Encode identifier columns "
+                        f"({_present_flag(settings.encode_identifiers)})",
+                        "encode_identifiers",
+                    ),
+                    (
+                        "Profile analyses "
+                        f"({_present_flag(settings.profile_analyses)})",
+                        "profile_analyses",
+                    ),
+                    (
+                        "Dashboard address "
+                        f"({settings.web_server_host}:{settings.web_server_port})",
+                        "web_server_address",
+                    ),
+                    (
+                        f"Dashboard threads ({settings.web_server_threads})",
+                        "web_server_threads",
+                    ),
+                    ("(Back)", None),
+                ],
+            )
+
+        if action is None:
+            return
+
+        if action == "analysis_output_format":
+            _edit_analysis_output_format(settings)
+            continue
+
+        if action == "parquet_write_preset":
+            print(
+                "Applies to datasets imported and analyses run from now on, "
+                "and to their parquet exports."
+            )
+            preset = prompts.list_input(
+                "How should parquet files be encoded?",
+                choices=PARQUET_WRITE_PRESET_CHOICES,
+                default=settings.parquet_write_preset,
+            )
+            if preset is not None:
+                settings.set_parquet_write_preset(preset)
+            continue
+
+        if action == "encode_identifiers":
+            print(
+                "Identifier columns with repeated values, such as user IDs, are "
+                "passed to analyzers as dictionary codes, which makes joins and "
+                "group-bys quicker and use less memory. Outputs still store the "
+                "values as text."
+            )
+            settings.set_encode_identifiers(
+                prompts.confirm(
+                    "Encode identifier columns?",
+                    default=settings.encode_identifiers,
+                    cancel_fallback=settings.encode_identifiers,
+                )
+            )
+            continue
+
+        if action == "profile_analyses":
+            print(
+                "Analyzers are run under the profiler, and their profiles and "
+                "query plans are saved in the analysis directory. This slows "
+                "them down."
+            )
+            settings.set_profile_analyses(
+                prompts.confirm(
+                    "Profile analyses?",
+                    default=settings.profile_analyses,
+                    cancel_fallback=settings.profile_analyses,
+                )
+            )
+            continue
+
+        if action == "web_server_address":
+            _edit_web_server_address(settings)
+            continue
+
+        if action == "web_server_threads":
+            threads = prompts.int_input(
+                "How many dashboard requests should be served at the same time?",
+                default=settings.web_server_threads,
+                min=1,
+                max=64,
+            )
+            if threads is not None:
+                settings.set_web_server_threads(threads)
+            continue
+
+
+def _edit_analysis_output_format(settings: SettingsContext):
+    print(
+        "Applies to analyses run from now on. Arrow files are memory-mapped "
+        "when the dashboards and secondary analyses read them."
+    )
+    value = prompts.list_input(
+        "How should analysis outputs be stored?",
+        choices=OUTPUT_FORMAT_CHOICES,
+        default=settings.analysis_output_format,
+    )
+    if value is not None:
+        settings.set_analysis_output_format(value)
+
+
+def _edit_web_server_address(settings: SettingsContext):
+    host = prompts.list_input(
+        "Who should be able to open the dashboards?",
+        choices=[
+            ("Only this computer", DEFAULT_WEB_SERVER_HOST),
+            ("Any computer that can reach this one", "0.0.0.0"),
+        ],
+        default=settings.web_server_host,
+    )
+    if host is None:
+        return
+    port = prompts.int_input(
+        "Which port should the dashboards use? A free one is picked if it's taken.",
+        default=settings.web_server_port,
+        min=1,
+        max=65535,
+    )
+    if port is None:
+        return
+    settings.set_web_server_host(host)
+    settings.set_web_server_port(port)
+
+
+def _present_flag(value: bool):
+    return "on" if value else "off"
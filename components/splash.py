@@ -1,3 +1,9 @@
+from instrumentation import (
+    get_startup_seconds,
+    is_startup_benchmark,
+    is_startup_time_shown,
+    report_startup_milestone,
+)
 from meta import get_version
 from terminal_tools import clear_terminal, wait_for_key
 
@@ -7,8 +13,12 @@ def splash():
     print(_ascii_splash)
     print("")
     print(f"{get_version() or '<development version>'}")
+    if is_startup_time_shown():
+        print(f"Started in {get_startup_seconds():.2f} seconds")
     print("")
-    wait_for_key(True)
+    report_startup_milestone("splash")
+    if not is_startup_benchmark():
+        wait_for_key(True)
 
 
 _ascii_splash: str = """
@@ -1,12 +1,13 @@
 import os
 from functools import cached_property
+from typing import Callable, Iterable, Optional
 
 import polars as pl
-from dash import Dash
 from pydantic import BaseModel
 
 from analyzer_interface import (
     AnalyzerInterface,
+    ParquetWriteOptions,
     SecondaryAnalyzerInterface,
     WebPresenterInterface,
 )
@@ -19,8 +20,19 @@ from analyzer_interface.context import (
 )
 from analyzer_interface.context import TableReader, TableWriter
 from analyzer_interface.context import WebPresenterContext as BaseWebPresenterContext
+from instrumentation import add_rows
 from preprocessing.series_semantic import SeriesSemantic
-from storage import AnalysisModel, Storage
+from storage import (
+    AnalysisModel,
+    OutputStorageFormat,
+    Storage,
+    count_output_table_rows,
+    read_output_table,
+    scan_output_table,
+)
+
+from .callback_cache import CALLBACK_CACHE_DIR_NAME, CallbackCache, get_file_fingerprint
+from .dataframe_cache import dataframe_cache
 
 
 class PrimaryAnalyzerContext(BasePrimaryAnalyzerContext):
@@ -28,6 +40,8 @@ class PrimaryAnalyzerContext(BasePrimaryAnalyzerContext):
     analyzer: AnalyzerInterface
     store: Storage
     input_columns: dict[str, "InputColumnProvider"]
+    output_format: OutputStorageFormat = "parquet"
+    parquet_write_options: ParquetWriteOptions = ParquetWriteOptions()
 
     class Config:
         arbitrary_types_allowed = True
@@ -45,6 +59,8 @@ class PrimaryAnalyzerContext(BasePrimaryAnalyzerContext):
             analysis=self.analysis,
             output_id=output_id,
             store=self.store,
+            output_format=self.output_format,
+            write_options=self.parquet_write_options,
         )
 
     def prepare(self):
@@ -57,12 +73,19 @@ class PrimaryAnalyzerContext(BasePrimaryAnalyzerContext):
 class InputColumnProvider(BaseModel):
     user_column_name: str
     semantic: SeriesSemantic
+    dictionary: Optional[pl.Series] = None
+    """If given, the converted column is encoded as an enum of these values."""
+
+    class Config:
+        arbitrary_types_allowed = True
 
 
 class PrimaryAnalyzerOutputWriter(TableWriter, BaseModel):
     analysis: AnalysisModel
     output_id: str
     store: Storage
+    output_format: OutputStorageFormat = "parquet"
+    write_options: ParquetWriteOptions = ParquetWriteOptions()
 
     class Config:
         arbitrary_types_allowed = True
@@ -71,6 +94,38 @@ class PrimaryAnalyzerOutputWriter(TableWriter, BaseModel):
     def parquet_path(self):
         return self.store.get_primary_output_parquet_path(self.analysis, self.output_id)
 
+    @property
+    def parquet_write_options(self):
+        return self.write_options
+
+    def write(self, df: pl.DataFrame | pl.LazyFrame):
+        self.store.save_project_primary_outputs(
+            self.analysis,
+            {self.output_id: df},
+            output_format=self.output_format,
+            parquet_write_options=self.write_options,
+        )
+        self._record_rows()
+
+    def write_batches(self, batches: Iterable[pl.DataFrame], schema: pl.Schema):
+        self.store.save_project_primary_output_batches(
+            self.analysis,
+            self.output_id,
+            batches,
+            schema,
+            output_format=self.output_format,
+            parquet_write_options=self.write_options,
+        )
+        self._record_rows()
+
+    def _record_rows(self):
+        # The rows written count as the output of the block that writes them
+        add_rows(
+            rows_out=count_output_table_rows(
+                self.store.get_primary_output_path(self.analysis, self.output_id)
+            )
+        )
+
 
 class PrimaryAnalyzerInputTableReader(InputTableReader, BaseModel):
     project_id: str
@@ -88,19 +143,29 @@ class PrimaryAnalyzerInputTableReader(InputTableReader, BaseModel):
     def preprocess(self, df: pl.DataFrame) -> pl.DataFrame:
         return df.select(
             [
-                pl.col(provider.user_column_name)
-                .map_batches(provider.semantic.try_convert)
-                .alias(input_column_name)
+                self._convert_column(provider).alias(input_column_name)
                 for input_column_name, provider in self.input_columns.items()
             ]
         )
 
+    @staticmethod
+    def _convert_column(provider: InputColumnProvider) -> pl.Expr:
+        column = pl.col(provider.user_column_name).map_batches(
+            provider.semantic.try_convert
+        )
+        if provider.dictionary is None:
+            return column
+        # Joins and group-bys on an enum work on its UInt32 codes
+        return column.cast(pl.Enum(provider.dictionary))
+
 
 class SecondaryAnalyzerContext(BaseSecondaryAnalyzerContext):
     analysis: AnalysisModel
     secondary_analyzer: SecondaryAnalyzerInterface
     store: Storage
     temp_dir: str
+    output_format: OutputStorageFormat = "parquet"
+    parquet_write_options: ParquetWriteOptions = ParquetWriteOptions()
 
     class Config:
         arbitrary_types_allowed = True
@@ -125,6 +190,8 @@ class SecondaryAnalyzerContext(BaseSecondaryAnalyzerContext):
             secondary_analyzer_id=self.secondary_analyzer.id,
             output_id=output_id,
             store=self.store,
+            output_format=self.output_format,
+            write_options=self.parquet_write_options,
         )
 
     def prepare(self):
@@ -140,7 +207,6 @@ class WebPresenterContext(BaseWebPresenterContext):
     analysis: AnalysisModel
     web_presenter: WebPresenterInterface
     store: Storage
-    dash_app: Dash
 
     class Config:
         arbitrary_types_allowed = True
@@ -161,7 +227,38 @@ class WebPresenterContext(BaseWebPresenterContext):
     @cached_property
     def state_dir(self) -> str:
         return self.store._get_web_presenter_state_path(
-            self.analysis.project_id, self.web_presenter.id
+            self.analysis, self.web_presenter.id
+        )
+
+    def memoize(self, *tables: TableReader) -> Callable[[Callable], Callable]:
+        cache = CallbackCache(os.path.join(self.state_dir, CALLBACK_CACHE_DIR_NAME))
+        return cache.memoize(
+            (
+                self.web_presenter.id,
+                self.web_presenter.version,
+                *(get_file_fingerprint(table.path) for table in tables),
+            )
+        )
+
+    def read_table(
+        self, table: TableReader, *, columns: Optional[list[str]] = None
+    ) -> pl.DataFrame:
+        return dataframe_cache.get(
+            table.path,
+            ("columns", tuple(columns) if columns is not None else None),
+            lambda: table.read(columns=columns),
+        )
+
+    def read_derived_table(
+        self,
+        table: TableReader,
+        name: str,
+        derive: Callable[[pl.LazyFrame], pl.LazyFrame],
+    ) -> pl.DataFrame:
+        return dataframe_cache.get(
+            table.path,
+            ("derived", self.web_presenter.id, name),
+            lambda: derive(table.scan()).collect(),
         )
 
 
@@ -190,6 +287,16 @@ class PrimaryAnalyzerOutputTableReader(TableReader, BaseModel):
     def parquet_path(self):
         return self.store.get_primary_output_parquet_path(self.analysis, self.output_id)
 
+    @property
+    def path(self):
+        return self.store.get_primary_output_path(self.analysis, self.output_id)
+
+    def read(self, *, columns: Optional[list[str]] = None) -> pl.DataFrame:
+        return read_output_table(self.path, columns=columns)
+
+    def scan(self) -> pl.LazyFrame:
+        return scan_output_table(self.path)
+
 
 class SecondaryAnalyzerOutputReaderGroupContext(AssetsReader, BaseModel):
     analysis: AnalysisModel
@@ -223,12 +330,26 @@ class SecondaryAnalyzerOutputTableReader(TableReader, BaseModel):
             self.analysis, self.secondary_analyzer_id, self.output_id
         )
 
+    @property
+    def path(self):
+        return self.store.get_secondary_output_path(
+            self.analysis, self.secondary_analyzer_id, self.output_id
+        )
+
+    def read(self, *, columns: Optional[list[str]] = None) -> pl.DataFrame:
+        return read_output_table(self.path, columns=columns)
+
+    def scan(self) -> pl.LazyFrame:
+        return scan_output_table(self.path)
+
 
 class SecondaryAnalyzerOutputWriter(TableWriter, BaseModel):
     analysis: AnalysisModel
     secondary_analyzer_id: str
     output_id: str
     store: Storage
+    output_format: OutputStorageFormat = "parquet"
+    write_options: ParquetWriteOptions = ParquetWriteOptions()
 
     class Config:
         arbitrary_types_allowed = True
@@ -238,3 +359,39 @@ class SecondaryAnalyzerOutputWriter(TableWriter, BaseModel):
         return self.store.get_secondary_output_parquet_path(
             self.analysis, self.secondary_analyzer_id, self.output_id
         )
+
+    @property
+    def parquet_write_options(self):
+        return self.write_options
+
+    def write(self, df: pl.DataFrame | pl.LazyFrame):
+        self.store.save_project_secondary_outputs(
+            self.analysis,
+            self.secondary_analyzer_id,
+            {self.output_id: df},
+            output_format=self.output_format,
+            parquet_write_options=self.write_options,
+        )
+        self._record_rows()
+
+    def write_batches(self, batches: Iterable[pl.DataFrame], schema: pl.Schema):
+        self.store.save_project_secondary_output_batches(
+            self.analysis,
+            self.secondary_analyzer_id,
+            self.output_id,
+            batches,
+            schema,
+            output_format=self.output_format,
+            parquet_write_options=self.write_options,
+        )
+        self._record_rows()
+
+    def _record_rows(self):
+        # The rows written count as the output of the block that writes them
+        add_rows(
+            rows_out=count_output_table_rows(
+                self.store.get_secondary_output_path(
+                    self.analysis, self.secondary_analyzer_id, self.output_id
+                )
+            )
+        )
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+from functools import wraps
+from tempfile import NamedTemporaryFile
+from types import CellType, CodeType
+from typing import Callable, TypeVar
+
+CALLBACK_CACHE_MAX_BYTES = 256 << 20
+"""The total size of the results that a web presenter's callback cache keeps."""
+
+CALLBACK_CACHE_DIR_NAME = "callback_cache"
+
+CallbackFunction = TypeVar("CallbackFunction", bound=Callable)
+
+
+class CallbackCache:
+    """
+    Memoizes the results of web presenter callbacks on disk, so that views that
+    were already computed are served again without recomputing them, also after
+    the server restarts.
+
+    Results are stored as the JSON that Dash would send, so cached results are
+    returned in that form (figures as dicts, components as their JSON) and
+    skip rebuilding the figure objects. A result is keyed by the callback, its
+    arguments and the fingerprint of the data it depends on. When the cache
+    grows past its budget, the least recently used results are removed.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = CALLBACK_CACHE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+
+    def memoize(
+        self, fingerprint: tuple
+    ) -> Callable[[CallbackFunction], CallbackFunction]:
+        """
+        Makes a decorator that memoizes the callback. The arguments must be
+        representable with `repr`, like the JSON-like values Dash passes to
+        callbacks.
+
+        The callback's code, constants, defaults and the plain values (text,
+        numbers and collections of them) it closes over are part of the key.
+        Other values it closes over, like data frames, are only told apart by
+        their type, so they must be derived from the data in the `fingerprint`.
+        """
+
+        def decorator(func: CallbackFunction) -> CallbackFunction:
+            # Changes to the callback itself invalidate its results
+            callback_hash = _get_callback_hash(func)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = hashlib.sha256(
+                    repr(
+                        (
+                            func.__qualname__,
+                            callback_hash,
+                            fingerprint,
+                            args,
+                            sorted(kwargs.items()),
+                        )
+                    ).encode("utf-8")
+                ).hexdigest()
+                path = os.path.join(self.root_dir, key + ".json")
+                try:
+                    with open(path, "rb") as file:
+                        result = json.load(file)
+                    # Marks the result as recently used
+                    os.utime(path)
+                    return result
+                except (OSError, ValueError):
+                    pass
+
+                result = func(*args, **kwargs)
+                self._save(path, result)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    def _save(self, path: str, result):
+        # Plotly takes a long time to import, and is only needed once a web
+        # presenter is running
+        from plotly.io.json import to_json_plotly
+
+        try:
+            data = to_json_plotly(result).encode("utf-8")
+        except Exception:
+            # Results that can't be serialized just aren't cached
+            return
+        try:
+            os.makedirs(self.root_dir, exist_ok=True)
+            # Written aside first, so that other threads never read half a file
+            with NamedTemporaryFile(
+                dir=self.root_dir, suffix=".tmp", delete=False
+            ) as file:
+                file.write(data)
+            os.replace(file.name, path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.root_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+
+def _get_callback_hash(func: Callable) -> str:
+    return hashlib.sha256(
+        repr(
+            (
+                _describe_value(func.__code__),
+                tuple(map(_describe_cell, func.__closure__ or ())),
+                _describe_value(func.__defaults__),
+                _describe_value(func.__kwdefaults__),
+            )
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def _describe_cell(cell: CellType):
+    try:
+        return _describe_value(cell.cell_contents)
+    except ValueError:
+        # The variable isn't assigned yet, like a function that calls itself
+        return None
+
+
+def _describe_value(value):
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return value
+    if isinstance(value, CodeType):
+        # The repr of code objects includes their address, so nested
+        # functions are described by their contents instead
+        return (value.co_code, value.co_names, _describe_value(value.co_consts))
+    if isinstance(value, (tuple, list)):
+        return (type(value).__name__, *map(_describe_value, value))
+    if isinstance(value, (set, frozenset)):
+        # Sets of text are iterated in a different order in each process
+        return ("set", *sorted(map(repr, map(_describe_value, value))))
+    if isinstance(value, dict):
+        return (
+            "dict",
+            *(
+                (_describe_value(key), _describe_value(item))
+                for key, item in value.items()
+            ),
+        )
+    return type(value).__qualname__
+
+
+def get_file_fingerprint(path: str) -> tuple:
+    """
+    Identifies the version of a file by its path, modification time and size.
+    """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,87 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable
+
+import polars as pl
+
+DATAFRAME_CACHE_MAX_BYTES = 1 << 30
+"""The total estimated size of the dataframes the process-wide cache holds on to."""
+
+
+class DataFrameCache:
+    """
+    A thread-safe, memory-bounded LRU cache of dataframes loaded from parquet
+    files. Entries are keyed by the file's path and modification time, so a file
+    that is written again is loaded again, and by a variant key that tells apart
+    different column selections or frames derived from the same file.
+
+    Frames larger than the whole budget are returned without being cached.
+    """
+
+    def __init__(self, max_bytes: int = DATAFRAME_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[pl.DataFrame, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = Lock()
+
+    def get(
+        self, path: str, variant: Hashable, load: Callable[[], pl.DataFrame]
+    ) -> pl.DataFrame:
+        """
+        Gets the frame for the file and variant, calling `load` to produce it if
+        it isn't cached yet. The returned frame is shared, so it must not be
+        modified in place.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, variant)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        # Load outside of the lock so that other tables stay available meanwhile
+        df = load()
+        size = df.estimated_size()
+        if size > self.max_bytes:
+            return df
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Another thread loaded it first
+                self._entries.move_to_end(key)
+                return entry[0]
+            self._discard_stale(path, variant)
+            self._entries[key] = (df, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _discard_stale(self, path: str, variant: Hashable):
+        for key in [
+            key for key in self._entries if key[0] == path and key[3] == variant
+        ]:
+            _, size = self._entries.pop(key)
+            self._total_bytes -= size
+
+
+dataframe_cache = DataFrameCache()
+"""
+The cache shared by all web presenters in the process, so that dashboards served
+together and restarted servers don't load the same tables twice.
+"""
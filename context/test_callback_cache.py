@@ -0,0 +1,22 @@
+from .callback_cache import CallbackCache
+
+
+def _make_callback(cache: CallbackCache, label: str, scale: int = 1):
+    @cache.memoize(("table", 1))
+    def callback(value: int):
+        return f"{label}: {value * scale}"
+
+    return callback
+
+
+def test_memoize_keys_results_by_closure_values_and_defaults(tmp_path):
+    cache = CallbackCache(str(tmp_path))
+
+    assert _make_callback(cache, "first")(2) == "first: 2"
+    assert _make_callback(cache, "second")(2) == "second: 2"
+    assert _make_callback(cache, "first", scale=3)(2) == "first: 6"
+    assert len(list(tmp_path.iterdir())) == 3
+
+    # The same callback is served from the cache
+    assert _make_callback(cache, "first")(2) == "first: 2"
+    assert len(list(tmp_path.iterdir())) == 3
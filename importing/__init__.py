@@ -1,4 +1,12 @@
 from .csv import CSVImporter
+from .excel import ExcelImporter
 from .importer import Importer, ImporterSession
+from .ndjson import NdjsonImporter
+from .parquet import ParquetImporter
 
-importers: list[Importer[ImporterSession]] = [CSVImporter()]
+importers: list[Importer[ImporterSession]] = [
+    CSVImporter(),
+    NdjsonImporter(),
+    ExcelImporter(),
+    ParquetImporter(),
+]
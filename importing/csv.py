@@ -1,12 +1,24 @@
-from csv import Sniffer
-from typing import Callable, Optional
+import io
+import os
+from typing import Callable, Iterable, Optional
 
 import polars as pl
 from pydantic import BaseModel
 
 import terminal_tools.prompts as prompts
+from analyzer_interface.parquet_options import ParquetWriteOptions
 
+from .dialect import CsvEncoding, detect_csv_dialect
 from .importer import Importer, ImporterSession
+from .stream import (
+    InputCompression,
+    InputStream,
+    RowBoundaryNotFoundError,
+    detect_compression,
+    iter_line_chunks,
+    read_head,
+    sink_batches_to_parquet,
+)
 
 
 class CSVImporter(Importer["CsvImportSession"]):
@@ -15,16 +27,20 @@ class CSVImporter(Importer["CsvImportSession"]):
         return "CSV"
 
     def suggest(self, input_path: str) -> bool:
-        return input_path.endswith(".csv")
+        return input_path.endswith((".csv", ".csv.gz", ".csv.zst"))
 
     def init_session(self, input_path: str):
-        with open(input_path, "r", encoding="utf8") as file:
-            dialect = Sniffer().sniff(file.read(65536))
+        input_compression = detect_compression(input_path)
+        dialect = detect_csv_dialect(input_path, input_compression)
+        if dialect is None:
+            return None
 
         return CsvImportSession(
             input_file=input_path,
-            separator=dialect.delimiter,
-            quote_char=dialect.quotechar,
+            input_compression=input_compression,
+            separator=dialect.separator,
+            quote_char=dialect.quote_char,
+            encoding=dialect.encoding,
             has_header=True,
         )
 
@@ -43,6 +59,7 @@ class CSVImporter(Importer["CsvImportSession"]):
 
         return CsvImportSession(
             input_file=input_path,
+            input_compression=detect_compression(input_path),
             separator=separator,
             quote_char=quote_char,
             has_header=has_header,
@@ -63,6 +80,7 @@ class CSVImporter(Importer["CsvImportSession"]):
                     ("Column separator", "separator"),
                     ("Quote character", "quote_char"),
                     ("Header", "header"),
+                    ("Performance (batch size, threads)", "performance"),
                     ("Done. Use these options.", "done"),
                 ],
                 default=None if is_first_time else "done",
@@ -92,6 +110,24 @@ class CSVImporter(Importer["CsvImportSession"]):
                     continue
                 import_session.has_header = has_header
 
+            if action == "performance":
+                batch_size = prompts.int_input(
+                    "How many rows should be read at a time?",
+                    default=import_session.batch_size,
+                    min=1_000,
+                )
+                if batch_size is None:
+                    continue
+                n_threads = prompts.int_input(
+                    "How many threads should parse the file? (0 = automatic)",
+                    default=import_session.n_threads or 0,
+                    min=0,
+                )
+                if n_threads is None:
+                    continue
+                import_session.batch_size = batch_size
+                import_session.n_threads = n_threads or None
+
     @staticmethod
     def _separator_option(previous_value: Optional[str]) -> Optional[str]:
         input: Optional[str] = prompts.list_input(
@@ -159,11 +195,26 @@ class CSVImporter(Importer["CsvImportSession"]):
         )
 
 
+DEFAULT_IMPORT_BATCH_SIZE = 50_000
+
+
 class CsvImportSession(ImporterSession, BaseModel):
     input_file: str
+    input_compression: Optional[InputCompression] = None
     separator: str
     quote_char: str
     has_header: bool = True
+    encoding: CsvEncoding = "utf8"
+
+    batch_size: int = DEFAULT_IMPORT_BATCH_SIZE
+    """The approximate number of rows parsed into each batch."""
+
+    n_threads: Optional[int] = None
+    """The number of threads parsing the file; None lets polars decide."""
+
+    row_group_size: Optional[int] = None
+    """The maximum rows per parquet row group; None leaves it to the write
+    options, which by default write one per batch."""
 
     def print_config(self):
         def present_separator(value: str) -> str:
@@ -186,10 +237,35 @@ class CsvImportSession(ImporterSession, BaseModel):
         print(f"- Column separator: {present_separator(self.separator)}")
         print(f"- Quote character: {present_separator(self.quote_char)}")
         print(f"- First row is header: {'yes' if self.has_header else 'no'}")
+        if self.encoding != "utf8":
+            print(f"- Encoding: {self.encoding}")
+        if self.input_compression:
+            print(f"- Compression: {self.input_compression}")
+        else:
+            print(
+                f"- Estimated row count: ~{estimate_csv_row_count(self.input_file):,}"
+            )
+        if self.batch_size != DEFAULT_IMPORT_BATCH_SIZE or self.n_threads:
+            print(
+                f"- Batch size: {self.batch_size} rows, "
+                f"threads: {self.n_threads or 'automatic'}"
+            )
 
     def load_preview(self, n_records: int) -> pl.DataFrame:
         return pl.read_csv(
-            self.input_file,
+            (
+                io.BytesIO(
+                    self._to_utf8(
+                        read_head(
+                            self.input_file,
+                            self.input_compression,
+                            quote_char=self.quote_char,
+                        )
+                    )
+                )
+                if self.input_compression or self.encoding != "utf8"
+                else self.input_file
+            ),
             separator=self.separator,
             quote_char=self.quote_char,
             has_header=self.has_header,
@@ -198,13 +274,134 @@ class CsvImportSession(ImporterSession, BaseModel):
             ignore_errors=True,
         )
 
-    def import_as_parquet(self, output_path: str) -> None:
-        lazyframe = pl.scan_csv(
+    def import_as_parquet(
+        self,
+        output_path: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ) -> None:
+        sink_batches_to_parquet(
+            self._iter_batches(progress_callback),
+            output_path,
+            # The file has no data rows; keep the columns anyway.
+            get_empty=lambda: self.load_preview(0),
+            write_options=write_options,
+            row_group_size=self.row_group_size,
+        )
+
+        if progress_callback is not None:
+            progress_callback(1)
+
+    def _iter_batches(
+        self, progress_callback: Optional[Callable[[float], None]]
+    ) -> Iterable[pl.DataFrame]:
+        """
+        The (decompressed) file is cut into chunks of whole rows, each parsed by
+        polars in parallel. The first chunk determines the columns and their
+        types. Polars' own batched reader isn't used because it can split rows
+        with quoted line breaks, and it can't read compressed files.
+
+        Cutting relies on counting quotes, which a stray quote in an unquoted
+        field throws off. If no cut is found, the rest of the file is read with
+        polars' batched reader, which parses quotes properly.
+        """
+        bytes_per_row = estimate_csv_row_size(self.input_file, self.input_compression)
+        chunk_size = max(round(self.batch_size * bytes_per_row), 1 << 20)
+
+        schema: Optional[pl.Schema] = None
+        rows_read = 0
+        with InputStream(self.input_file, self.input_compression) as stream:
+            try:
+                for chunk in iter_line_chunks(
+                    stream, quote_char=self.quote_char, chunk_size=chunk_size
+                ):
+                    batch = pl.read_csv(
+                        io.BytesIO(self._to_utf8(chunk)),
+                        separator=self.separator,
+                        quote_char=self.quote_char,
+                        has_header=self.has_header and schema is None,
+                        schema=schema,
+                        n_threads=self.n_threads,
+                        truncate_ragged_lines=True,
+                        ignore_errors=True,
+                    )
+                    schema = batch.schema
+                    rows_read += batch.height
+                    yield batch
+
+                    if progress_callback is not None:
+                        progress_callback(min(stream.progress, 0.99))
+                return
+            except RowBoundaryNotFoundError as ex:
+                if self.input_compression or self.encoding != "utf8":
+                    # Polars' batched reader only reads plain UTF-8 files
+                    raise ValueError(
+                        "The rows of the file couldn't be told apart, likely "
+                        "because of a stray quote; check the quote character, "
+                        "or import the file as uncompressed UTF-8"
+                    ) from ex
+
+        yield from self._iter_polars_batches(schema, rows_read, progress_callback)
+
+    def _iter_polars_batches(
+        self,
+        schema: Optional[pl.Schema],
+        skip_rows: int,
+        progress_callback: Optional[Callable[[float], None]],
+    ) -> Iterable[pl.DataFrame]:
+        """
+        Reads the uncompressed UTF-8 file with polars' batched reader, leaving
+        out the first `skip_rows` rows, which were read before as the `schema`.
+        The file is read from its start, since polars' options for skipping
+        lines count quotes too.
+        """
+        estimated_rows = max(estimate_csv_row_count(self.input_file), 1)
+        reader = pl.read_csv_batched(
             self.input_file,
             separator=self.separator,
             quote_char=self.quote_char,
             has_header=self.has_header,
+            schema_overrides=list(schema.values()) if schema is not None else None,
+            n_threads=self.n_threads,
+            batch_size=self.batch_size,
             truncate_ragged_lines=True,
             ignore_errors=True,
         )
-        lazyframe.sink_parquet(output_path)
+        rows_read = 0
+        while batches := reader.next_batches(1):
+            for batch in batches:
+                rows_read += batch.height
+                if rows_read > skip_rows:
+                    yield batch.slice(max(skip_rows - (rows_read - batch.height), 0))
+
+            if progress_callback is not None:
+                progress_callback(min(rows_read / estimated_rows, 0.99))
+
+    def _to_utf8(self, data: bytes) -> bytes:
+        """
+        Transcodes the data for polars, which only reads UTF-8. The supported
+        legacy encodings are single-byte, so chunks cut at line breaks never
+        split a character.
+        """
+        if self.encoding == "utf8":
+            return data
+        return data.decode(self.encoding, errors="replace").encode("utf8")
+
+
+def estimate_csv_row_size(
+    input_file: str,
+    compression: Optional[InputCompression] = None,
+    sample_size: int = 1 << 20,
+) -> float:
+    """
+    Estimates the average number of (decompressed) bytes per row from the
+    beginning of the file. Rows with quoted line breaks count as several rows,
+    which is fine for estimates.
+    """
+    sample = read_head(input_file, compression, size=sample_size)
+    return len(sample) / max(sample.count(b"\n"), 1)
+
+
+def estimate_csv_row_count(input_file: str) -> int:
+    """Estimates the number of rows in the file without reading all of it."""
+    return round(os.path.getsize(input_file) / estimate_csv_row_size(input_file))
@@ -0,0 +1,146 @@
+"""
+Detection of the separator, quote character and encoding of delimited text
+files. Only a few small byte ranges of the file are read, so detection takes
+the same time regardless of the file size.
+"""
+
+import io
+import os
+from typing import Literal, Optional
+
+import polars as pl
+from pydantic import BaseModel
+
+from .stream import InputCompression, read_head
+
+CsvEncoding = Literal["utf8", "cp1252"]
+
+SEPARATOR_CANDIDATES = [",", ";", "\t", "|"]
+
+QUOTE_CHAR_CANDIDATES = ['"', "'"]
+
+SAMPLE_SIZE = 64 << 10
+"""The number of bytes read at each sampled position of the file."""
+
+SAMPLE_POSITIONS = [0, 1 / 3, 2 / 3]
+"""The relative positions in the file where the samples are taken."""
+
+_utf16_boms = (b"\xff\xfe", b"\xfe\xff")
+
+
+class CsvDialect(BaseModel):
+    separator: str
+    quote_char: str
+    encoding: CsvEncoding = "utf8"
+
+
+def detect_csv_dialect(
+    input_path: str, compression: Optional[InputCompression] = None
+) -> Optional[CsvDialect]:
+    """
+    Finds the separator and quote character that split every sample into the
+    same number of columns, preferring more columns when several do.
+
+    Return None if no candidate splits any of the samples consistently.
+    """
+    samples = read_samples(input_path, compression)
+    if samples[0].startswith(_utf16_boms):
+        raise ValueError(
+            "UTF-16 encoded files are not supported. "
+            "Please save the file with the UTF-8 encoding."
+        )
+
+    best_dialect: Optional[CsvDialect] = None
+    best_score = (0, 0)
+    for separator in SEPARATOR_CANDIDATES:
+        for quote_char in QUOTE_CHAR_CANDIDATES:
+            score = _score_dialect(samples, separator, quote_char)
+            # Ties go to the earlier, more common candidates
+            if score > best_score:
+                best_score = score
+                best_dialect = CsvDialect(separator=separator, quote_char=quote_char)
+
+    if best_dialect is not None:
+        best_dialect.encoding = detect_encoding(samples)
+    return best_dialect
+
+
+def detect_encoding(samples: list[bytes]) -> CsvEncoding:
+    """
+    Checks that the samples are valid UTF-8. Otherwise the file is most likely
+    in Windows-1252, the legacy encoding Excel uses for CSV exports on Western
+    European systems.
+    """
+    for sample in samples:
+        try:
+            sample.decode("utf8")
+        except UnicodeDecodeError:
+            return "cp1252"
+    return "utf8"
+
+
+def read_samples(
+    input_path: str, compression: Optional[InputCompression] = None
+) -> list[bytes]:
+    """
+    Reads a sample of whole lines from a few positions spread across the file.
+    Compressed files can't be read from the middle, so only their beginning is
+    sampled.
+    """
+    if compression is not None:
+        return [read_head(input_path, compression, size=SAMPLE_SIZE)]
+
+    file_size = os.path.getsize(input_path)
+    samples = []
+    with open(input_path, "rb") as file:
+        for position in SAMPLE_POSITIONS:
+            offset = int(file_size * position)
+            if offset > 0 and offset + SAMPLE_SIZE > file_size:
+                break
+            file.seek(offset)
+            sample = file.read(SAMPLE_SIZE)
+            if offset > 0:
+                # Skip the partial line at the start of the sample
+                sample = sample[sample.find(b"\n") + 1 :]
+            if len(sample) == SAMPLE_SIZE or offset > 0:
+                # Drop the partial line at the end of the sample
+                sample = sample[: sample.rfind(b"\n") + 1]
+            if sample:
+                samples.append(sample)
+    return samples or [b""]
+
+
+def _score_dialect(
+    samples: list[bytes], separator: str, quote_char: str
+) -> tuple[int, int]:
+    """
+    Scores a candidate dialect by the number of samples in which every row has
+    the same number of columns, then by the number of columns.
+    """
+    consistent_samples = 0
+    width = 0
+    for sample in samples:
+        try:
+            df = pl.read_csv(
+                io.BytesIO(sample),
+                separator=separator,
+                quote_char=quote_char,
+                has_header=False,
+                infer_schema=False,
+                # Empty fields become empty strings, so only the fields missing
+                # from short rows are null.
+                missing_utf8_is_empty_string=True,
+                encoding="utf8-lossy",
+            )
+        except pl.exceptions.PolarsError:
+            # Polars refuses rows with more fields than the first one
+            continue
+        if df.height == 0 or df[:, -1].null_count() > 0:
+            continue
+        consistent_samples += 1
+        width = max(width, df.width)
+
+    if width <= 1:
+        # Anything splits text into a single column
+        return (0, 0)
+    return (consistent_samples, width)
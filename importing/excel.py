@@ -0,0 +1,138 @@
+from typing import Callable, Optional
+
+import polars as pl
+from pydantic import BaseModel
+
+import terminal_tools.prompts as prompts
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
+from .importer import Importer, ImporterSession
+
+
+class ExcelImporter(Importer["ExcelImportSession"]):
+    @property
+    def name(self) -> str:
+        return "Excel"
+
+    def suggest(self, input_path: str) -> bool:
+        return input_path.endswith((".xlsx", ".xlsm"))
+
+    def init_session(self, input_path: str):
+        sheet_names = get_sheet_names(input_path)
+        if not sheet_names:
+            return None
+        return ExcelImportSession(input_file=input_path, sheet_name=sheet_names[0])
+
+    def manual_init_session(self, input_path: str):
+        sheet_name = self._sheet_option(input_path, None)
+        if sheet_name is None:
+            return None
+
+        has_header = self._header_option(None)
+        if has_header is None:
+            return None
+
+        return ExcelImportSession(
+            input_file=input_path, sheet_name=sheet_name, has_header=has_header
+        )
+
+    def modify_session(
+        self,
+        input_path: str,
+        import_session: "ExcelImportSession",
+        reset_screen: Callable[[], None],
+    ):
+        is_first_time = True
+        while True:
+            reset_screen(import_session)
+            action = prompts.list_input(
+                "What would you like to change?",
+                choices=[
+                    ("Sheet", "sheet"),
+                    ("Header", "header"),
+                    ("Done. Use these options.", "done"),
+                ],
+                default=None if is_first_time else "done",
+            )
+            is_first_time = False
+            if action is None:
+                return None
+
+            if action == "done":
+                return import_session
+
+            if action == "sheet":
+                sheet_name = self._sheet_option(input_path, import_session.sheet_name)
+                if sheet_name is None:
+                    continue
+                import_session.sheet_name = sheet_name
+
+            if action == "header":
+                has_header = self._header_option(import_session.has_header)
+                if has_header is None:
+                    continue
+                import_session.has_header = has_header
+
+    @staticmethod
+    def _sheet_option(input_path: str, previous_value: Optional[str]) -> Optional[str]:
+        return prompts.list_input(
+            "Select the sheet to import",
+            choices=get_sheet_names(input_path),
+            default=previous_value,
+        )
+
+    @staticmethod
+    def _header_option(previous_value: Optional[bool]) -> Optional[bool]:
+        return prompts.list_input(
+            "Does the sheet have a header?",
+            choices=[
+                ("Yes", True),
+                ("No", False),
+            ],
+            default=previous_value,
+        )
+
+
+class ExcelImportSession(ImporterSession, BaseModel):
+    input_file: str
+    sheet_name: str
+    has_header: bool = True
+
+    def print_config(self):
+        print(f"- Sheet: {self.sheet_name}")
+        print(f"- First row is header: {'yes' if self.has_header else 'no'}")
+
+    def load_preview(self, n_records: int) -> pl.DataFrame:
+        return self._load_sheet(n_rows=n_records).to_polars()
+
+    def import_as_parquet(
+        self,
+        output_path: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ) -> None:
+        # Calamine parses the sheet in native code straight into Arrow arrays,
+        # so no Python objects are created per cell and the other sheets of
+        # the workbook are never loaded. It can't read part of a sheet without
+        # parsing all of it, though, so the sheet is loaded and written in one
+        # go, and there is no progress to report in between.
+        df = pl.from_arrow(self._load_sheet().to_arrow())
+        df.write_parquet(output_path, **write_options.polars_kwargs())
+
+        if progress_callback is not None:
+            progress_callback(1)
+
+    def _load_sheet(self, n_rows: Optional[int] = None):
+        from fastexcel import read_excel
+
+        return read_excel(self.input_file).load_sheet(
+            self.sheet_name,
+            header_row=0 if self.has_header else None,
+            n_rows=n_rows,
+        )
+
+
+def get_sheet_names(input_path: str) -> list[str]:
+    from fastexcel import read_excel
+
+    return read_excel(input_path).sheet_names
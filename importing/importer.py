@@ -3,6 +3,8 @@ from typing import Callable, Optional, TypeVar
 
 import polars as pl
 
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
 
 class ImporterSession(ABC):
     """
@@ -29,9 +31,18 @@ class ImporterSession(ABC):
         pass
 
     @abstractmethod
-    def import_as_parquet(self, output_path: str) -> None:
+    def import_as_parquet(
+        self,
+        output_path: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ) -> None:
         """
         Import the data from the input file to the output file in the Parquet format.
+
+        If given, `progress_callback` is called from time to time with the
+        estimated fraction (between 0 and 1) of the import that is complete.
+        The file is encoded according to `write_options`.
         """
         pass
 
@@ -0,0 +1,109 @@
+import io
+from typing import Callable, Optional
+
+import polars as pl
+from pydantic import BaseModel
+
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
+from .importer import Importer, ImporterSession
+from .stream import (
+    InputCompression,
+    InputStream,
+    detect_compression,
+    encode_nested_columns,
+    iter_line_chunks,
+    read_head,
+    sink_batches_to_parquet,
+)
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+class NdjsonImporter(Importer["NdjsonImportSession"]):
+    @property
+    def name(self) -> str:
+        return "JSON Lines"
+
+    def suggest(self, input_path: str) -> bool:
+        return input_path.endswith(
+            tuple(
+                extension + compression_extension
+                for extension in NDJSON_EXTENSIONS
+                for compression_extension in ("", ".gz", ".zst")
+            )
+        )
+
+    def init_session(self, input_path: str):
+        return NdjsonImportSession(
+            input_file=input_path,
+            input_compression=detect_compression(input_path),
+        )
+
+    def manual_init_session(self, input_path: str):
+        return self.init_session(input_path)
+
+    def modify_session(
+        self,
+        input_path: str,
+        import_session: "NdjsonImportSession",
+        reset_screen: Callable[[], None],
+    ):
+        # Each record describes its own fields; there is nothing to configure.
+        return import_session
+
+
+class NdjsonImportSession(ImporterSession, BaseModel):
+    input_file: str
+    input_compression: Optional[InputCompression] = None
+
+    def print_config(self):
+        print("- One JSON object per line")
+        if self.input_compression:
+            print(f"- Compression: {self.input_compression}")
+        print("- Nested fields will be stored as JSON text")
+
+    def load_preview(self, n_records: int) -> pl.DataFrame:
+        return encode_nested_columns(
+            pl.read_ndjson(
+                io.BytesIO(read_head(self.input_file, self.input_compression)),
+                n_rows=n_records,
+                ignore_errors=True,
+            )
+        )
+
+    def import_as_parquet(
+        self,
+        output_path: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ) -> None:
+        sink_batches_to_parquet(
+            self._iter_batches(progress_callback),
+            output_path,
+            get_empty=lambda: self.load_preview(0),
+            write_options=write_options,
+        )
+
+        if progress_callback is not None:
+            progress_callback(1)
+
+    def _iter_batches(self, progress_callback: Optional[Callable[[float], None]]):
+        """
+        Polars can't stream NDJSON files into parquet, so the file is cut into
+        chunks of whole lines that are parsed one by one. Each chunk's fields
+        and types are inferred from all of its lines; fields that show up
+        later in the file, or types that need widening, widen the schema of
+        the whole import (see `sink_batches_to_parquet`).
+        """
+        with InputStream(self.input_file, self.input_compression) as stream:
+            for chunk in iter_line_chunks(stream):
+                # read_ndjson only infers from the first lines of the chunk
+                yield encode_nested_columns(
+                    pl.scan_ndjson(
+                        io.BytesIO(chunk), infer_schema_length=None
+                    ).collect()
+                )
+
+                if progress_callback is not None:
+                    progress_callback(min(stream.progress, 0.99))
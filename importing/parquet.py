@@ -0,0 +1,94 @@
+import shutil
+from typing import Callable, Optional
+
+import polars as pl
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
+from .importer import Importer, ImporterSession
+from .stream import encode_nested_columns, sink_batches_to_parquet
+
+
+class ParquetImporter(Importer["ParquetImportSession"]):
+    @property
+    def name(self) -> str:
+        return "Parquet"
+
+    def suggest(self, input_path: str) -> bool:
+        return input_path.endswith(".parquet")
+
+    def init_session(self, input_path: str):
+        return ParquetImportSession(input_file=input_path)
+
+    def manual_init_session(self, input_path: str):
+        return self.init_session(input_path)
+
+    def modify_session(
+        self,
+        input_path: str,
+        import_session: "ParquetImportSession",
+        reset_screen: Callable[[], None],
+    ):
+        # Parquet files describe their own columns; there is nothing to configure.
+        return import_session
+
+
+class ParquetImportSession(ImporterSession, BaseModel):
+    input_file: str
+
+    batch_size: int = 50_000
+    """The number of rows re-encoded at a time when the file can't be copied."""
+
+    @property
+    def can_copy(self) -> bool:
+        """
+        Whether the file can be used as the project data as-is. Nested columns
+        need to be converted to text first.
+        """
+        schema = pl.read_parquet_schema(self.input_file)
+        return not any(dtype.is_nested() for dtype in schema.values())
+
+    def print_config(self):
+        metadata = pq.read_metadata(self.input_file)
+        print(f"- Rows: {metadata.num_rows:,}")
+        print(f"- Row groups: {metadata.num_row_groups}")
+        if self.can_copy:
+            print("- The file will be copied as-is")
+        else:
+            print("- Nested columns will be stored as JSON text")
+
+    def load_preview(self, n_records: int) -> pl.DataFrame:
+        return encode_nested_columns(pl.read_parquet(self.input_file, n_rows=n_records))
+
+    def import_as_parquet(
+        self,
+        output_path: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ) -> None:
+        if self.can_copy:
+            shutil.copyfile(self.input_file, output_path)
+        else:
+            sink_batches_to_parquet(
+                self._iter_batches(progress_callback),
+                output_path,
+                get_empty=lambda: self.load_preview(0),
+                write_options=write_options,
+            )
+
+        if progress_callback is not None:
+            progress_callback(1)
+
+    def _iter_batches(self, progress_callback: Optional[Callable[[float], None]]):
+        file = pq.ParquetFile(self.input_file)
+        num_rows = file.metadata.num_rows
+        rows_read = 0
+        for record_batch in file.iter_batches(batch_size=self.batch_size):
+            batch = pl.from_arrow(record_batch)
+            yield encode_nested_columns(batch)
+
+            rows_read += batch.height
+            if progress_callback is not None:
+                progress_callback(rows_read / num_rows)
@@ -0,0 +1,292 @@
+"""
+Helpers for importers that stream their input file, possibly through a
+decompressor, instead of handing a path to a polars scanner.
+"""
+
+import os
+from typing import Callable, Iterable, Literal, Optional
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
+InputCompression = Literal["gzip", "zstd"]
+
+_compression_by_extension: dict[str, InputCompression] = {
+    ".gz": "gzip",
+    ".zst": "zstd",
+}
+
+STREAM_CHUNK_SIZE = 16 << 20
+"""The number of bytes read from the input stream at a time."""
+
+MAX_CHUNK_SIZE_FACTOR = 8
+"""How many times the chunk size a chunk may grow to while looking for the end
+of a quoted field."""
+
+
+class RowBoundaryNotFoundError(ValueError):
+    """
+    No line break outside of quotes was found within the chunk size limit. This
+    usually means that a field has a stray quote, like `5" screen`, which CSV
+    parsers read as text but which throws off counting quotes.
+    """
+
+
+def detect_compression(input_path: str) -> Optional[InputCompression]:
+    """Detects the compression of the input file by its extension."""
+    _, extension = os.path.splitext(input_path.lower())
+    return _compression_by_extension.get(extension)
+
+
+def strip_compression_extension(input_path: str) -> str:
+    """Removes a compression extension like `.gz` from the path, if any."""
+    if detect_compression(input_path) is None:
+        return input_path
+    return os.path.splitext(input_path)[0]
+
+
+class InputStream:
+    """
+    A binary stream over the input file that transparently decompresses it and
+    keeps track of how much of the file on disk has been consumed.
+    """
+
+    def __init__(self, input_path: str, compression: Optional[InputCompression]):
+        self.size = os.path.getsize(input_path)
+        self.raw = pa.OSFile(input_path, "rb")
+        self.stream = (
+            pa.CompressedInputStream(self.raw, compression) if compression else self.raw
+        )
+
+    def read(self, n: int) -> bytes:
+        return self.stream.read(n)
+
+    @property
+    def progress(self) -> float:
+        """The fraction of the (compressed) file read so far."""
+        return self.raw.tell() / self.size if self.size else 1
+
+    def close(self):
+        self.stream.close()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_line_chunks(
+    stream: InputStream,
+    *,
+    quote_char: Optional[str] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterable[bytes]:
+    """
+    Reads the stream in chunks of roughly `chunk_size` bytes that each end at a
+    line break. If `quote_char` is given, line breaks inside quoted fields are
+    not considered; quotes escaped by doubling them keep the count even, so a
+    line break is outside of quotes if an even number of quotes precede it.
+
+    Raises `RowBoundaryNotFoundError` if a chunk would grow past
+    `MAX_CHUNK_SIZE_FACTOR` times the chunk size without such a line break.
+    The chunks yielded before that are complete.
+    """
+    quote = quote_char.encode() if quote_char else None
+    max_chunk_size = MAX_CHUNK_SIZE_FACTOR * chunk_size
+    # The data read since the last cut, and the number of quotes in it. Earlier
+    # data never gets a cut later, since the quotes before it don't change, so
+    # only the newly read data is scanned.
+    pending: list[bytes] = []
+    pending_size = 0
+    pending_quotes = 0
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            rest = b"".join(pending)
+            if rest.strip():
+                yield rest
+            return
+
+        cut = _find_chunk_end(data, quote, quotes_before=pending_quotes)
+        if cut is None:
+            pending.append(data)
+            pending_size += len(data)
+            if quote is not None:
+                pending_quotes += data.count(quote)
+                if pending_size > max_chunk_size:
+                    raise RowBoundaryNotFoundError(
+                        f"No row ends outside of quotes in {pending_size:,} bytes"
+                    )
+            continue
+
+        yield b"".join([*pending, data[:cut]])
+        pending = [data[cut:]]
+        pending_size = len(data) - cut
+        pending_quotes = data.count(quote, cut) if quote is not None else 0
+
+
+def _find_chunk_end(
+    buffer: bytes, quote: Optional[bytes], *, quotes_before: int = 0
+) -> Optional[int]:
+    """
+    Finds the position right after the last line break that isn't inside a
+    quoted field, or None if there is no such line break. `quotes_before` is
+    the number of quotes in the data that precedes the buffer.
+    """
+    newline_pos = buffer.rfind(b"\n")
+    if quote is None:
+        return newline_pos + 1 if newline_pos >= 0 else None
+
+    quotes_before += buffer.count(quote, 0, newline_pos)
+    while newline_pos >= 0:
+        if quotes_before % 2 == 0:
+            return newline_pos + 1
+        previous_newline_pos = buffer.rfind(b"\n", 0, newline_pos)
+        quotes_before -= buffer.count(quote, previous_newline_pos + 1, newline_pos)
+        newline_pos = previous_newline_pos
+    return None
+
+
+def read_head(
+    input_path: str,
+    compression: Optional[InputCompression],
+    *,
+    size: int = 1 << 20,
+    quote_char: Optional[str] = None,
+) -> bytes:
+    """
+    Reads about `size` bytes from the beginning of the (decompressed) file, cut
+    at the last complete line.
+    """
+    with InputStream(input_path, compression) as stream:
+        head = stream.read(size)
+        if len(head) < size:
+            return head
+        cut = _find_chunk_end(head, quote_char.encode() if quote_char else None)
+        return head[:cut] if cut else head
+
+
+def encode_nested_columns(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Converts nested (struct and list) columns to JSON text, since the analyzers
+    and the column semantics only deal with flat values.
+    """
+    return df.with_columns(
+        (
+            pl.col(name).struct.json_encode()
+            if isinstance(dtype, pl.Struct)
+            # Polars can only JSON-encode structs, so the list is wrapped in
+            # one and the wrapping is stripped from the text afterwards.
+            else pl.struct(pl.col(name).alias("v"))
+            .struct.json_encode()
+            .str.strip_prefix('{"v":')
+            .str.strip_suffix("}")
+        ).alias(name)
+        for name, dtype in df.schema.items()
+        if dtype.is_nested()
+    )
+
+
+def sink_batches_to_parquet(
+    batches: Iterable[pl.DataFrame],
+    output_path: str,
+    *,
+    get_empty: Callable[[], pl.DataFrame],
+    write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    row_group_size: Optional[int] = None,
+):
+    """
+    Appends each batch to a parquet file. Batches are cast to the schema of the
+    ones before them. A batch with new columns, or with types that don't fit
+    the schema (floats in an integer column, text in a column that was all
+    nulls), widens it, and the part of the file written so far is rewritten
+    with the widened schema. Types without a common supertype raise an error.
+
+    If there are no batches, the (empty) dataframe from `get_empty` is written
+    instead so that the columns are kept. The `row_group_size`, if given,
+    overrides the one of the write options.
+    """
+    row_group_size = row_group_size or write_options.row_group_size
+    writer: Optional[pq.ParquetWriter] = None
+    schema: Optional[pl.Schema] = None
+    try:
+        for batch in batches:
+            if schema is not None and batch.schema != schema:
+                widened_schema = widen_schema(schema, batch.schema)
+                if widened_schema != schema:
+                    writer.close()
+                    writer = _rewrite_parquet(
+                        output_path, widened_schema, write_options
+                    )
+                    schema = widened_schema
+                batch = conform_to_schema(batch, schema)
+
+            table = batch.to_arrow()
+            if writer is None:
+                schema = batch.schema
+                writer = pq.ParquetWriter(
+                    output_path,
+                    schema=table.schema,
+                    **write_options.pyarrow_writer_kwargs(),
+                )
+            writer.write_table(table.cast(writer.schema), row_group_size=row_group_size)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        get_empty().write_parquet(output_path, **write_options.polars_kwargs())
+
+
+def widen_schema(schema: pl.Schema, other: pl.Schema) -> pl.Schema:
+    """
+    Returns the schema with the columns of both, each of the supertype of its
+    types in either. Raises if there is no such supertype.
+    """
+    return pl.concat(
+        [pl.DataFrame(schema=schema), pl.DataFrame(schema=other)],
+        how="diagonal_relaxed",
+    ).schema
+
+
+def conform_to_schema(df: pl.DataFrame, schema: pl.Schema) -> pl.DataFrame:
+    """
+    Casts the dataframe to the (wider) schema, adding its missing columns as
+    nulls.
+    """
+    return pl.concat([pl.DataFrame(schema=schema), df], how="diagonal_relaxed")
+
+
+def _rewrite_parquet(
+    path: str, schema: pl.Schema, write_options: ParquetWriteOptions
+) -> pq.ParquetWriter:
+    """
+    Rewrites the parquet file row group by row group with the wider schema, and
+    returns the writer, open for more row groups.
+    """
+    previous_path = path + ".narrow"
+    os.replace(path, previous_path)
+    writer = pq.ParquetWriter(
+        path,
+        schema=pl.DataFrame(schema=schema).to_arrow().schema,
+        **write_options.pyarrow_writer_kwargs(),
+    )
+    try:
+        with pq.ParquetFile(previous_path) as previous_file:
+            for index in range(previous_file.num_row_groups):
+                batch = pl.from_arrow(previous_file.read_row_group(index))
+                writer.write_table(
+                    conform_to_schema(batch, schema).to_arrow().cast(writer.schema)
+                )
+    except BaseException:
+        writer.close()
+        raise
+    finally:
+        os.remove(previous_path)
+
+    return writer
@@ -0,0 +1,65 @@
+import polars as pl
+import pytest
+
+from .ndjson import NdjsonImporter
+from .stream import sink_batches_to_parquet
+
+
+def _sink(tmp_path, batches: list[pl.DataFrame]) -> pl.DataFrame:
+    output_path = str(tmp_path / "output.parquet")
+    sink_batches_to_parquet(
+        iter(batches),
+        output_path,
+        get_empty=lambda: pl.DataFrame(),
+        row_group_size=1,
+    )
+    return pl.read_parquet(output_path)
+
+
+def test_sink_widens_types_and_adds_columns(tmp_path):
+    result = _sink(
+        tmp_path,
+        [
+            pl.DataFrame({"id": [1, 2], "score": [1, 2], "note": [None, None]}),
+            pl.DataFrame({"id": [3], "score": [2.5], "note": ["late"]}),
+            pl.DataFrame({"id": [4], "score": [3], "tag": ["new"]}),
+        ],
+    )
+
+    assert result.schema == pl.Schema(
+        {"id": pl.Int64, "score": pl.Float64, "note": pl.String, "tag": pl.String}
+    )
+    assert result.to_dicts() == [
+        {"id": 1, "score": 1.0, "note": None, "tag": None},
+        {"id": 2, "score": 2.0, "note": None, "tag": None},
+        {"id": 3, "score": 2.5, "note": "late", "tag": None},
+        {"id": 4, "score": 3.0, "note": None, "tag": "new"},
+    ]
+
+
+def test_sink_raises_without_supertype(tmp_path):
+    with pytest.raises(pl.exceptions.SchemaError):
+        _sink(
+            tmp_path,
+            [
+                pl.DataFrame({"flag": [True]}),
+                pl.DataFrame({"flag": [[1, 2]]}),
+            ],
+        )
+
+
+def test_ndjson_import_keeps_late_fields(tmp_path):
+    input_path = tmp_path / "posts.ndjson"
+    input_path.write_text(
+        '{"id": 1, "score": 1, "reply_to": null}\n' * 200
+        + '{"id": 2, "score": 1.5, "reply_to": 1, "lang": "en"}\n'
+    )
+    output_path = str(tmp_path / "posts.parquet")
+
+    NdjsonImporter().init_session(str(input_path)).import_as_parquet(output_path)
+
+    result = pl.read_parquet(output_path)
+    assert result.height == 201
+    assert result.schema["score"] == pl.Float64
+    assert result["reply_to"].to_list()[-1] == 1
+    assert result["lang"].to_list()[-1] == "en"
@@ -0,0 +1,18 @@
+from .profiling import profile_stage
+from .run_report import (
+    BlockReport,
+    RunRecorder,
+    RunReport,
+    add_rows,
+    measure,
+    record_rows,
+)
+from .startup import (
+    STARTUP_BENCHMARK_ENV_VAR,
+    STARTUP_MILESTONE_PREFIX,
+    STARTUP_TIME_ENV_VAR,
+    get_startup_seconds,
+    is_startup_benchmark,
+    is_startup_time_shown,
+    report_startup_milestone,
+)
@@ -0,0 +1,104 @@
+import cProfile
+import io
+import os
+import pstats
+import traceback
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+import polars as pl
+
+PROFILE_STATS_LIMIT = 60
+"""The number of functions listed in the readable profile summary."""
+
+_PROFILED_QUERY_METHODS = [
+    "collect",
+    "sink_parquet",
+    "sink_ipc",
+    "sink_csv",
+    "sink_ndjson",
+]
+
+
+@contextmanager
+def profile_stage(output_dir: str, name: str):
+    """
+    Runs the enclosed code under cProfile and records the plans of the polars
+    queries it runs. Writes to the output directory:
+
+    - `{name}.prof`, the profile, which can be loaded with `pstats` or viewers
+      like snakeviz;
+    - `{name}.txt`, the functions taking the most cumulative time;
+    - `{name}.plans.txt`, the optimized plan of each polars query, with the
+      line of code it was run from. This includes the queries that eager
+      dataframe operations run internally.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    plans: list[str] = []
+    profiler = cProfile.Profile()
+    with _record_query_plans(plans):
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+    profiler.dump_stats(os.path.join(output_dir, f"{name}.prof"))
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats(
+        pstats.SortKey.CUMULATIVE
+    ).print_stats(PROFILE_STATS_LIMIT)
+    with open(os.path.join(output_dir, f"{name}.txt"), "w", encoding="utf8") as file:
+        file.write(summary.getvalue())
+    with open(
+        os.path.join(output_dir, f"{name}.plans.txt"), "w", encoding="utf8"
+    ) as file:
+        file.write("\n\n".join(plans) if plans else "(No lazy queries were run)\n")
+
+
+@contextmanager
+def _record_query_plans(plans: list[str]):
+    originals = {
+        method: getattr(pl.LazyFrame, method) for method in _PROFILED_QUERY_METHODS
+    }
+
+    def record(method: str):
+        original = originals[method]
+
+        @wraps(original)
+        def wrapper(self: pl.LazyFrame, *args, **kwargs):
+            caller = _get_caller_outside_polars()
+            streaming = method != "collect" or kwargs.get("streaming", False)
+            try:
+                plan = self.explain(streaming=streaming)
+            except Exception as ex:
+                plan = f"(The plan couldn't be explained: {ex})"
+            plans.append(
+                f"# {method} at {caller.filename}:{caller.lineno} "
+                f"in {caller.name}\n{plan}"
+            )
+            return original(self, *args, **kwargs)
+
+        return wrapper
+
+    for method in _PROFILED_QUERY_METHODS:
+        setattr(pl.LazyFrame, method, record(method))
+    try:
+        yield
+    finally:
+        for method, original in originals.items():
+            setattr(pl.LazyFrame, method, original)
+
+
+def _get_caller_outside_polars() -> traceback.FrameSummary:
+    polars_dir = str(Path(pl.__file__).parent)
+    stack = traceback.extract_stack()[:-2]
+    return next(
+        (
+            frame
+            for frame in reversed(stack)
+            if not frame.filename.startswith(polars_dir)
+        ),
+        stack[-1],
+    )
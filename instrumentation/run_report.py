@@ -0,0 +1,170 @@
+import os
+import platform
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Literal, Optional
+
+import polars as pl
+import psutil
+from pydantic import BaseModel
+
+RSS_SAMPLE_INTERVAL = 0.05
+"""Seconds between the memory samples that the peak memory is taken from."""
+
+
+class BlockReport(BaseModel):
+    name: str
+    kind: Literal["stage", "block"]
+    """Stages are whole analyzers; blocks are the steps within them."""
+    wall_seconds: float = 0
+    cpu_seconds: float = 0
+    """CPU time of all of the process's threads while the block ran."""
+    peak_rss_bytes: int = 0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    blocks: list["BlockReport"] = []
+
+
+class RunReport(BaseModel):
+    analyzer_id: str
+    app_version: Optional[str]
+    started_at: datetime
+    wall_seconds: float = 0
+    cpu_seconds: float = 0
+    peak_rss_bytes: int = 0
+    python_version: str = platform.python_version()
+    polars_version: str = pl.__version__
+    platform: str = platform.platform()
+    cpu_count: Optional[int] = os.cpu_count()
+    polars_thread_pool_size: int = pl.thread_pool_size()
+    stages: list[BlockReport] = []
+
+
+class RunRecorder:
+    """
+    Records the time and memory that each stage of an analysis run and each
+    block within it takes. While a recorder is active, `measure` records into
+    it; otherwise measuring does nothing.
+
+    Peak memory is sampled from a background thread, so memory that is only
+    held for less than the sampling interval may be missed.
+    """
+
+    def __init__(self, analyzer_id: str, app_version: Optional[str] = None):
+        self.report = RunReport(
+            analyzer_id=analyzer_id,
+            app_version=app_version,
+            started_at=datetime.now(),
+        )
+        self._process = psutil.Process()
+        self._open_blocks: list[BlockReport] = []
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._sampler = Thread(target=self._sample_rss, daemon=True)
+
+    @contextmanager
+    def activate(self):
+        """
+        Makes this the recorder that `measure` records into, for the duration
+        of the run.
+        """
+        global _active_recorder
+        previous_recorder = _active_recorder
+        _active_recorder = self
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        self._sampler.start()
+        try:
+            yield self
+        finally:
+            self._stop_event.set()
+            self._sampler.join()
+            _active_recorder = previous_recorder
+            self.report.wall_seconds = time.perf_counter() - start_wall
+            self.report.cpu_seconds = time.process_time() - start_cpu
+            self.report.peak_rss_bytes = max(
+                (stage.peak_rss_bytes for stage in self.report.stages),
+                default=self._process.memory_info().rss,
+            )
+
+    @contextmanager
+    def _measure(self, name: str, kind: Literal["stage", "block"]):
+        block = BlockReport(name=name, kind=kind)
+        with self._lock:
+            parent_blocks = (
+                self._open_blocks[-1].blocks
+                if self._open_blocks
+                else self.report.stages
+            )
+            parent_blocks.append(block)
+            self._open_blocks.append(block)
+        self._update_peak_rss()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield block
+        finally:
+            block.wall_seconds = time.perf_counter() - start_wall
+            block.cpu_seconds = time.process_time() - start_cpu
+            self._update_peak_rss()
+            with self._lock:
+                self._open_blocks.remove(block)
+
+    def _sample_rss(self):
+        while not self._stop_event.wait(RSS_SAMPLE_INTERVAL):
+            self._update_peak_rss()
+
+    def _update_peak_rss(self):
+        rss = self._process.memory_info().rss
+        with self._lock:
+            for block in self._open_blocks:
+                block.peak_rss_bytes = max(block.peak_rss_bytes, rss)
+
+
+_active_recorder: Optional[RunRecorder] = None
+
+
+@contextmanager
+def measure(name: str, kind: Literal["stage", "block"] = "block"):
+    """
+    Measures the enclosed code as a block of the active run, nested in the
+    block that is being measured already, if any. Yields the block's report,
+    which the rows in and out can be filled into, or None when no run is
+    being recorded.
+    """
+    if _active_recorder is None:
+        yield None
+        return
+    with _active_recorder._measure(name, kind) as block:
+        yield block
+
+
+def record_rows(rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+    """
+    Records the number of rows that the innermost measured block reads and
+    writes. Does nothing when no run is being recorded.
+    """
+    recorder = _active_recorder
+    if recorder is None or not recorder._open_blocks:
+        return
+    block = recorder._open_blocks[-1]
+    if rows_in is not None:
+        block.rows_in = rows_in
+    if rows_out is not None:
+        block.rows_out = rows_out
+
+
+def add_rows(rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+    """
+    Adds to the number of rows that the innermost measured block reads and
+    writes, for blocks that read or write several tables. Does nothing when no
+    run is being recorded.
+    """
+    recorder = _active_recorder
+    if recorder is None or not recorder._open_blocks:
+        return
+    block = recorder._open_blocks[-1]
+    if rows_in is not None:
+        block.rows_in = (block.rows_in or 0) + rows_in
+    if rows_out is not None:
+        block.rows_out = (block.rows_out or 0) + rows_out
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+import psutil
+
+STARTUP_TIME_ENV_VAR = "MANGOTANGO_STARTUP_TIME"
+"""Set this to 1 to show how long the app took to start on the splash screen."""
+
+STARTUP_BENCHMARK_ENV_VAR = "MANGOTANGO_STARTUP_BENCHMARK"
+"""
+The startup benchmark sets this to 1. The app then reports when it reaches
+the splash screen and the main menu, and exits at the main menu instead of
+waiting for input.
+"""
+
+STARTUP_MILESTONE_PREFIX = "mangotango-startup:"
+
+
+def is_startup_time_shown() -> bool:
+    return os.environ.get(STARTUP_TIME_ENV_VAR) == "1"
+
+
+def is_startup_benchmark() -> bool:
+    return os.environ.get(STARTUP_BENCHMARK_ENV_VAR) == "1"
+
+
+def report_startup_milestone(name: str):
+    """
+    Reports that the app reached a point of its startup to the startup
+    benchmark, on stderr. Does nothing unless the benchmark started the app.
+    """
+    if is_startup_benchmark():
+        print(f"{STARTUP_MILESTONE_PREFIX}{name}", file=sys.stderr, flush=True)
+
+
+def get_startup_seconds() -> float:
+    """
+    Gets the seconds since the app's process was started, which includes
+    starting the interpreter and importing the app's modules. The one-file
+    executable is unpacked by a parent process running the same executable
+    first, so the time is counted from that process instead.
+    """
+    process = psutil.Process()
+    if getattr(sys, "frozen", False):
+        try:
+            parent = process.parent()
+            if parent is not None and parent.exe() == process.exe():
+                process = parent
+        except psutil.Error:
+            pass
+    return time.time() - process.create_time()
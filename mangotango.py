@@ -1,14 +1,22 @@
+import sys
 from multiprocessing import freeze_support
 
-from analyzers import suite
-from app import App, AppContext
-from components import ViewContext, main_menu, splash
-from storage import Storage
-from terminal_tools import enable_windows_ansi_support
-from terminal_tools.inception import TerminalContext
-
 if __name__ == "__main__":
     freeze_support()
+    # The app is imported only now, so that the processes that multiprocessing
+    # starts from this module don't import it as well
+    if len(sys.argv) > 1:
+        from cli import run_cli
+
+        sys.exit(run_cli(sys.argv[1:]))
+
+    from analyzers import suite
+    from app import App, AppContext
+    from components import ViewContext, main_menu, splash
+    from storage import Storage
+    from terminal_tools import enable_windows_ansi_support
+    from terminal_tools.inception import TerminalContext
+
     enable_windows_ansi_support()
     storage = Storage(app_name="MangoTango", app_author="Civic Tech DC")
 
@@ -0,0 +1,136 @@
+"""
+Parsing of datetime strings with explicit formats. The formats are inferred
+once from a sample of the column, which is much faster than letting polars
+guess the format of a whole column.
+"""
+
+from typing import Optional
+
+import polars as pl
+
+DATETIME_FORMATS = [
+    # ISO 8601, with optional fractional seconds and offset ("Z" or "+02:00")
+    "%Y-%m-%dT%H:%M:%S%.f%#z",
+    "%Y-%m-%dT%H:%M:%S%.f",
+    "%Y-%m-%d %H:%M:%S%.f%#z",
+    "%Y-%m-%d %H:%M:%S%.f",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    # Twitter/X API v1
+    "%a %b %d %H:%M:%S %z %Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y",
+]
+"""The candidate formats, in order of preference when they parse equally well."""
+
+FORMAT_SAMPLE_SIZE = 1000
+"""The number of values the formats are inferred from."""
+
+MAX_FORMATS = 3
+"""The most formats a column is parsed with; the best one and its fallbacks."""
+
+
+def infer_datetime_formats(sample: pl.Series) -> list[str]:
+    """
+    Finds the candidate formats that parse any of the sample values, ordered by
+    the number of values each one parses.
+    """
+    sample = sample.drop_nulls()
+    if sample.len() == 0:
+        return []
+    counts = (
+        sample.to_frame()
+        .select(
+            _parse(pl.first(), format).is_not_null().sum().alias(format)
+            for format in DATETIME_FORMATS
+        )
+        .row(0, named=True)
+    )
+    return sorted(
+        (format for format in DATETIME_FORMATS if counts[format] > 0),
+        key=lambda format: -counts[format],
+    )
+
+
+def parse_datetime_strings(
+    series: pl.Series, formats: Optional[list[str]] = None
+) -> pl.Series:
+    """
+    Parses a string column into naive UTC datetimes. Values with a UTC offset
+    are converted to UTC; values without one are assumed to be UTC already.
+    Unparseable values become null. This never raises.
+
+    The formats are inferred from a sample of the column unless given. If no
+    candidate format fits, polars guesses the format instead.
+
+    Also accepts a column expression, which is parsed batch by batch.
+    """
+    if isinstance(series, pl.Expr):
+        return series.map_batches(
+            lambda batch: parse_datetime_strings(batch, formats),
+            return_dtype=pl.Datetime(),
+        )
+
+    if formats is None:
+        sample = series.drop_nulls()
+        if sample.len() > FORMAT_SAMPLE_SIZE:
+            sample = sample.sample(FORMAT_SAMPLE_SIZE, seed=0)
+        formats = infer_datetime_formats(sample)
+
+    if not formats:
+        try:
+            result = series.str.strptime(pl.Datetime, strict=False)
+        except Exception:
+            # Polars couldn't guess a format either
+            return pl.repeat(None, series.len(), dtype=pl.Datetime(), eager=True).alias(
+                series.name
+            )
+        if result.dtype.time_zone is None:
+            return result
+        return result.dt.convert_time_zone("UTC").dt.replace_time_zone(None)
+
+    return (
+        series.to_frame()
+        .select(
+            pl.coalesce(_parse(pl.first(), format) for format in formats[:MAX_FORMATS])
+        )
+        .to_series()
+        .alias(series.name)
+    )
+
+
+def can_parse_datetime_strings(series: pl.Series, n: int = 10) -> bool:
+    """
+    Checks whether any of the first few values parse, which quickly rules out
+    most text columns.
+    """
+    head = series.drop_nulls().head(n)
+    return parse_datetime_strings(head).null_count() < head.len()
+
+
+def datetime_parse_failure_fraction(series: pl.Series) -> float:
+    """
+    The fraction of the non-null values of a string column that can't be
+    parsed as datetimes.
+    """
+    non_null = series.drop_nulls()
+    if non_null.len() == 0:
+        return 0
+    return parse_datetime_strings(non_null).null_count() / non_null.len()
+
+
+def _parse(column: pl.Expr, format: str) -> pl.Expr:
+    result = column.str.strptime(pl.Datetime(), format, strict=False)
+    if "z" not in format:
+        return result
+    # Parsing an offset produces UTC datetimes
+    return result.dt.replace_time_zone(None)
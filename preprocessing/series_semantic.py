@@ -1,16 +1,21 @@
 from datetime import datetime
-from typing import Callable, Type, Union
+from typing import Callable, Optional, Type, Union
 
 import polars as pl
 from pydantic import BaseModel
 
 from analyzer_interface import DataType
 
+from .datetime_format import can_parse_datetime_strings, parse_datetime_strings
+
 
 class SeriesSemantic(BaseModel):
     semantic_name: str
     column_type: Union[Type[pl.DataType], Callable[[pl.DataType], bool]]
     prevalidate: Callable[[pl.Series], bool] = lambda s: True
+    # `try_convert` and `validate_result` must also work when given a column
+    # expression instead of a series, so that all the checks of a dataframe
+    # can be evaluated in a single query.
     try_convert: Callable[[pl.Series], pl.Series]
     validate_result: Callable[[pl.Series], pl.Series] = lambda s: s.is_not_null()
     data_type: DataType
@@ -28,6 +33,14 @@ class SeriesSemantic(BaseModel):
             return False
         return self.validate_result(result).sum() / sample.len() > threshold
 
+    def check_expr(self, column: pl.Expr, threshold: float = 0.8) -> pl.Expr:
+        """
+        The expression form of `check`, minus the type check and prevalidation,
+        for evaluating over an already sampled dataframe.
+        """
+        valid_count = self.validate_result(self.try_convert(column)).sum()
+        return valid_count > threshold * pl.len()
+
     def check_type(self, series: pl.Series):
         if isinstance(self.column_type, type):
             return isinstance(series.dtype, self.column_type)
@@ -37,7 +50,8 @@ class SeriesSemantic(BaseModel):
 datetime_string = SeriesSemantic(
     semantic_name="datetime",
     column_type=pl.String,
-    try_convert=lambda s: s.str.strptime(pl.Datetime, strict=False),
+    prevalidate=lambda s: can_parse_datetime_strings(s),
+    try_convert=parse_datetime_strings,
     data_type="datetime",
 )
 
@@ -119,6 +133,17 @@ all_semantics = [
 ]
 
 
+def get_semantic_by_name(semantic_name: str) -> Optional[SeriesSemantic]:
+    return next(
+        (
+            semantic
+            for semantic in all_semantics
+            if semantic.semantic_name == semantic_name
+        ),
+        None,
+    )
+
+
 def infer_series_semantic(
     series: pl.Series, *, threshold: float = 0.8, sample_size=100
 ):
@@ -128,12 +153,87 @@ def infer_series_semantic(
     return None
 
 
+def infer_dataframe_semantics(
+    df: pl.DataFrame, *, threshold: float = 0.8, sample_size=100
+) -> dict[str, Optional[SeriesSemantic]]:
+    """
+    Infers the semantic of every column, like `infer_series_semantic`, but
+    evaluates every candidate semantic of every column in a single parallel
+    query over a sample of the rows.
+    """
+    sample = df if df.height < sample_size else df.sample(sample_size, seed=0)
+
+    candidates: dict[str, list[SeriesSemantic]] = {
+        col: [
+            semantic
+            for semantic in all_semantics
+            if semantic.check_type(sample[col])
+            and _try_prevalidate(semantic, sample[col])
+        ]
+        for col in sample.columns
+    }
+    results = _evaluate_checks(
+        sample,
+        {
+            f"{col}\0{index}": semantic.check_expr(pl.col(col), threshold)
+            for col, semantics in candidates.items()
+            for index, semantic in enumerate(semantics)
+        },
+    )
+    return {
+        col: next(
+            (
+                semantic
+                for index, semantic in enumerate(semantics)
+                if results[f"{col}\0{index}"]
+            ),
+            None,
+        )
+        for col, semantics in candidates.items()
+    }
+
+
+def _evaluate_checks(df: pl.DataFrame, checks: dict[str, pl.Expr]) -> dict[str, bool]:
+    """
+    Evaluates the boolean check expressions in one query. If a conversion
+    fails outright, the checks are split in halves to isolate the failing ones,
+    which count as mismatches like in `SeriesSemantic.check`.
+    """
+    if not checks:
+        return {}
+    try:
+        return df.select(expr.alias(name) for name, expr in checks.items()).row(
+            0, named=True
+        )
+    except Exception:
+        if len(checks) == 1:
+            return {name: False for name in checks}
+        items = list(checks.items())
+        middle = len(items) // 2
+        return {
+            **_evaluate_checks(df, dict(items[:middle])),
+            **_evaluate_checks(df, dict(items[middle:])),
+        }
+
+
+def _try_prevalidate(semantic: SeriesSemantic, sample: pl.Series) -> bool:
+    try:
+        return semantic.prevalidate(sample)
+    except Exception:
+        return False
+
+
 def sample_series(series: pl.Series, n: int = 100):
     if series.len() < n:
         return series
     return series.sample(n, seed=0)
 
 
-def constant_series(series: pl.Series, constant) -> pl.Series:
+def constant_series(series: pl.Series | pl.Expr, constant) -> pl.Series | pl.Expr:
     """Create a series with a constant value for each row of `series`."""
-    return pl.Series([constant] * series.len(), dtype=pl.Boolean)
+    return pl.repeat(
+        constant,
+        series.len(),
+        dtype=pl.Boolean,
+        eager=isinstance(series, pl.Series),
+    )
@@ -1,7 +1,19 @@
 # main.spec
 # This file tells PyInstaller how to bundle your application
+#
+# By default, this builds a single executable file, which unpacks itself into a
+# temporary directory every time it starts. Pass `--onedir` to build a folder
+# instead, which starts faster because nothing has to be unpacked:
+#
+#   pyinstaller pyinstaller.spec -- --onedir
 
-from PyInstaller.utils.hooks import copy_metadata
+import argparse
+
+from PyInstaller.utils.hooks import collect_submodules, copy_metadata
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--onedir', action='store_true')
+options = parser.parse_args()
 
 block_cipher = None
 
@@ -26,7 +38,10 @@ a = Analysis(
     hiddenimports=[
         'readchar',
         'numpy',
-        'numpy.core.multiarray'
+        'numpy.core.multiarray',
+
+        # analyzer entry points are imported on demand
+        *collect_submodules('analyzers')
     ],  # Include any imports that PyInstaller might miss
     hookspath=[],
     runtime_hooks=[],
@@ -35,15 +50,37 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    name='mangotango',  # The name of the executable
-    debug=False,
-    strip=True,
-    upx=True,  # You can set this to False if you don’t want UPX compression
-    console=True  # Set to False if you don't want a console window
-)
+if options.onedir:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='mangotango',
+        debug=False,
+        strip=True,
+        upx=False,  # UPX compressed libraries are decompressed on every start
+        console=True
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=True,
+        upx=False,
+        name='mangotango'
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        name='mangotango',  # The name of the executable
+        debug=False,
+        strip=True,
+        upx=True,  # You can set this to False if you don’t want UPX compression
+        console=True  # Set to False if you don't want a console window
+    )
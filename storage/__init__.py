@@ -4,6 +4,7 @@ import re
 import shutil
 from datetime import datetime
 from typing import Callable, Iterable, Literal, Optional
+from urllib.parse import quote
 
 import platformdirs
 import polars as pl
@@ -11,11 +12,30 @@ import pyarrow.parquet as pq
 from filelock import FileLock
 from pydantic import BaseModel
 from tinydb import Query, TinyDB
-from xlsxwriter import Workbook
 
 from analyzer_interface.interface import AnalyzerOutput
+from analyzer_interface.parquet_options import ParquetWriteOptions, ParquetWritePreset
+from instrumentation import RunReport
 
 from .file_selector import FileSelectorStateManager
+from .output_tables import (
+    OutputStorageFormat,
+    count_output_table_rows,
+    iter_output_table_batches,
+    read_output_table,
+    resolve_output_table_path,
+    scan_output_table,
+    write_output_table,
+    write_output_table_batches,
+)
+from .writers import (
+    PartitionedBatchWriter,
+    create_batch_writer,
+    decode_categorical_columns,
+    iter_dataframe_batches,
+    sink_or_write,
+    to_json_compatible,
+)
 
 
 class ProjectModel(BaseModel):
@@ -27,6 +47,23 @@ class ProjectModel(BaseModel):
 class SettingsModel(BaseModel):
     class_: Literal["settings"] = "settings"
     export_chunk_size: Optional[int | Literal[False]] = None
+    encode_identifiers: bool = False
+    """Whether identifier columns are passed to analyzers dictionary-encoded."""
+    web_server_host: Optional[str] = None
+    """The address the dashboards are served on; local-only by default."""
+    web_server_port: Optional[int] = None
+    """The preferred port of the dashboards; a free one is used if it's taken."""
+    web_server_threads: Optional[int] = None
+    """The number of threads serving dashboard requests at the same time."""
+    profile_analyses: bool = False
+    """Whether analyzers are run under the profiler, saving their profiles and
+    query plans in the analysis directory."""
+    analysis_output_format: Optional[OutputStorageFormat] = None
+    """The format that analyzer outputs written through their table writers are
+    stored in; parquet by default."""
+    parquet_write_preset: Optional[ParquetWritePreset] = None
+    """How the parquet files of imported projects, analyzer outputs and exports
+    are encoded, unless an analysis chooses otherwise; balanced by default."""
 
 
 class FileSelectionState(BaseModel):
@@ -44,6 +81,8 @@ class AnalysisModel(BaseModel):
     column_mapping: Optional[dict[str, str]] = None
     create_timestamp: Optional[float] = None
     is_draft: bool = False
+    parquet_write_preset: Optional[ParquetWritePreset] = None
+    """Overrides the preset in the settings for this analysis' outputs."""
 
     def create_time(self):
         return (
@@ -53,17 +92,64 @@ class AnalysisModel(BaseModel):
         )
 
 
-SupportedOutputExtension = Literal["parquet", "csv", "xlsx", "json"]
+class ColumnProfile(BaseModel):
+    name: str
+    semantic_name: Optional[str] = None
+    null_count: int
+    approx_n_unique: int
+    min: Optional[str] = None
+    max: Optional[str] = None
+    parse_failure_fraction: Optional[float] = None
+    """For text columns converted by their semantic, like datetime strings, the
+    fraction of values in the sample that couldn't be converted."""
+
+
+class ProjectProfile(BaseModel):
+    version: int
+    row_count: int
+    columns: list[ColumnProfile]
+
+
+SupportedOutputExtension = Literal[
+    "parquet", "csv", "csv.gz", "csv.zst", "arrow", "xlsx", "json", "ndjson"
+]
+
+PARTITIONABLE_OUTPUT_EXTENSIONS: list[SupportedOutputExtension] = [
+    "parquet",
+    "csv",
+    "csv.gz",
+    "csv.zst",
+    "arrow",
+    "ndjson",
+]
+"""Export formats that can be split into Hive-style partition directories."""
+
+PARTITION_KEY_COLUMN = "__partition_key__"
+
+MAX_EXPORT_PARTITIONS = 1_000
+"""The most distinct values a column may have to be offered for partitioning
+an export by."""
 
 
 class Storage:
-    def __init__(self, *, app_name: str, app_author: str):
-        self.user_data_dir = platformdirs.user_data_dir(
-            appname=app_name, appauthor=app_author, ensure_exists=True
-        )
-        self.temp_dir = platformdirs.user_cache_dir(
-            appname=app_name, appauthor=app_author, ensure_exists=True
-        )
+    def __init__(
+        self, *, app_name: str, app_author: str, data_dir: Optional[str] = None
+    ):
+        """
+        Stores the app's data in the user's data directory, or in `data_dir` if
+        given, which keeps headless runs like benchmarks apart from it.
+        """
+        if data_dir is not None:
+            self.user_data_dir = data_dir
+            self.temp_dir = os.path.join(data_dir, "temp")
+            os.makedirs(self.temp_dir, exist_ok=True)
+        else:
+            self.user_data_dir = platformdirs.user_data_dir(
+                appname=app_name, appauthor=app_author, ensure_exists=True
+            )
+            self.temp_dir = platformdirs.user_cache_dir(
+                appname=app_name, appauthor=app_author, ensure_exists=True
+            )
         self.db = TinyDB(self._get_db_path())
         with self._lock_database():
             self._bootstrap_analyses_v1()
@@ -116,42 +202,187 @@ class Storage:
         input_path = self._get_project_input_path(project_id)
         return pl.read_parquet(input_path, n_rows=n_records)
 
+    def scan_project_input(self, project_id: str):
+        return pl.scan_parquet(self._get_project_input_path(project_id))
+
+    def load_project_input_sample(
+        self, project_id: str, *, n_records: int, max_row_groups: int = 10
+    ):
+        """
+        Loads a random sample of rows spread across the whole dataset, so that
+        it also represents datasets whose first rows are atypical. Only a few
+        evenly spaced row groups are read, never the whole file.
+        """
+        input_file = pq.ParquetFile(self._get_project_input_path(project_id))
+        num_row_groups = input_file.num_row_groups
+        if num_row_groups == 0:
+            return pl.from_arrow(input_file.schema_arrow.empty_table())
+
+        row_group_indices = sorted(
+            {
+                index * num_row_groups // min(num_row_groups, max_row_groups)
+                for index in range(min(num_row_groups, max_row_groups))
+            }
+        )
+        n_per_row_group = math.ceil(n_records / len(row_group_indices))
+        samples = []
+        for index in row_group_indices:
+            row_group = pl.from_arrow(input_file.read_row_group(index))
+            samples.append(
+                row_group.sample(min(n_per_row_group, row_group.height), seed=0)
+            )
+        return pl.concat(samples)
+
+    def load_project_profile(self, project_id: str) -> Optional[ProjectProfile]:
+        """
+        Loads the column profile saved for the project, or None if there is none
+        or its sample of rows is missing.
+        """
+        profile_path = self._get_project_profile_path(project_id)
+        if not os.path.exists(profile_path) or not os.path.exists(
+            self._get_project_profile_sample_path(project_id)
+        ):
+            return None
+        with open(profile_path, "r", encoding="utf8") as file:
+            return ProjectProfile.model_validate_json(file.read())
+
+    def load_project_profile_sample(self, project_id: str):
+        return pl.read_parquet(self._get_project_profile_sample_path(project_id))
+
+    def save_project_profile(
+        self, project_id: str, profile: ProjectProfile, sample: pl.DataFrame
+    ):
+        sample.write_parquet(self._get_project_profile_sample_path(project_id))
+        with open(
+            self._get_project_profile_path(project_id), "w", encoding="utf8"
+        ) as file:
+            file.write(profile.model_dump_json())
+
+    def load_project_identifier_dictionary(
+        self, project_id: str, column_name: str, convert: Callable[[pl.Expr], pl.Expr]
+    ) -> pl.Series:
+        """
+        Loads the sorted distinct values of a converted input column, which are
+        the categories that the column is encoded with. The dictionary is
+        computed once per project and column.
+        """
+        dictionary_path = self._get_project_identifier_dictionary_path(
+            project_id, column_name
+        )
+        if not os.path.exists(dictionary_path):
+            os.makedirs(os.path.dirname(dictionary_path), exist_ok=True)
+            (
+                self.scan_project_input(project_id)
+                .select(
+                    convert(pl.col(column_name))
+                    .cast(pl.String)
+                    .drop_nulls()
+                    .unique()
+                    .sort()
+                )
+                .collect(streaming=True)
+                .write_parquet(dictionary_path)
+            )
+        return pl.read_parquet(dictionary_path).to_series()
+
+    def get_project_input_modified_time(self, project_id: str) -> Optional[int]:
+        """
+        Gets the modification time of the project's input file in nanoseconds,
+        or None if it doesn't exist.
+        """
+        try:
+            return os.stat(self._get_project_input_path(project_id)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
     def get_project_input_stats(self, project_id: str):
         input_path = self._get_project_input_path(project_id)
         num_rows = pl.scan_parquet(input_path).select(pl.count()).collect().item()
         return TableStats(num_rows=num_rows)
 
     def save_project_primary_outputs(
-        self, analysis: AnalysisModel, outputs: dict[str, pl.DataFrame]
+        self,
+        analysis: AnalysisModel,
+        outputs: dict[str, pl.DataFrame | pl.LazyFrame],
+        *,
+        output_format: OutputStorageFormat = "parquet",
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
     ):
         for output_id, output_df in outputs.items():
-            self._save_output(
+            write_output_table(
+                output_df,
                 os.path.join(
                     self._get_project_primary_output_root_path(analysis),
                     output_id,
                 ),
-                output_df,
-                "parquet",
+                output_format,
+                parquet_write_options=parquet_write_options,
             )
 
+    def save_project_primary_output_batches(
+        self,
+        analysis: AnalysisModel,
+        output_id: str,
+        batches: Iterable[pl.DataFrame],
+        schema: pl.Schema,
+        *,
+        output_format: OutputStorageFormat = "parquet",
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ):
+        write_output_table_batches(
+            batches,
+            schema,
+            os.path.join(
+                self._get_project_primary_output_root_path(analysis), output_id
+            ),
+            output_format,
+            parquet_write_options=parquet_write_options,
+        )
+
     def save_project_secondary_outputs(
         self,
         analysis: AnalysisModel,
         secondary_id: str,
-        outputs: dict[str, pl.DataFrame],
+        outputs: dict[str, pl.DataFrame | pl.LazyFrame],
+        *,
+        output_format: OutputStorageFormat = "parquet",
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
     ):
         for output_id, output_df in outputs.items():
-            self._save_output(
+            write_output_table(
+                output_df,
                 os.path.join(
                     self._get_project_secondary_output_root_path(
                         analysis, secondary_id
                     ),
                     output_id,
                 ),
-                output_df,
-                "parquet",
+                output_format,
+                parquet_write_options=parquet_write_options,
             )
 
+    def save_project_secondary_output_batches(
+        self,
+        analysis: AnalysisModel,
+        secondary_id: str,
+        output_id: str,
+        batches: Iterable[pl.DataFrame],
+        schema: pl.Schema,
+        *,
+        output_format: OutputStorageFormat = "parquet",
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ):
+        write_output_table_batches(
+            batches,
+            schema,
+            os.path.join(
+                self._get_project_secondary_output_root_path(analysis, secondary_id),
+                output_id,
+            ),
+            output_format,
+            parquet_write_options=parquet_write_options,
+        )
+
     def save_project_secondary_output(
         self,
         analysis: AnalysisModel,
@@ -172,27 +403,50 @@ class Storage:
         output_path_without_extension,
         output_df: pl.DataFrame | pl.LazyFrame,
         extension: SupportedOutputExtension,
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
     ):
         output_df = output_df.lazy()
         os.makedirs(os.path.dirname(output_path_without_extension), exist_ok=True)
         output_path = f"{output_path_without_extension}.{extension}"
         if extension == "parquet":
-            output_df.sink_parquet(output_path)
-        elif extension == "csv":
-            output_df.sink_csv(output_path)
-        elif extension == "xlsx":
-            # See https://xlsxwriter.readthedocs.io/working_with_dates_and_time.html#timezone-handling
-            with Workbook(output_path, {"remove_timezone": True}) as workbook:
-                output_df.collect().write_excel(workbook)
-        elif extension == "json":
-            output_df.collect().write_json(output_path)
+            sink_or_write(
+                output_df,
+                "parquet",
+                output_path,
+                **parquet_write_options.polars_kwargs(),
+            )
+        elif extension == "csv" and not any(
+            dtype.is_nested() for dtype in output_df.collect_schema().dtypes()
+        ):
+            sink_or_write(output_df, "csv", output_path)
+        elif extension == "arrow":
+            sink_or_write(output_df, "ipc", output_path, compression="zstd")
+        elif extension == "ndjson":
+            sink_or_write(to_json_compatible(output_df), "ndjson", output_path)
         else:
-            raise ValueError(f"Unsupported format: {extension}")
+            with create_batch_writer(
+                output_path,
+                extension,
+                output_df.collect_schema(),
+                parquet_write_options=parquet_write_options,
+            ) as writer:
+                for batch in iter_dataframe_batches(output_df):
+                    writer.write(batch)
         return output_path
 
     def load_project_primary_output(self, analysis: AnalysisModel, output_id: str):
-        output_path = self.get_primary_output_parquet_path(analysis, output_id)
-        return pl.read_parquet(output_path)
+        return read_output_table(self.get_primary_output_path(analysis, output_id))
+
+    def get_primary_output_path(self, analysis: AnalysisModel, output_id: str):
+        """
+        Gets the path of the output's file, which is a parquet or an Arrow IPC
+        file depending on how it was written.
+        """
+        return resolve_output_table_path(
+            os.path.join(
+                self._get_project_primary_output_root_path(analysis), output_id
+            )
+        )
 
     def get_primary_output_parquet_path(self, analysis: AnalysisModel, output_id: str):
         return os.path.join(
@@ -203,10 +457,23 @@ class Storage:
     def load_project_secondary_output(
         self, analysis: AnalysisModel, secondary_id: str, output_id: str
     ):
-        output_path = self.get_secondary_output_parquet_path(
-            analysis, secondary_id, output_id
+        return read_output_table(
+            self.get_secondary_output_path(analysis, secondary_id, output_id)
+        )
+
+    def get_secondary_output_path(
+        self, analysis: AnalysisModel, secondary_id: str, output_id: str
+    ):
+        """
+        Gets the path of the output's file, which is a parquet or an Arrow IPC
+        file depending on how it was written.
+        """
+        return resolve_output_table_path(
+            os.path.join(
+                self._get_project_secondary_output_root_path(analysis, secondary_id),
+                output_id,
+            )
         )
-        return pl.read_parquet(output_path)
 
     def get_secondary_output_parquet_path(
         self, analysis: AnalysisModel, secondary_id: str, output_id: str
@@ -224,13 +491,17 @@ class Storage:
         extension: SupportedOutputExtension,
         spec: AnalyzerOutput,
         export_chunk_size: Optional[int] = None,
+        partition_by: Optional[str] = None,
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
     ):
         return self._export_output(
-            self.get_primary_output_parquet_path(analysis, output_id),
+            self.get_primary_output_path(analysis, output_id),
             os.path.join(self._get_project_exports_root_path(analysis), output_id),
             extension=extension,
             spec=spec,
             export_chunk_size=export_chunk_size,
+            partition_by=partition_by,
+            parquet_write_options=parquet_write_options,
         )
 
     def export_project_secondary_output(
@@ -242,6 +513,8 @@ class Storage:
         extension: SupportedOutputExtension,
         spec: AnalyzerOutput,
         export_chunk_size: Optional[int] = None,
+        partition_by: Optional[str] = None,
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
     ):
         exported_path = os.path.join(
             self._get_project_exports_root_path(analysis),
@@ -252,11 +525,13 @@ class Storage:
             ),
         )
         return self._export_output(
-            self.get_secondary_output_parquet_path(analysis, secondary_id, output_id),
+            self.get_secondary_output_path(analysis, secondary_id, output_id),
             exported_path,
             extension=extension,
             spec=spec,
             export_chunk_size=export_chunk_size,
+            partition_by=partition_by,
+            parquet_write_options=parquet_write_options,
         )
 
     def _export_output(
@@ -267,32 +542,107 @@ class Storage:
         extension: SupportedOutputExtension,
         spec: AnalyzerOutput,
         export_chunk_size: Optional[int] = None,
+        partition_by: Optional[str] = None,
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
     ):
-        with pq.ParquetFile(input_path) as reader:
-            num_chunks = (
-                math.ceil(reader.metadata.num_rows / export_chunk_size)
-                if export_chunk_size
-                else 1
+        if partition_by is not None:
+            return (
+                yield from self._export_partitioned_output(
+                    input_path,
+                    output_path,
+                    extension=extension,
+                    spec=spec,
+                    partition_by=partition_by,
+                    parquet_write_options=parquet_write_options,
+                )
             )
 
+        num_chunks = (
+            math.ceil(count_output_table_rows(input_path) / export_chunk_size)
+            if export_chunk_size
+            else 1
+        )
+
         if num_chunks == 1:
-            df = pl.scan_parquet(input_path)
-            self._save_output(output_path, spec.transform_output(df), extension)
+            df = scan_output_table(input_path)
+            self._save_output(
+                output_path,
+                decode_categorical_columns(spec.transform_output(df)),
+                extension,
+                parquet_write_options,
+            )
             return f"{output_path}.{extension}"
 
-        with pq.ParquetFile(input_path) as reader:
-            get_batches = (
-                df
-                for batch in reader.iter_batches()
-                if (df := pl.from_arrow(batch)) is not None
+        for chunk_id, chunk in enumerate(
+            collect_dataframe_chunks(
+                iter_output_table_batches(input_path), export_chunk_size
+            )
+        ):
+            chunk = decode_categorical_columns(spec.transform_output(chunk))
+            self._save_output(
+                f"{output_path}_{chunk_id}", chunk, extension, parquet_write_options
+            )
+            yield chunk_id / num_chunks
+        return f"{output_path}_[*].{extension}"
+
+    def _export_partitioned_output(
+        self,
+        input_path: str,
+        output_path: str,
+        *,
+        extension: SupportedOutputExtension,
+        spec: AnalyzerOutput,
+        partition_by: str,
+        parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
+    ):
+        """
+        Exports the output into one directory per distinct value of the
+        `partition_by` column. Datetime columns are partitioned by day.
+        """
+        if extension not in PARTITIONABLE_OUTPUT_EXTENSIONS:
+            raise ValueError(f"Format {extension} does not support partitioning")
+
+        column = spec.get_column_by_name(partition_by)
+        is_by_day = column is not None and column.data_type == "datetime"
+
+        def prepare_batch(df: pl.DataFrame):
+            df = df.with_columns(
+                (
+                    pl.col(partition_by).dt.date()
+                    if is_by_day
+                    else pl.col(partition_by)
+                ).alias(PARTITION_KEY_COLUMN)
             )
-            for chunk_id, chunk in enumerate(
-                collect_dataframe_chunks(get_batches, export_chunk_size)
-            ):
-                chunk = spec.transform_output(chunk)
-                self._save_output(f"{output_path}_{chunk_id}", chunk, extension)
-                yield chunk_id / num_chunks
-            return f"{output_path}_[*].{extension}"
+            if not is_by_day:
+                # The value is already in the directory name
+                df = df.drop(partition_by)
+            return decode_categorical_columns(spec.transform_output(df))
+
+        shutil.rmtree(output_path, ignore_errors=True)
+        os.makedirs(output_path, exist_ok=True)
+        num_rows = count_output_table_rows(input_path)
+        empty_output = prepare_batch(
+            pl.DataFrame(schema=scan_output_table(input_path).collect_schema())
+        )
+        with PartitionedBatchWriter(
+            output_path,
+            partition_column=PARTITION_KEY_COLUMN,
+            partition_key=f"{partition_by}_date" if is_by_day else partition_by,
+            create_writer=lambda path: create_batch_writer(
+                path,
+                extension,
+                empty_output.drop(PARTITION_KEY_COLUMN).schema,
+                parquet_write_options=parquet_write_options,
+            ),
+            extension=extension,
+        ) as writer:
+            processed_rows = 0
+            for batch in iter_output_table_batches(input_path):
+                df = prepare_batch(batch)
+                writer.write(df)
+                processed_rows += df.height
+                yield processed_rows / max(num_rows, 1)
+        return output_path
 
     def list_project_analyses(self, project_id: str):
         with self._lock_database():
@@ -308,6 +658,8 @@ class Storage:
         display_name: str,
         primary_analyzer_id: str,
         column_mapping: dict[str, str],
+        *,
+        parquet_write_preset: Optional[ParquetWritePreset] = None,
     ) -> AnalysisModel:
         with self._lock_database():
             analysis_id = self._find_unique_analysis_id(project_id, display_name)
@@ -320,6 +672,7 @@ class Storage:
                 column_mapping=column_mapping,
                 create_timestamp=datetime.now().timestamp(),
                 is_draft=True,
+                parquet_write_preset=parquet_write_preset,
             )
             self.db.insert(analysis.model_dump())
         return analysis
@@ -396,6 +749,21 @@ class Storage:
                     & (Query()["analysis_id"] == db_analyzer_id),
                 )
 
+    def save_analysis_run_report(self, analysis: AnalysisModel, report: RunReport):
+        with open(
+            self._get_analysis_run_report_path(analysis), "w", encoding="utf8"
+        ) as file:
+            file.write(report.model_dump_json(indent=2))
+
+    def load_analysis_run_report(self, analysis: AnalysisModel) -> Optional[RunReport]:
+        try:
+            with open(
+                self._get_analysis_run_report_path(analysis), "r", encoding="utf8"
+            ) as file:
+                return RunReport.model_validate_json(file.read())
+        except FileNotFoundError:
+            return None
+
     def list_secondary_analyses(self, analysis: AnalysisModel) -> list[str]:
         try:
             analyzers = os.listdir(
@@ -433,6 +801,23 @@ class Storage:
     def _get_project_input_path(self, project_id: str):
         return os.path.join(self._get_project_path(project_id), "input.parquet")
 
+    def _get_project_profile_path(self, project_id: str):
+        return os.path.join(self._get_project_path(project_id), "profile.json")
+
+    def _get_project_profile_sample_path(self, project_id: str):
+        return os.path.join(
+            self._get_project_path(project_id), "profile_sample.parquet"
+        )
+
+    def _get_project_identifier_dictionary_path(
+        self, project_id: str, column_name: str
+    ):
+        return os.path.join(
+            self._get_project_path(project_id),
+            "identifier_dictionaries",
+            f"{quote(column_name, safe='')}.parquet",
+        )
+
     def _get_project_primary_output_root_path(self, analysis: AnalysisModel):
         return os.path.join(
             self._get_project_path(analysis.project_id),
@@ -455,6 +840,18 @@ class Storage:
             self._get_project_path(analysis.project_id), analysis.path, "exports"
         )
 
+    def _get_analysis_run_report_path(self, analysis: AnalysisModel):
+        return os.path.join(
+            self._get_project_path(analysis.project_id),
+            analysis.path,
+            "run_report.json",
+        )
+
+    def _get_analysis_profiles_path(self, analysis: AnalysisModel):
+        return os.path.join(
+            self._get_project_path(analysis.project_id), analysis.path, "profiles"
+        )
+
     def _get_web_presenter_state_path(self, analysis: AnalysisModel, presenter_id: str):
         return os.path.join(
             self._get_project_path(analysis.project_id),
@@ -0,0 +1,223 @@
+"""
+Reading and writing the tables that analyzers output. They are stored as
+parquet files, or as Arrow IPC files if the user chooses so: these are larger,
+but uncompressed ones are memory-mapped when read instead of being decoded and
+copied, which makes outputs that are read back by secondary analyzers and web
+presenters quicker to load.
+"""
+
+import os
+import re
+import time
+from typing import Iterable, Literal, Optional
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
+from .writers import (
+    IpcBatchWriter,
+    ParquetBatchWriter,
+    decode_categorical_columns,
+    sink_or_write,
+)
+
+OutputStorageFormat = Literal["parquet", "arrow", "arrow_lz4"]
+"""
+`arrow` is an uncompressed Arrow IPC file (also known as Feather v2), which can
+be memory-mapped; `arrow_lz4` trades that for a smaller file.
+"""
+
+OUTPUT_TABLE_EXTENSIONS: dict[OutputStorageFormat, str] = {
+    "parquet": "parquet",
+    "arrow": "arrow",
+    "arrow_lz4": "lz4.arrow",
+}
+"""
+The compression of Arrow IPC files is told apart by their extension, since only
+uncompressed files can be memory-mapped.
+"""
+
+
+def resolve_output_table_path(path_without_extension: str) -> str:
+    """
+    Gets the path of the output table in whichever format it was last written
+    in. If it wasn't written yet, this is the parquet path, which is where
+    analyzers that write the file themselves put it.
+    """
+    existing_paths = _list_output_table_paths(path_without_extension)
+    if not existing_paths:
+        return f"{path_without_extension}.{OUTPUT_TABLE_EXTENSIONS['parquet']}"
+    return max(existing_paths, key=lambda path: os.stat(path).st_mtime_ns)
+
+
+def write_output_table(
+    df: pl.DataFrame | pl.LazyFrame,
+    path_without_extension: str,
+    output_format: OutputStorageFormat,
+    *,
+    parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
+) -> str:
+    """
+    Writes the output table in the given format and removes the table's
+    previous files. Lazy frames are streamed to the file. Returns the path that
+    was written.
+
+    Arrow IPC files get a new name each time they are written, since the
+    previous one may still be memory-mapped by a dashboard: it must not see the
+    file change, and Windows doesn't allow replacing or removing a mapped file.
+    Such files are left behind and removed by a later write.
+
+    Dictionary-encoded identifier columns are stored as text: polars writes
+    the whole enum dictionary into every row group, which would make each
+    output as large as the project's dictionary.
+    """
+    df = decode_categorical_columns(df)
+    path = _get_new_output_table_path(path_without_extension, output_format)
+    # Written aside first, so that a partly written file is never read
+    temp_path = f"{path}.tmp"
+    if output_format == "parquet":
+        options = parquet_write_options.polars_kwargs()
+        if isinstance(df, pl.LazyFrame):
+            sink_or_write(df, "parquet", temp_path, **options)
+        else:
+            df.write_parquet(temp_path, **options)
+    else:
+        compression = "lz4" if output_format == "arrow_lz4" else "uncompressed"
+        if isinstance(df, pl.LazyFrame):
+            sink_or_write(df, "ipc", temp_path, compression=compression)
+        else:
+            df.write_ipc(temp_path, compression=compression)
+    os.replace(temp_path, path)
+    _remove_other_output_table_files(path_without_extension, path)
+    return path
+
+
+def write_output_table_batches(
+    batches: Iterable[pl.DataFrame],
+    schema: pl.Schema,
+    path_without_extension: str,
+    output_format: OutputStorageFormat,
+    *,
+    parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
+) -> str:
+    """
+    Writes the output table one batch at a time, for tables too large to be
+    built in memory at once. Every batch must have the `schema`. Otherwise
+    like `write_output_table`.
+    """
+    schema = decode_categorical_columns(pl.DataFrame(schema=schema)).schema
+    path = _get_new_output_table_path(path_without_extension, output_format)
+    temp_path = f"{path}.tmp"
+    with (
+        ParquetBatchWriter(temp_path, schema, parquet_write_options)
+        if output_format == "parquet"
+        else IpcBatchWriter(
+            temp_path,
+            schema,
+            compression="lz4" if output_format == "arrow_lz4" else None,
+        )
+    ) as writer:
+        for batch in batches:
+            writer.write(decode_categorical_columns(batch))
+    os.replace(temp_path, path)
+    _remove_other_output_table_files(path_without_extension, path)
+    return path
+
+
+def _get_new_output_table_path(
+    path_without_extension: str, output_format: OutputStorageFormat
+):
+    extension = OUTPUT_TABLE_EXTENSIONS[output_format]
+    if output_format == "parquet":
+        return f"{path_without_extension}.{extension}"
+    version = time.time_ns()
+    # The clock may not have moved on since the last write
+    while os.path.exists(f"{path_without_extension}.{version}.{extension}"):
+        version += 1
+    return f"{path_without_extension}.{version}.{extension}"
+
+
+def _remove_other_output_table_files(path_without_extension: str, path: str):
+    for other_path in _list_output_table_paths(path_without_extension):
+        if other_path == path:
+            continue
+        try:
+            os.remove(other_path)
+        except PermissionError:
+            pass
+
+
+def read_output_table(
+    path: str, *, columns: Optional[list[str]] = None
+) -> pl.DataFrame:
+    if _is_ipc_path(path):
+        return pl.read_ipc(path, columns=columns, memory_map=_is_memory_mappable(path))
+    return pl.read_parquet(path, columns=columns)
+
+
+def scan_output_table(path: str) -> pl.LazyFrame:
+    """
+    Lazily scans the output table. Only the columns and rows that the query
+    needs are read; uncompressed Arrow IPC files are memory-mapped.
+    """
+    if _is_ipc_path(path):
+        return pl.scan_ipc(path, memory_map=_is_memory_mappable(path))
+    return pl.scan_parquet(path)
+
+
+def count_output_table_rows(path: str) -> int:
+    """
+    Counts the rows from the file's metadata: the parquet footer, or the
+    record batch headers of Arrow IPC files, whose bodies aren't read or
+    decompressed.
+    """
+    if _is_ipc_path(path):
+        return pl.scan_ipc(path, memory_map=False).select(pl.len()).collect().item()
+    with pq.ParquetFile(path) as reader:
+        return reader.metadata.num_rows
+
+
+def iter_output_table_batches(path: str) -> Iterable[pl.DataFrame]:
+    """
+    Reads the output table one batch of rows at a time: a row group of parquet
+    files, or a record batch of Arrow IPC files.
+    """
+    if _is_ipc_path(path):
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield pl.from_arrow(reader.get_batch(index))
+        return
+    with pq.ParquetFile(path) as reader:
+        for batch in reader.iter_batches():
+            yield pl.from_arrow(batch)
+
+
+def _list_output_table_paths(path_without_extension: str) -> list[str]:
+    """
+    Lists the table's files in any format, including earlier Arrow IPC files
+    that couldn't be removed yet.
+    """
+    directory, name = os.path.split(path_without_extension)
+    if not os.path.isdir(directory):
+        return []
+    extensions = "|".join(
+        re.escape(extension) for extension in OUTPUT_TABLE_EXTENSIONS.values()
+    )
+    pattern = re.compile(rf"{re.escape(name)}(\.\d+)?\.({extensions})")
+    return [
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if pattern.fullmatch(file_name)
+    ]
+
+
+def _is_ipc_path(path: str):
+    return path.endswith(".arrow")
+
+
+def _is_memory_mappable(path: str):
+    return not path.endswith(f".{OUTPUT_TABLE_EXTENSIONS['arrow_lz4']}")
@@ -0,0 +1,38 @@
+import polars as pl
+
+from .writers import PartitionedBatchWriter, create_batch_writer, iter_dataframe_batches
+
+
+def test_partitioned_writer_closes_least_recent_files(tmp_path):
+    schema = pl.Schema({"value": pl.Int64})
+    with PartitionedBatchWriter(
+        str(tmp_path),
+        partition_column="key",
+        partition_key="key",
+        create_writer=lambda path: create_batch_writer(path, "csv", schema),
+        extension="csv",
+        max_open_writers=2,
+    ) as writer:
+        for index, key in enumerate(["a", "b", "c", "a"]):
+            writer.write(pl.DataFrame({"key": [key], "value": [index]}))
+            assert len(writer.writers) <= 2
+
+    assert sorted(path.name for path in (tmp_path / "key=a").iterdir()) == [
+        "part-0.csv",
+        "part-1.csv",
+    ]
+    assert pl.read_csv(tmp_path / "key=a" / "part-1.csv")["value"].to_list() == [3]
+    assert pl.read_csv(tmp_path / "key=*" / "*.csv").height == 4
+
+
+def test_iter_dataframe_batches_runs_lazy_query_once_in_batches():
+    lazy = (
+        pl.LazyFrame({"value": range(25)})
+        .with_columns(tags=pl.concat_list(pl.col("value"), pl.col("value") * 2))
+        .sort("value", descending=True)
+    )
+
+    batches = list(iter_dataframe_batches(lazy, batch_size=10))
+
+    assert [batch.height for batch in batches] == [10, 10, 5]
+    assert pl.concat(batches).equals(lazy.collect())
@@ -0,0 +1,438 @@
+"""
+Streaming table writers. Each writer consumes a table batch by batch so that
+exporting a large output never requires the whole table to be held in memory.
+"""
+
+import io
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Iterable, Literal, Optional
+from urllib.parse import quote
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from analyzer_interface.parquet_options import ParquetWriteOptions
+
+EXPORT_BATCH_SIZE = 50_000
+"""The number of rows materialized at a time when streaming an export."""
+
+EXCEL_MAX_ROWS = 1_048_576
+"""The maximum number of rows (including the header) in an Excel worksheet."""
+
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+"""The directory value Hive-style readers expect for a null partition key."""
+
+MAX_OPEN_PARTITION_WRITERS = 64
+"""The number of partition files a partitioned export keeps open at a time."""
+
+
+class BatchWriter(ABC):
+    @abstractmethod
+    def write(self, batch: pl.DataFrame):
+        """
+        Appends a batch of rows to the output. Every batch must have the same
+        schema.
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        """
+        Finalizes the output file. No more batches can be written afterwards.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ExcelBatchWriter(BatchWriter):
+    """
+    Writes rows to an Excel workbook using xlsxwriter's `constant_memory` mode,
+    which flushes each row to disk as soon as the next one is started.
+
+    Once a worksheet reaches Excel's row limit, the remaining rows continue in
+    a new worksheet (`Sheet2`, `Sheet3`, ...), each repeating the header row.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        schema: pl.Schema,
+        *,
+        max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+    ):
+        from xlsxwriter import Workbook
+
+        self.workbook = Workbook(
+            output_path,
+            {
+                "constant_memory": True,
+                # See https://xlsxwriter.readthedocs.io/working_with_dates_and_time.html#timezone-handling
+                "remove_timezone": True,
+                "nan_inf_to_errors": True,
+            },
+        )
+        self.schema = schema
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self.header_format = self.workbook.add_format({"bold": True})
+        self.column_formats = [
+            self._get_column_format(dtype) for dtype in schema.dtypes()
+        ]
+        self.worksheet = None
+        self.sheet_count = 0
+        self.next_row = 0
+
+    def write(self, batch: pl.DataFrame):
+        for values in stringify_nested_columns(batch).iter_rows():
+            if self.worksheet is None or self.next_row >= self.max_rows_per_sheet:
+                self._add_worksheet()
+            for col_index, value in enumerate(values):
+                if value is not None:
+                    self.worksheet.write(
+                        self.next_row, col_index, value, self.column_formats[col_index]
+                    )
+            self.next_row += 1
+
+    def close(self):
+        if self.worksheet is None:
+            # Always produce at least a header row, even for empty outputs
+            self._add_worksheet()
+        self.workbook.close()
+
+    def _add_worksheet(self):
+        self.sheet_count += 1
+        self.worksheet = self.workbook.add_worksheet(f"Sheet{self.sheet_count}")
+        self.worksheet.write_row(0, 0, self.schema.names(), self.header_format)
+        self.worksheet.freeze_panes(1, 0)
+        self.next_row = 1
+
+    def _get_column_format(self, dtype: pl.DataType):
+        if isinstance(dtype, pl.Datetime):
+            return self.workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        if isinstance(dtype, pl.Date):
+            return self.workbook.add_format({"num_format": "yyyy-mm-dd"})
+        if isinstance(dtype, pl.Time):
+            return self.workbook.add_format({"num_format": "hh:mm:ss"})
+        return None
+
+
+class JsonBatchWriter(BatchWriter):
+    """
+    Writes rows as a single JSON array of objects (the same layout as
+    `DataFrame.write_json`), appending each batch to the open array.
+    """
+
+    def __init__(self, output_path: str):
+        self.file = open(output_path, "w", encoding="utf8")
+        self.file.write("[")
+        self.is_empty = True
+
+    def write(self, batch: pl.DataFrame):
+        if batch.height == 0:
+            return
+        # Each NDJSON line is one JSON object; newlines inside values are
+        # always escaped, so splitting on "\n" is safe.
+        records = to_json_compatible(batch).write_ndjson().rstrip("\n").split("\n")
+        if not self.is_empty:
+            self.file.write(",")
+        self.file.write(",".join(records))
+        self.is_empty = False
+
+    def close(self):
+        self.file.write("]")
+        self.file.close()
+
+
+class NdjsonBatchWriter(BatchWriter):
+    """
+    Writes rows as newline-delimited JSON, one object per line.
+    """
+
+    def __init__(self, output_path: str):
+        self.file = open(output_path, "wb")
+
+    def write(self, batch: pl.DataFrame):
+        to_json_compatible(batch).write_ndjson(self.file)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvBatchWriter(BatchWriter):
+    """
+    Writes rows as CSV, optionally through a gzip or zstd compressed stream so
+    that the uncompressed CSV never touches the disk.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        schema: pl.Schema,
+        *,
+        compression: Optional[str] = None,
+    ):
+        self.file = (
+            pa.CompressedOutputStream(output_path, compression)
+            if compression
+            else pa.OSFile(output_path, "wb")
+        )
+        self.schema = schema
+        self.is_header_written = False
+
+    def write(self, batch: pl.DataFrame):
+        buffer = io.BytesIO()
+        stringify_nested_columns(batch).write_csv(
+            buffer, include_header=not self.is_header_written
+        )
+        self.file.write(buffer.getvalue())
+        self.is_header_written = True
+
+    def close(self):
+        if not self.is_header_written:
+            self.write(pl.DataFrame(schema=self.schema))
+        self.file.close()
+
+
+class ParquetBatchWriter(BatchWriter):
+    """
+    Writes rows to a parquet file, one row group per batch unless the options
+    limit their size.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        schema: pl.Schema,
+        options: ParquetWriteOptions = ParquetWriteOptions(),
+    ):
+        self.arrow_schema = pl.DataFrame(schema=schema).to_arrow().schema
+        self.row_group_size = options.row_group_size
+        self.writer = pq.ParquetWriter(
+            output_path, schema=self.arrow_schema, **options.pyarrow_writer_kwargs()
+        )
+
+    def write(self, batch: pl.DataFrame):
+        self.writer.write_table(
+            batch.to_arrow().cast(self.arrow_schema),
+            row_group_size=self.row_group_size,
+        )
+
+    def close(self):
+        self.writer.close()
+
+
+class IpcBatchWriter(BatchWriter):
+    """
+    Writes rows to an Arrow IPC file (also known as Feather v2), zstd-compressed
+    unless another `compression` (or None) is given.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        schema: pl.Schema,
+        *,
+        compression: Optional[Literal["zstd", "lz4"]] = "zstd",
+    ):
+        self.arrow_schema = pl.DataFrame(schema=schema).to_arrow().schema
+        self.writer = pa.ipc.new_file(
+            output_path,
+            self.arrow_schema,
+            options=pa.ipc.IpcWriteOptions(compression=compression),
+        )
+
+    def write(self, batch: pl.DataFrame):
+        self.writer.write_table(batch.to_arrow().cast(self.arrow_schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class PartitionedBatchWriter(BatchWriter):
+    """
+    Splits rows into a Hive-style directory layout, i.e.
+    `<root>/<key>=<value>/part-0.<extension>`, which DuckDB, pandas and pyarrow
+    can load as a single dataset.
+
+    The partition value of each row is read from the `partition_column` of the
+    batch, which is not written to the files themselves.
+
+    At most `max_open_writers` files are open at a time. When another one is
+    needed, the least recently written one is closed, and rows of its
+    partition that come later go to a new file (`part-1`, `part-2`, ...).
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        *,
+        partition_column: str,
+        partition_key: str,
+        create_writer: Callable[[str], BatchWriter],
+        extension: str,
+        max_open_writers: int = MAX_OPEN_PARTITION_WRITERS,
+    ):
+        self.root_path = root_path
+        self.partition_column = partition_column
+        self.partition_key = partition_key
+        self.create_writer = create_writer
+        self.extension = extension
+        self.max_open_writers = max_open_writers
+        self.writers: OrderedDict[str, BatchWriter] = OrderedDict()
+        self.part_counts: dict[str, int] = {}
+
+    def write(self, batch: pl.DataFrame):
+        for (value,), partition in batch.partition_by(
+            self.partition_column, as_dict=True
+        ).items():
+            self._get_writer(value).write(partition.drop(self.partition_column))
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+    def _get_writer(self, value) -> BatchWriter:
+        directory_name = (
+            f"{self.partition_key}="
+            f"{HIVE_NULL_PARTITION if value is None else quote(str(value), safe='')}"
+        )
+        writer = self.writers.get(directory_name)
+        if writer is not None:
+            self.writers.move_to_end(directory_name)
+            return writer
+
+        if len(self.writers) >= self.max_open_writers:
+            _, least_recent_writer = self.writers.popitem(last=False)
+            least_recent_writer.close()
+
+        partition_path = os.path.join(self.root_path, directory_name)
+        os.makedirs(partition_path, exist_ok=True)
+        part = self.part_counts.get(directory_name, 0)
+        self.part_counts[directory_name] = part + 1
+        writer = self.create_writer(
+            os.path.join(partition_path, f"part-{part}.{self.extension}")
+        )
+        self.writers[directory_name] = writer
+        return writer
+
+
+def create_batch_writer(
+    output_path: str,
+    extension: str,
+    schema: pl.Schema,
+    *,
+    parquet_write_options: ParquetWriteOptions = ParquetWriteOptions(),
+) -> BatchWriter:
+    """
+    Creates the batch writer for the given export extension.
+    """
+    if extension == "parquet":
+        return ParquetBatchWriter(output_path, schema, parquet_write_options)
+    if extension == "csv":
+        return CsvBatchWriter(output_path, schema)
+    if extension == "csv.gz":
+        return CsvBatchWriter(output_path, schema, compression="gzip")
+    if extension == "csv.zst":
+        return CsvBatchWriter(output_path, schema, compression="zstd")
+    if extension == "arrow":
+        return IpcBatchWriter(output_path, schema)
+    if extension == "xlsx":
+        return ExcelBatchWriter(output_path, schema)
+    if extension == "json":
+        return JsonBatchWriter(output_path)
+    if extension == "ndjson":
+        return NdjsonBatchWriter(output_path)
+    raise ValueError(f"Unsupported format: {extension}")
+
+
+def stringify_nested_columns(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Converts nested columns, which have no CSV or Excel cell representation, to
+    text: lists are joined with commas and structs are encoded as JSON.
+    """
+    return df.with_columns(
+        (
+            pl.col(name).cast(pl.List(pl.String)).list.join(", ")
+            if isinstance(dtype, (pl.List, pl.Array))
+            else pl.col(name).struct.json_encode()
+        )
+        for name, dtype in df.schema.items()
+        if isinstance(dtype, (pl.List, pl.Array, pl.Struct))
+    )
+
+
+def to_json_compatible(df: pl.DataFrame | pl.LazyFrame):
+    """
+    Converts columns that polars cannot serialize to JSON to text; currently
+    these are the time-of-day columns.
+    """
+    return df.with_columns(pl.col(pl.Time).cast(pl.String))
+
+
+def decode_categorical_columns(df: pl.DataFrame | pl.LazyFrame):
+    """
+    Converts dictionary-encoded columns (categoricals and enums, also inside
+    lists) back to text, so that exported files don't carry polars' encodings.
+    """
+    return df.with_columns(
+        pl.col(name).cast(_decode_categorical_dtype(dtype))
+        for name, dtype in df.collect_schema().items()
+        if _decode_categorical_dtype(dtype) != dtype
+    )
+
+
+def _decode_categorical_dtype(dtype: pl.DataType) -> pl.DataType:
+    if isinstance(dtype, (pl.Categorical, pl.Enum)):
+        return pl.String
+    if isinstance(dtype, pl.List):
+        return pl.List(_decode_categorical_dtype(dtype.inner))
+    return dtype
+
+
+def sink_or_write(
+    df: pl.LazyFrame,
+    file_format: Literal["parquet", "csv", "ipc", "ndjson"],
+    path: str,
+    **options,
+):
+    """
+    Streams the query's result into the file with `LazyFrame.sink_<format>`.
+    Queries that polars' streaming engine can't run, like scans of Arrow IPC
+    files, are collected and written with `DataFrame.write_<format>` instead.
+    """
+    try:
+        getattr(df, f"sink_{file_format}")(path, **options)
+    except pl.exceptions.InvalidOperationError:
+        getattr(df.collect(), f"write_{file_format}")(path, **options)
+
+
+def iter_dataframe_batches(
+    df: pl.DataFrame | pl.LazyFrame, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterable[pl.DataFrame]:
+    """
+    Materializes a (lazy) dataframe a batch at a time. A lazy query is run once
+    with the streaming engine into a temporary parquet file, which is then read
+    back batch by batch, so neither the query is re-run per batch nor the whole
+    result held in memory.
+    """
+    if isinstance(df, pl.DataFrame):
+        yield from df.iter_slices(batch_size)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = os.path.join(temp_dir, "batches.parquet")
+        sink_or_write(
+            df, "parquet", temp_path, compression="lz4", row_group_size=batch_size
+        )
+        with pq.ParquetFile(temp_path) as reader:
+            for batch in reader.iter_batches(batch_size):
+                yield pl.from_arrow(batch)
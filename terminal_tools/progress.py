@@ -1,6 +1,7 @@
 import sys
-import time
-from multiprocessing import Event, Manager, Process, Value
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from threading import Event, Thread
+from typing import Callable
 
 _spinner_frames = [
     "▁",
@@ -29,27 +30,53 @@ _spinner_frames = [
 ]
 
 
+_block_wrappers: list[Callable[[str], AbstractContextManager]] = []
+
+
+@contextmanager
+def wrap_progress_blocks(wrapper: Callable[[str], AbstractContextManager]):
+    """
+    While active, each `ProgressReporter` that is started also enters
+    `wrapper(title)` for as long as it runs, e.g. to measure it.
+    """
+    _block_wrappers.append(wrapper)
+    try:
+        yield
+    finally:
+        _block_wrappers.remove(wrapper)
+
+
 class ProgressReporter:
+    """
+    Shows a spinner with the progress of a task, redrawn from a background
+    thread a few times per second. Calling `update` only stores the value, so
+    it is cheap enough to call from hot loops.
+    """
+
     def __init__(self, title: str):
         self.title = title
-        self.progress = Value("d", -1)
-        self.done_text = Manager().dict()
-        self.process = Process(target=self._run)
+        # Assigning a float is atomic, so the drawing thread reads it unlocked
+        self.progress = -1.0
+        self.done_text = "Done!"
+        self.thread = Thread(target=self._run, daemon=True)
         self.done_event = Event()
         self.spinner_frame_index = 0
         self.last_output_length = 0
+        self.exit_stack = ExitStack()
 
     def start(self):
-        self.process.start()
+        for wrapper in _block_wrappers:
+            self.exit_stack.enter_context(wrapper(self.title))
+        self.thread.start()
 
     def update(self, value: float):
-        with self.progress.get_lock():
-            self.progress.value = max(min(value, 1), 0)
+        self.progress = max(min(value, 1), 0)
 
     def finish(self, done_text: str = "Done!"):
-        self.done_text["done"] = done_text
+        self.done_text = done_text
         self.done_event.set()
-        self.process.join()
+        self.thread.join()
+        self.exit_stack.close()
 
     def __enter__(self):
         self.start()
@@ -61,8 +88,7 @@ class ProgressReporter:
     def _run(self):
         try:
             while not self.done_event.is_set():
-                with self.progress.get_lock():
-                    current_progress = self.progress.value
+                current_progress = self.progress
                 self.spinner_frame_index = (self.spinner_frame_index + 1) % len(
                     _spinner_frames
                 )
@@ -70,10 +96,8 @@ class ProgressReporter:
                     f"{current_progress * 100:.2f}%" if current_progress >= 0 else "..."
                 )
                 self._draw(progress_text)
-                time.sleep(0.1)
-            self._draw(self.done_text.get("done", "Done!"), "✅")
-        except KeyboardInterrupt:
-            pass
+                self.done_event.wait(0.1)
+            self._draw(self.done_text, "✅")
         finally:
             sys.stdout.write("\n")
             sys.stdout.flush()